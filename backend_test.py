@@ -4,21 +4,50 @@ Comprehensive Backend API Testing for Jewellery E-commerce
 Tests all API endpoints: products, cart, orders, and payment integration
 """
 
-import requests
 import json
 import os
+import time
 from datetime import datetime
 
+# HTTP client, load and benchmark modules are imported where they're used, so
+# `--help` and single-suite smoke checks start without loading them
+from tests.parallel import UNITS
+
 # Get base URL from environment
-BASE_URL = "https://glamcharms.preview.emergentagent.com/api"
+BASE_URL = os.environ.get("BACKEND_URL", "https://glamcharms.preview.emergentagent.com/api")
 SESSION_ID = "test_session_123"
+DEFAULT_OUTPUT = "/app/test_results_backend.json"
+
+# Routes each suite's checks are about, for --endpoints
+SUITE_ENDPOINTS = {
+    "products": ("/products", "/products/[id]"),
+    "cart": ("/cart", "/cart/[id]"),
+    "payment": ("/create-payment-intent",),
+    "orders": ("/orders", "/orders/[id]"),
+    "errors": ("/cart", "/invalid-endpoint"),
+}
 
 class JewelleryAPITester:
-    def __init__(self):
-        self.base_url = BASE_URL
-        self.session_id = SESSION_ID
+    def __init__(self, base_url=BASE_URL, session_id=SESSION_ID, http=None, verbose=True, sink=None):
+        self.base_url = base_url
+        self.session_id = session_id
+        # Anything with the requests get/post/put/delete API (load mode passes a timed client)
+        if http is None:
+            from tests.http_client import PooledClient
+            http = PooledClient()
+        self.http = http
+        self.verbose = verbose
+        # With a ResultsSink, results are streamed to it instead of kept in test_results
+        self.sink = sink
         self.test_results = []
-        
+        self.passed = 0
+        self.failed = 0
+
+    def section(self, title):
+        """Print a suite banner"""
+        if self.verbose:
+            print(f"=== {title} ===")
+
     def log_test(self, test_name, success, details=""):
         """Log test results"""
         result = {
@@ -27,7 +56,25 @@ class JewelleryAPITester:
             "details": details,
             "timestamp": datetime.now().isoformat()
         }
-        self.test_results.append(result)
+        # Phase timings, status and size of the request this check was made on
+        take_timing = getattr(self.http, "take_timing", None)
+        timing = take_timing() if take_timing else None
+        if timing:
+            result["timing"] = timing
+        if success:
+            self.passed += 1
+        else:
+            self.failed += 1
+            # Under load, charge the failed check to the endpoint it was made on
+            check_failed = getattr(self.http, "check_failed", None)
+            if check_failed:
+                check_failed()
+        if self.sink is not None:
+            self.sink.write(result)
+        else:
+            self.test_results.append(result)
+        if not self.verbose:
+            return
         status = "✅ PASS" if success else "❌ FAIL"
         print(f"{status}: {test_name}")
         if details:
@@ -36,11 +83,11 @@ class JewelleryAPITester:
 
     def test_products_endpoints(self):
         """Test all product-related endpoints"""
-        print("=== TESTING PRODUCT ENDPOINTS ===")
+        self.section("TESTING PRODUCT ENDPOINTS")
         
         # Test 1: Get all products
         try:
-            response = requests.get(f"{self.base_url}/products")
+            response = self.http.get(f"{self.base_url}/products")
             if response.status_code == 200:
                 data = response.json()
                 if data.get('success') and 'products' in data:
@@ -62,7 +109,7 @@ class JewelleryAPITester:
 
         # Test 2: Filter products by category
         try:
-            response = requests.get(f"{self.base_url}/products?category=Earring")
+            response = self.http.get(f"{self.base_url}/products?category=Earring")
             if response.status_code == 200:
                 data = response.json()
                 if data.get('success') and 'products' in data:
@@ -84,7 +131,7 @@ class JewelleryAPITester:
 
         # Test 3: Get single product by ID
         try:
-            response = requests.get(f"{self.base_url}/products/1")
+            response = self.http.get(f"{self.base_url}/products/1")
             if response.status_code == 200:
                 data = response.json()
                 if data.get('success') and 'product' in data:
@@ -106,7 +153,7 @@ class JewelleryAPITester:
 
         # Test 4: Get non-existent product
         try:
-            response = requests.get(f"{self.base_url}/products/999")
+            response = self.http.get(f"{self.base_url}/products/999")
             if response.status_code == 404:
                 data = response.json()
                 if not data.get('success') and 'error' in data:
@@ -123,7 +170,7 @@ class JewelleryAPITester:
 
     def test_cart_endpoints(self):
         """Test all cart-related endpoints"""
-        print("=== TESTING CART ENDPOINTS ===")
+        self.section("TESTING CART ENDPOINTS")
         
         # Test 1: Add product to cart
         try:
@@ -132,7 +179,7 @@ class JewelleryAPITester:
                 "quantity": 2,
                 "sessionId": self.session_id
             }
-            response = requests.post(f"{self.base_url}/cart", json=payload)
+            response = self.http.post(f"{self.base_url}/cart", json=payload)
             if response.status_code == 200:
                 data = response.json()
                 if data.get('success'):
@@ -149,7 +196,7 @@ class JewelleryAPITester:
 
         # Test 2: Get cart items
         try:
-            response = requests.get(f"{self.base_url}/cart?sessionId={self.session_id}")
+            response = self.http.get(f"{self.base_url}/cart?sessionId={self.session_id}")
             if response.status_code == 200:
                 data = response.json()
                 if data.get('success') and 'items' in data:
@@ -175,7 +222,7 @@ class JewelleryAPITester:
                 "quantity": 3,
                 "sessionId": self.session_id
             }
-            response = requests.put(f"{self.base_url}/cart/1", json=payload)
+            response = self.http.put(f"{self.base_url}/cart/1", json=payload)
             if response.status_code == 200:
                 data = response.json()
                 if data.get('success'):
@@ -197,7 +244,7 @@ class JewelleryAPITester:
                 "quantity": 1,
                 "sessionId": self.session_id
             }
-            response = requests.post(f"{self.base_url}/cart", json=payload)
+            response = self.http.post(f"{self.base_url}/cart", json=payload)
             if response.status_code == 200:
                 data = response.json()
                 if data.get('success'):
@@ -214,7 +261,7 @@ class JewelleryAPITester:
 
         # Test 5: Remove item from cart
         try:
-            response = requests.delete(f"{self.base_url}/cart/7?sessionId={self.session_id}")
+            response = self.http.delete(f"{self.base_url}/cart/7?sessionId={self.session_id}")
             if response.status_code == 200:
                 data = response.json()
                 if data.get('success'):
@@ -231,12 +278,12 @@ class JewelleryAPITester:
 
     def test_payment_endpoints(self):
         """Test payment-related endpoints"""
-        print("=== TESTING PAYMENT ENDPOINTS ===")
+        self.section("TESTING PAYMENT ENDPOINTS")
         
         # Test 1: Create payment intent
         try:
             # Get current cart items first
-            cart_response = requests.get(f"{self.base_url}/cart?sessionId={self.session_id}")
+            cart_response = self.http.get(f"{self.base_url}/cart?sessionId={self.session_id}")
             cart_items = []
             total_amount = 0
             
@@ -252,7 +299,7 @@ class JewelleryAPITester:
                 "sessionId": self.session_id
             }
             
-            response = requests.post(f"{self.base_url}/create-payment-intent", json=payload)
+            response = self.http.post(f"{self.base_url}/create-payment-intent", json=payload)
             if response.status_code == 200:
                 data = response.json()
                 if data.get('success') and 'clientSecret' in data and 'paymentIntentId' in data:
@@ -270,12 +317,12 @@ class JewelleryAPITester:
 
     def test_order_endpoints(self):
         """Test order-related endpoints"""
-        print("=== TESTING ORDER ENDPOINTS ===")
+        self.section("TESTING ORDER ENDPOINTS")
         
         # Test 1: Create order
         try:
             # Get current cart items
-            cart_response = requests.get(f"{self.base_url}/cart?sessionId={self.session_id}")
+            cart_response = self.http.get(f"{self.base_url}/cart?sessionId={self.session_id}")
             cart_items = []
             subtotal = 0
             
@@ -301,7 +348,7 @@ class JewelleryAPITester:
                 "total": subtotal + 500  # Adding shipping
             }
             
-            response = requests.post(f"{self.base_url}/orders", json=payload)
+            response = self.http.post(f"{self.base_url}/orders", json=payload)
             if response.status_code == 200:
                 data = response.json()
                 if data.get('success') and 'orderId' in data:
@@ -319,7 +366,7 @@ class JewelleryAPITester:
 
         # Test 2: Verify cart is cleared after order
         try:
-            response = requests.get(f"{self.base_url}/cart?sessionId={self.session_id}")
+            response = self.http.get(f"{self.base_url}/cart?sessionId={self.session_id}")
             if response.status_code == 200:
                 data = response.json()
                 if data.get('success') and 'items' in data:
@@ -341,7 +388,7 @@ class JewelleryAPITester:
 
         # Test 3: Get orders for session
         try:
-            response = requests.get(f"{self.base_url}/orders?sessionId={self.session_id}")
+            response = self.http.get(f"{self.base_url}/orders?sessionId={self.session_id}")
             if response.status_code == 200:
                 data = response.json()
                 if data.get('success') and 'orders' in data:
@@ -364,7 +411,7 @@ class JewelleryAPITester:
         # Test 4: Get single order
         if hasattr(self, 'order_id'):
             try:
-                response = requests.get(f"{self.base_url}/orders/{self.order_id}")
+                response = self.http.get(f"{self.base_url}/orders/{self.order_id}")
                 if response.status_code == 200:
                     data = response.json()
                     if data.get('success') and 'order' in data:
@@ -391,7 +438,7 @@ class JewelleryAPITester:
                     "paymentStatus": "completed",
                     "status": "confirmed"
                 }
-                response = requests.put(f"{self.base_url}/orders/{self.order_id}", json=payload)
+                response = self.http.put(f"{self.base_url}/orders/{self.order_id}", json=payload)
                 if response.status_code == 200:
                     data = response.json()
                     if data.get('success'):
@@ -408,7 +455,7 @@ class JewelleryAPITester:
 
     def test_error_handling(self):
         """Test error handling scenarios"""
-        print("=== TESTING ERROR HANDLING ===")
+        self.section("TESTING ERROR HANDLING")
         
         # Test 1: Add non-existent product to cart
         try:
@@ -417,7 +464,7 @@ class JewelleryAPITester:
                 "quantity": 1,
                 "sessionId": self.session_id
             }
-            response = requests.post(f"{self.base_url}/cart", json=payload)
+            response = self.http.post(f"{self.base_url}/cart", json=payload)
             if response.status_code == 404:
                 data = response.json()
                 if not data.get('success') and 'error' in data:
@@ -434,7 +481,7 @@ class JewelleryAPITester:
 
         # Test 2: Invalid endpoint
         try:
-            response = requests.get(f"{self.base_url}/invalid-endpoint")
+            response = self.http.get(f"{self.base_url}/invalid-endpoint")
             if response.status_code == 404:
                 data = response.json()
                 if not data.get('success') and 'error' in data:
@@ -449,55 +496,653 @@ class JewelleryAPITester:
         except Exception as e:
             self.log_test("Error handling - Invalid endpoint", False, str(e))
 
-    def run_all_tests(self):
-        """Run all test suites"""
+    def run_suites(self, names):
+        """Run the named suites (UNITS keys) in order, replaying unselected prerequisites silently"""
+        done = set()
+        for name in names:
+            setup_suites, suite = UNITS[name]
+            missing = [setup_suite for setup_suite in setup_suites if setup_suite not in done]
+            if missing:
+                # Same session, so e.g. the order suite finds a filled cart; these checks aren't reported
+                setup = JewelleryAPITester(base_url=self.base_url, session_id=self.session_id, http=self.http,
+                                           verbose=False)
+                for setup_suite in missing:
+                    getattr(setup, setup_suite)()
+                done.update(missing)
+            getattr(self, suite)()
+            done.add(suite)
+
+    def run_all_tests(self, suites=None, iterations=1, duration=None):
+        """Run the selected suites (default: all) `iterations` times, or repeatedly for `duration` seconds"""
+        names = [name for name in UNITS if suites is None or name in suites]
         print(f"Starting comprehensive backend API testing...")
         print(f"Base URL: {self.base_url}")
         print(f"Session ID: {self.session_id}")
+        print(f"Suites: {', '.join(names)}")
         print("=" * 60)
         
-        self.test_products_endpoints()
-        self.test_cart_endpoints()
-        self.test_payment_endpoints()
-        self.test_order_endpoints()
-        self.test_error_handling()
+        deadline = time.perf_counter() + duration if duration else None
+        done = 0
+        while done < iterations if deadline is None else time.perf_counter() < deadline:
+            self.run_suites(names)
+            done += 1
         
         # Summary
         print("=" * 60)
         print("TEST SUMMARY")
         print("=" * 60)
         
-        total_tests = len(self.test_results)
-        passed_tests = sum(1 for result in self.test_results if result['success'])
-        failed_tests = total_tests - passed_tests
+        total_tests = self.passed + self.failed
+        passed_tests = self.passed
+        failed_tests = self.failed
         
         print(f"Total Tests: {total_tests}")
         print(f"Passed: {passed_tests}")
         print(f"Failed: {failed_tests}")
-        print(f"Success Rate: {(passed_tests/total_tests)*100:.1f}%")
+        print(f"Success Rate: {(passed_tests/total_tests)*100 if total_tests else 0:.1f}%")
         
         if failed_tests > 0:
             print("\nFAILED TESTS:")
             for result in self.test_results:
                 if not result['success']:
                     print(f"❌ {result['test']}: {result['details']}")
+            if self.sink is not None:
+                for test, count in self.sink.failures_by_test.items():
+                    print(f"❌ {test}: failed {count}x (details in {self.sink.path})")
         
         return passed_tests, failed_tests, self.test_results
 
+def run_load_mode(args, base_url=BASE_URL):
+    """Run the default scenario's journeys from many virtual users and print latency stats"""
+    import random
+
+    from tests.http_client import print_connection_stats
+    from tests.loadgen import LatencyRecorder, print_load_report, run_load
+    from tests.scenarios import DEFAULT_SCENARIO, JourneyTester
+
+    client = make_client(args, pool_size=max(args.pool_size, args.concurrency))
+    recorder = LatencyRecorder()
+    sink, metrics = start_observers(args, recorder, snapshot=recorder.report)
+    # Every journey of the mix, so catalogue, checkout and admin routes are all measured
+    journeys = [journey["name"] for journey in DEFAULT_SCENARIO["journeys"]]
+
+    def make_tester(http, user_index):
+        return JourneyTester(DEFAULT_SCENARIO, base_url, http, random.Random(user_index), sink=sink)
+
+    print(f"Starting load test against {base_url}")
+    print(f"Virtual users: {args.concurrency}, target rate: {args.rate or 'unlimited'} req/s, "
+          f"{f'duration: {args.duration}s' if args.duration else f'iterations: {args.iterations}'}")
+    print(f"Journeys per pass: {', '.join(journeys)}")
+    report, recorder, failed = run_load(make_tester, journeys, concurrency=args.concurrency,
+                                        rate=args.rate, duration=args.duration,
+                                        iterations=args.iterations, http=client, recorder=recorder)
+    stop_observers(sink, metrics)
+    print_load_report(report, recorder.elapsed(), failed)
+    print_connection_stats(client.stats.snapshot())
+    client.close()
+    return report, recorder
+
+def start_observers(args, recorder=None, snapshot=None):
+    """Open the --results-jsonl sink and serve --metrics-port for a recorder, when asked for"""
+    sink = metrics = None
+    if args.results_jsonl:
+        from tests.results_sink import ResultsSink
+        sink = ResultsSink(args.results_jsonl, snapshot_interval=args.snapshot_interval, snapshot=snapshot)
+    if args.metrics_port is not None and recorder is not None:
+        from tests.results_sink import MetricsServer
+        metrics = MetricsServer(recorder, port=args.metrics_port, host=args.metrics_host, sink=sink)
+        print(f"Live metrics at {metrics.start()}")
+    return sink, metrics
+
+def stop_observers(sink, metrics):
+    if metrics is not None:
+        metrics.stop()
+    if sink is not None:
+        sink.close()
+        print(f"Results streamed to: {sink.path}")
+
+def run_benchmark_mode(args, base_url=BASE_URL):
+    """Run load mode (every journey, admin routes included), then save it as a baseline and/or gate it against one"""
+    from tests.benchmark import (DEFAULT_BASELINE_DIR, compare_to_baseline, load_baseline,
+                                 print_comparison, save_baseline)
+
+    report, recorder = run_load_mode(args, base_url)
+    histograms = recorder.histograms.to_dict()
+    directory = args.baseline_dir or DEFAULT_BASELINE_DIR
+    regressed = False
+    if args.compare_baseline:
+        baseline = load_baseline(args.compare_baseline, directory)
+        verdicts = compare_to_baseline(baseline, report, histograms, threshold=args.threshold,
+                                       pct=args.gate_percentile, endpoints=args.gate_endpoints)
+        regressed = print_comparison(args.compare_baseline, verdicts, args.threshold)
+    if args.save_baseline:
+        path = save_baseline(args.save_baseline, report, histograms, base_url, recorder.elapsed(), directory)
+        print(f"\nBaseline '{args.save_baseline}' saved to: {path}")
+    return 1 if regressed else 0
+
+def run_scenario_mode(args, base_url=BASE_URL):
+    """Drive a weighted journey mix at a target arrival rate (open model)"""
+    from tests.http_client import print_connection_stats
+    from tests.loadgen import LatencyRecorder, print_load_report
+    from tests.scenarios import DEFAULT_SCENARIO, load_scenario, print_journey_report, run_scenario
+
+    scenario = DEFAULT_SCENARIO if args.scenario == "default" else load_scenario(args.scenario)
+    duration = args.duration or 60
+    client = make_client(args, pool_size=max(args.pool_size, args.max_users))
+    http, profiler = client, None
+    if args.profile_payloads:
+        http, profiler = profile_payloads(client)
+    recorder = LatencyRecorder()
+    sink, metrics = start_observers(args, recorder, snapshot=recorder.report)
+    print(f"Starting scenario '{args.scenario}' against {base_url}")
+    print(f"Arrival rate: {args.arrival_rate} journeys/s for {duration}s, max concurrent users: {args.max_users}")
+    report, recorder, journeys, dropped = run_scenario(scenario, base_url, http, args.arrival_rate, duration,
+                                                       max_users=args.max_users, rate=args.rate,
+                                                       think_scale=args.think_scale, recorder=recorder)
+    stop_observers(sink, metrics)
+    print_load_report(report, recorder.elapsed())
+    print_journey_report(journeys, dropped)
+    if profiler is not None:
+        from tests.payload_profiler import print_payload_report
+        print_payload_report(profiler.report())
+    print_connection_stats(client.stats.snapshot())
+    client.close()
+    return report, recorder
+
+def run_soak_mode(args, base_url=BASE_URL):
+    """Drive a steady journey mix for hours and fail if latency or server resources drift upward"""
+    from tests.http_client import print_connection_stats
+    from tests.scenarios import DEFAULT_SCENARIO, load_scenario
+    from tests.soak import (SoakRecorder, detect_drift, print_drift_report, print_window, run_soak,
+                            write_windows_csv)
+
+    scenario = DEFAULT_SCENARIO if args.scenario in (None, "default") else load_scenario(args.scenario)
+    duration = args.duration or 3600
+    sink = None
+    if args.dsn:
+        from tests.datagen import PostgresSink
+        sink = PostgresSink(args.dsn)
+    client = make_client(args, pool_size=max(args.pool_size, args.max_users))
+    recorder = SoakRecorder()
+    results_sink, metrics = start_observers(args, recorder, snapshot=recorder.report)
+    print(f"Soaking {base_url} with scenario '{args.scenario or 'default'}' at {args.arrival_rate} journeys/s "
+          f"for {duration:.0f}s, sampling every {args.soak_window:.0f}s")
+    if not args.server_pid:
+        print("No --server-pid: server RSS and socket counts won't be sampled")
+    windows, _ = run_soak(scenario, base_url, client, args.arrival_rate, duration, window=args.soak_window,
+                          max_users=args.max_users, think_scale=args.think_scale, server_pid=args.server_pid,
+                          sink=sink, recorder=recorder, on_window=print_window)
+    stop_observers(results_sink, metrics)
+    if args.soak_csv:
+        write_windows_csv(windows, args.soak_csv)
+        print(f"Per-window samples saved to: {args.soak_csv}")
+    ok = print_drift_report(detect_drift(windows, alpha=args.drift_alpha, min_change=args.drift_min_change))
+    print_connection_stats(client.stats.snapshot())
+    client.close()
+    if sink is not None:
+        sink.close()
+    return 0 if ok else 1
+
+def run_asset_mode(args, base_url=BASE_URL):
+    """Replay catalogue page loads to cost the per-card image lookups and asset caching"""
+    from tests.asset_bench import print_asset_report, run_asset_benchmark
+
+    client = make_client(args, pool_size=max(args.pool_size, 64))
+    print(f"Loading the catalogue page from {base_url}: cold + {args.asset_repeats} warm loads per variant, "
+          f"{args.browser_connections} connections")
+    report = run_asset_benchmark(client, base_url, repeats=args.asset_repeats, connections=args.browser_connections)
+    print_asset_report(report)
+    client.close()
+    return report
+
+def run_call_patterns_mode(args, base_url=BASE_URL):
+    """Replay page views and report N+1 and duplicate calls with what batching or caching would save"""
+    from tests.call_patterns import print_call_pattern_report, run_call_patterns
+    from tests.pagination import admin_login
+
+    client = make_client(args, pool_size=max(args.pool_size, args.browser_connections))
+    admin_client = client.fork()
+    try:
+        admin_login(admin_client, base_url)
+    except RuntimeError as e:
+        print(f"{e}; skipping the admin pages")
+        admin_client = None
+    print(f"Replaying page views against {base_url}: {args.visits} visits each, {args.browser_connections} "
+          f"connections, {args.pattern_window:g} ms window")
+    report = run_call_patterns(client, base_url, admin_client, views=args.views, visits=args.visits,
+                               connections=args.browser_connections, window_ms=args.pattern_window,
+                               min_group=args.n_plus_one_min)
+    print_call_pattern_report(report)
+    client.close()
+    return report
+
+def run_cache_mode(args, base_url=BASE_URL, mock=None):
+    """Check ETag revalidation and admin-write invalidation of the catalogue reads, and cost the cache hits"""
+    from tests.cache_bench import print_cache_report, run_cache_benchmark
+    from tests.pagination import admin_login
+
+    client = make_client(args)
+    admin_client = client.fork()
+    admin_login(admin_client, base_url)
+    target = "each mock cache layer" if mock else base_url
+    print(f"Validating catalogue caching on {target}: {args.cache_repeats} plain and conditional passes")
+    report = run_cache_benchmark(client, admin_client, base_url, repeats=args.cache_repeats, mock=mock)
+    ok = print_cache_report(report)
+    client.close()
+    return 0 if ok else 1
+
+def run_pagination_mode(args, base_url=BASE_URL, mock=None):
+    """Seed a large catalogue and measure how offset paging slows down with depth"""
+    from tests.pagination import (admin_login, delete_seeded, print_pagination_report, run_pagination_benchmark,
+                                  seed_via_api, seed_via_mock, write_csv, write_plot)
+
+    client = make_client(args)
+    admin_client = client.fork()
+    admin_login(admin_client, base_url)
+    print(f"Seeding {args.pagination} products into {'the mock store' if mock else base_url}...")
+    ids = seed_via_mock(mock, args.pagination) if mock else seed_via_api(admin_client, base_url, args.pagination)
+    try:
+        series = run_pagination_benchmark(client, admin_client, base_url, page_sizes=args.page_sizes,
+                                          repeats=args.repeats)
+    finally:
+        if not mock and not args.keep_seeded:
+            print(f"Deleting {len(ids)} seeded products...")
+            delete_seeded(admin_client, base_url, ids)
+    print_pagination_report(series)
+    if args.pagination_csv:
+        write_csv(series, args.pagination_csv)
+        print(f"\nPer-page samples saved to: {args.pagination_csv}")
+    if args.pagination_plot:
+        if write_plot(series, args.pagination_plot):
+            print(f"Latency-vs-offset plot saved to: {args.pagination_plot}")
+        else:
+            print("matplotlib is not installed; skipped the plot")
+    client.close()
+    return series
+
+def run_stats_mode(args, base_url=BASE_URL, mock=None):
+    """Grow order history in steps and benchmark /api/admin/stats, verifying its totals"""
+    from tests.datagen import DataGenerator, PostgresSink
+    from tests.pagination import admin_login
+    from tests.stats_bench import MockTarget, PostgresTarget, print_stats_report, run_stats_benchmark
+
+    if mock:
+        target = MockTarget(mock)
+    elif args.dsn:
+        target = PostgresTarget(PostgresSink(args.dsn))
+    else:
+        raise SystemExit("--stats-bench needs --mock or --dsn to generate order history")
+    client = make_client(args)
+    admin_login(client, base_url)
+
+    rollup = None
+    if args.rollup_url:
+        rollup = lambda: client.get(args.rollup_url).json()
+    elif args.rollup_sql:
+        if mock:
+            raise SystemExit("--rollup-sql needs --dsn")
+        rollup = lambda: dict(zip(("revenue", "customers"), target.sink.fetchall(args.rollup_sql)[0]))
+
+    generator = DataGenerator(args.gen_users, args.gen_products, run=args.gen_run)
+    print(f"Benchmarking /api/admin/stats at {', '.join(map(str, args.order_steps))} generated orders...")
+    steps = run_stats_benchmark(client, base_url, target, generator, args.order_steps, samples=args.stats_samples,
+                                rollup=rollup, server_pid=args.server_pid, keep=args.keep_seeded)
+    ok = print_stats_report(steps)
+    client.close()
+    return 0 if ok else 1
+
+def run_query_profile_mode(args, base_url=BASE_URL, mock=None):
+    """Attribute pg_stat_statements cost to each endpoint and check filter columns against declared indexes"""
+    from tests.query_profiler import (QueryProfiler, declared_index_status, print_declared_indexes,
+                                      print_query_report, run_query_profile)
+
+    if mock or not args.dsn:
+        # Without the app's database only the schema-vs-migrations check is possible
+        print_declared_indexes(declared_index_status())
+        print("\n--query-profile needs --dsn (or DATABASE_URL) for the database behind --base-url")
+        return 1
+    from tests.datagen import PostgresSink
+    from tests.mock_server import ADMIN_EMAIL, ADMIN_PASSWORD
+    from tests.pagination import admin_login
+
+    sink = PostgresSink(args.dsn)
+    profiler = QueryProfiler(sink, settle=args.stats_settle)
+    client = make_client(args)
+    admin_login(client, base_url)
+    print(f"Profiling SQL per endpoint against {base_url}: {args.profile_requests} requests each, run serially")
+    report = run_query_profile(client, base_url, profiler, requests=args.profile_requests,
+                               endpoints=args.profile_endpoints,
+                               credentials={"email": ADMIN_EMAIL, "password": ADMIN_PASSWORD})
+    status = declared_index_status(profiler.indexes)
+    print_declared_indexes(status)
+    print_query_report(report)
+    client.close()
+    sink.close()
+    return 0 if all(entry["in_database"] for entry in status) else 1
+
+def run_checkout_mode(args, base_url=BASE_URL):
+    """Fire concurrent identical and overlapping checkouts and look for duplicate orders"""
+    from tests.checkout_stress import print_checkout_report, run_checkout_stress
+    from tests.http_client import print_connection_stats
+    from tests.pagination import admin_login
+
+    sink = activity_sink = None
+    if args.dsn:
+        from tests.datagen import PostgresSink
+        sink, activity_sink = PostgresSink(args.dsn), PostgresSink(args.dsn)
+    client = make_client(args, pool_size=max(args.pool_size, args.stress_buyers * args.stress_copies))
+    admin_client = client.fork()
+    admin_login(admin_client, base_url)
+    print(f"Stressing checkout at {base_url}: {args.stress_rounds} verify bursts of {args.stress_copies}, "
+          f"{args.stress_buyers} buyers x {args.stress_copies} COD submits")
+    report = run_checkout_stress(client, admin_client, base_url, rounds=args.stress_rounds,
+                                 copies=args.stress_copies, buyers=args.stress_buyers,
+                                 secret=args.razorpay_secret, sink=sink, activity_sink=activity_sink)
+    ok = print_checkout_report(report)
+    print_connection_stats(client.stats.snapshot())
+    client.close()
+    for connection in (sink, activity_sink):
+        if connection is not None:
+            connection.close()
+    return 0 if ok else 1
+
+def run_auth_mode(args, base_url=BASE_URL, mock=None):
+    """Measure bcrypt login throughput per cost factor and the latency/CPU cost of auth checks"""
+    from tests.auth_bench import MockUsers, PostgresUsers, print_auth_report, run_auth_benchmark
+
+    if mock:
+        users = MockUsers(mock)
+        # The mock serves from a thread of this process, so sample that thread's CPU
+        server_pid, server_tid = os.getpid(), mock.thread_id
+    elif args.dsn:
+        from tests.datagen import PostgresSink
+        users = PostgresUsers(PostgresSink(args.dsn))
+        server_pid, server_tid = args.server_pid, None
+    else:
+        raise SystemExit("--auth-bench needs --mock or --dsn to create users with bcrypt hashes")
+    client = make_client(args, pool_size=max(args.pool_size, args.concurrency))
+    print(f"Benchmarking auth at {base_url}: bcrypt costs {', '.join(map(str, args.bcrypt_costs))}, "
+          f"{args.concurrency} workers, {args.duration or 10}s per phase")
+    report = run_auth_benchmark(client, base_url, users, costs=args.bcrypt_costs, workers=args.concurrency,
+                                duration=args.duration or 10, server_pid=server_pid, server_tid=server_tid)
+    print_auth_report(report)
+    if server_pid is None:
+        print("\nPass --server-pid to report server CPU per request")
+    client.close()
+    return report
+
+def run_parallel_mode(args, base_url=BASE_URL):
+    """Run each suite as an isolated unit on a process pool; returns (passed, failed, results)"""
+    import functools
+    from tests.http_client import PooledClient
+    from tests.parallel import print_parallel_report, run_parallel
+
+    workers = args.parallel or os.cpu_count() or 1
+    units = args.suites or list(UNITS)
+    client_factory = functools.partial(PooledClient, pool_size=args.pool_size, keep_alive=not args.no_keep_alive,
+                                       retries=args.retries, backoff=args.backoff)
+    print(f"Running {', '.join(units)} as isolated units on {workers} workers against {base_url}")
+    reports, wall_s = run_parallel(JewelleryAPITester, base_url, client_factory, units=units, workers=workers)
+    print_parallel_report(reports, wall_s, workers)
+    results = [dict(result, unit=report["unit"]) for report in reports for result in report["results"]]
+    passed = sum(1 for result in results if result["success"])
+    return passed, len(results) - passed, results
+
+def profile_payloads(client):
+    """Wrap a client so response sizes, parse times and unread fields are recorded"""
+    from tests.payload_profiler import PayloadProfiler, ProfilingClient
+
+    profiler = PayloadProfiler()
+    return ProfilingClient(client, profiler), profiler
+
+def make_client(args, pool_size=None):
+    """Build the shared pooled client from the connection options"""
+    from tests.http_client import PooledClient
+
+    return PooledClient(pool_size=pool_size or args.pool_size, keep_alive=not args.no_keep_alive,
+                        retries=args.retries, backoff=args.backoff)
+
+def _route(path):
+    """Route without the /api prefix, so /api/orders and /orders select the same suites"""
+    path = "/" + path.strip("/")
+    if path == "/api" or path.startswith("/api/"):
+        path = path[len("/api"):] or "/"
+    return path
+
+def select_suites(suites=None, endpoints=None):
+    """Suites named in `suites` plus those whose routes contain any of `endpoints`; None means all"""
+    if not suites and not endpoints:
+        return None
+    chosen = set(suites or ())
+    patterns = [_route(endpoint) for endpoint in endpoints or ()]
+    for name, routes in SUITE_ENDPOINTS.items():
+        if any(pattern in _route(route) for pattern in patterns for route in routes):
+            chosen.add(name)
+    return [name for name in UNITS if name in chosen]
+
+def parse_args(argv=None):
+    import argparse
+    parser = argparse.ArgumentParser(description="Backend API tests for the jewellery store")
+    parser.add_argument("--base-url", default=BASE_URL, help="API base URL (default: $BACKEND_URL or the preview host)")
+    parser.add_argument("--output", default=DEFAULT_OUTPUT, help="where to write the functional results JSON")
+    parser.add_argument("--suites", "--units", nargs="+", choices=list(UNITS), default=None,
+                        help="suites to run (default: all); prerequisites such as cart run silently")
+    parser.add_argument("--endpoints", nargs="+", metavar="ROUTE",
+                        help="also run every suite whose checks cover a route containing one of these, "
+                             "e.g. /api/orders")
+    parser.add_argument("--load", action="store_true",
+                        help="run the scenario journeys from many virtual users and report latency")
+    parser.add_argument("--concurrency", type=int, default=10, help="virtual users in load mode")
+    parser.add_argument("--rate", type=float, default=None, help="target requests/second across all users")
+    parser.add_argument("--duration", type=float, default=None,
+                        help="seconds to keep repeating the suites, or to sustain load (overrides --repeat)")
+    parser.add_argument("--repeat", "--iterations", dest="iterations", type=int, default=1,
+                        help="suite passes (per virtual user in load mode)")
+    parser.add_argument("--pool-size", type=int, default=10, help="pooled connections kept per host")
+    parser.add_argument("--no-keep-alive", action="store_true", help="close the connection after every request")
+    parser.add_argument("--retries", type=int, default=0, help="retries for idempotent requests and connect errors")
+    parser.add_argument("--backoff", type=float, default=0.0, help="retry backoff factor in seconds")
+    parser.add_argument("--save-baseline", metavar="NAME", help="run load mode and store it as a named baseline")
+    parser.add_argument("--compare-baseline", metavar="NAME",
+                        help="run load mode and exit non-zero if it regressed against a baseline")
+    parser.add_argument("--baseline-dir", default=None, help="directory holding baseline JSON files")
+    parser.add_argument("--threshold", type=float, default=0.10, help="allowed slowdown before failing, e.g. 0.1 = 10%%")
+    parser.add_argument("--gate-percentile", type=float, default=50, help="latency percentile compared against the baseline")
+    parser.add_argument("--gate-endpoints", nargs="*", default=None,
+                        help="only gate endpoints containing these strings, e.g. /api/admin/stats")
+    parser.add_argument("--scenario", nargs="?", const="default", default=None,
+                        help="run a weighted journey mix: 'default' or a .json/.yaml/.py scenario file")
+    parser.add_argument("--arrival-rate", type=float, default=2.0, help="journeys started per second in scenario mode")
+    parser.add_argument("--max-users", type=int, default=200, help="concurrent journeys before arrivals are dropped")
+    parser.add_argument("--think-scale", type=float, default=1.0, help="multiplier for scenario think times (0 = none)")
+    parser.add_argument("--parallel", type=int, nargs="?", const=0, default=None, metavar="WORKERS",
+                        help="run suites as isolated units on a process pool (default: one worker per core)")
+    parser.add_argument("--profile-payloads", action="store_true",
+                        help="report response bytes, JSON parse time and fetched-but-unread fields per endpoint")
+    parser.add_argument("--pagination", type=int, metavar="N", default=None,
+                        help="seed N products and benchmark limit/skip paging at increasing offsets")
+    parser.add_argument("--page-sizes", type=int, nargs="+", default=[12, 48, 200], help="page sizes to walk")
+    parser.add_argument("--repeats", type=int, default=3, help="walks per series; the fastest per offset is kept")
+    parser.add_argument("--pagination-csv", metavar="PATH", help="write every page's latency to a CSV file")
+    parser.add_argument("--pagination-plot", metavar="PATH", help="save a latency-vs-offset PNG (needs matplotlib)")
+    parser.add_argument("--keep-seeded", action="store_true", help="don't delete the products seeded for benchmarks")
+    parser.add_argument("--stats-bench", action="store_true",
+                        help="benchmark /api/admin/stats as generated order history grows")
+    parser.add_argument("--order-steps", type=int, nargs="+", default=[1000, 10000, 100000],
+                        help="cumulative generated order counts to measure at")
+    parser.add_argument("--stats-samples", type=int, default=20, help="stats requests per step")
+    parser.add_argument("--gen-users", type=int, default=5000, help="users generated for order history")
+    parser.add_argument("--gen-products", type=int, default=1000, help="products generated for order history")
+    parser.add_argument("--gen-run", default="sb", help="id tag of generated rows (use a fresh one with --keep-seeded)")
+    parser.add_argument("--dsn", default=os.environ.get("DATABASE_URL"), help="Postgres URL for generated data")
+    parser.add_argument("--rollup-url", help="candidate fast stats endpoint to verify (JSON revenue/customers)")
+    parser.add_argument("--rollup-sql", help="candidate rollup query returning (revenue, customers) to verify")
+    parser.add_argument("--server-pid", type=int, help="local server process id, to sample its memory")
+    parser.add_argument("--checkout-stress", action="store_true",
+                        help="fire concurrent identical/overlapping checkouts and detect duplicate orders")
+    parser.add_argument("--stress-rounds", type=int, default=10, help="identical verify-payment bursts")
+    parser.add_argument("--stress-copies", type=int, default=5, help="identical requests fired together per burst")
+    parser.add_argument("--stress-buyers", type=int, default=20, help="buyers double-submitting COD checkouts")
+    parser.add_argument("--razorpay-secret", default=None,
+                        help="key secret used to sign fake payments (default: $RAZORPAY_KEY_SECRET)")
+    parser.add_argument("--auth-bench", action="store_true",
+                        help="benchmark bcrypt login throughput and authenticated vs anonymous requests")
+    parser.add_argument("--bcrypt-costs", type=int, nargs="+", default=[8, 10, 12],
+                        help="bcrypt cost factors to hash benchmark users with")
+    parser.add_argument("--soak", action="store_true",
+                        help="run a steady journey mix (default or --scenario FILE) and flag resource drift")
+    parser.add_argument("--soak-window", type=float, default=60.0, help="seconds per soak sampling window")
+    parser.add_argument("--soak-csv", metavar="PATH", help="write every soak window's samples to a CSV file")
+    parser.add_argument("--drift-alpha", type=float, default=0.01, help="Mann-Kendall significance for drift")
+    parser.add_argument("--drift-min-change", type=float, default=0.05,
+                        help="smallest rise over the run, relative to the start, that counts as drift")
+    parser.add_argument("--asset-bench", action="store_true",
+                        help="replay catalogue page loads: image lookups, asset downloads and repeat-load caching")
+    parser.add_argument("--asset-repeats", type=int, default=3, help="warm-cache page loads per variant")
+    parser.add_argument("--browser-connections", type=int, default=6, help="parallel connections per host, as a browser")
+    parser.add_argument("--call-patterns", action="store_true",
+                        help="replay page views and detect N+1 and duplicate API calls")
+    parser.add_argument("--views", nargs="+", default=None,
+                        help="page views to replay in call-pattern mode: home, admin_products, admin_orders")
+    parser.add_argument("--visits", type=int, default=2, help="back-to-back visits per page view")
+    parser.add_argument("--pattern-window", type=float, default=2000.0,
+                        help="milliseconds within which repeated or sibling calls are grouped")
+    parser.add_argument("--n-plus-one-min", type=int, default=3,
+                        help="distinct ids on one route that make an N+1 group")
+    parser.add_argument("--cache-bench", action="store_true",
+                        help="validate ETag/304 and invalidation of the catalogue reads and measure cache hits")
+    parser.add_argument("--cache-repeats", type=int, default=20, help="reads of each catalogue URL per pass")
+    parser.add_argument("--query-profile", action="store_true",
+                        help="per-endpoint SQL cost from pg_stat_statements and declared-index checks (needs --dsn)")
+    parser.add_argument("--profile-requests", type=int, default=10, help="requests per endpoint in query-profile mode")
+    parser.add_argument("--profile-endpoints", nargs="+", metavar="LABEL",
+                        help="endpoints to profile, e.g. 'GET /api/admin/orders' (default: all)")
+    parser.add_argument("--stats-settle", type=float, default=1.5,
+                        help="seconds to wait for Postgres table statistics before each snapshot")
+    parser.add_argument("--results-jsonl", metavar="PATH",
+                        help="stream results and periodic snapshots to a JSONL file (.gz to compress)")
+    parser.add_argument("--snapshot-interval", type=float, default=10.0, help="seconds between JSONL snapshots")
+    parser.add_argument("--metrics-port", type=int, default=None,
+                        help="serve live Prometheus metrics on this port at /metrics")
+    parser.add_argument("--metrics-host", default="127.0.0.1",
+                        help="interface for --metrics-port (default: localhost only; 0.0.0.0 exposes it)")
+    parser.add_argument("--mock", action="store_true", help="run against the in-process mock API server")
+    parser.add_argument("--mock-latency", type=float, default=0.0, help="seconds the mock adds to every response")
+    parser.add_argument("--mock-jitter", type=float, default=0.0, help="extra random mock delay, up to this many seconds")
+    parser.add_argument("--mock-db-latency", type=float, default=0.0,
+                        help="seconds the mock adds to catalogue reads, skipped on a server cache hit")
+    parser.add_argument("--mock-error-rate", type=float, default=0.0, help="probability the mock returns a 500")
+    args = parser.parse_args(argv)
+    if args.suites or args.endpoints:
+        # Only the functional and --parallel runs are made of suites
+        modes = {"--load": args.load, "--scenario": args.scenario, "--soak": args.soak,
+                 "--save-baseline": args.save_baseline, "--compare-baseline": args.compare_baseline,
+                 "--stats-bench": args.stats_bench, "--asset-bench": args.asset_bench,
+                 "--query-profile": args.query_profile, "--cache-bench": args.cache_bench,
+                 "--call-patterns": args.call_patterns, "--auth-bench": args.auth_bench,
+                 "--checkout-stress": args.checkout_stress, "--pagination": args.pagination}
+        chosen = [flag for flag, value in modes.items() if value]
+        if chosen:
+            parser.error(f"--suites/--endpoints only apply to functional and --parallel runs, not {chosen[0]}")
+    args.suites = select_suites(args.suites, args.endpoints)
+    if args.call_patterns:
+        from tests.call_patterns import PAGE_VIEWS
+        unknown = sorted(set(args.views or ()) - set(PAGE_VIEWS))
+        if unknown:
+            parser.error(f"unknown page views: {', '.join(unknown)}")
+        args.views = args.views or list(PAGE_VIEWS)
+    if args.query_profile and args.profile_endpoints:
+        from tests.query_profiler import ENDPOINTS
+        unknown = [label for label in args.profile_endpoints if label not in ENDPOINTS]
+        if unknown:
+            parser.error(f"unknown endpoints: {', '.join(unknown)} (choose from: {', '.join(ENDPOINTS)})")
+    if not 0 < args.gate_percentile <= 100:
+        parser.error("--gate-percentile must be in (0, 100]")
+    if args.endpoints and not args.suites:
+        parser.error(f"no suite covers a route matching {', '.join(args.endpoints)}")
+    return args
+
 if __name__ == "__main__":
-    tester = JewelleryAPITester()
-    passed, failed, results = tester.run_all_tests()
+    args = parse_args()
+    base_url = args.base_url.rstrip("/")
+    mock = None
+    if args.mock:
+        # Serve the API from an in-process stand-in instead of the remote preview host
+        from tests.mock_server import MockBackend
+        mock = MockBackend(latency=args.mock_latency, jitter=args.mock_jitter, error_rate=args.mock_error_rate,
+                           route_latency={"/api/products": args.mock_db_latency} if args.mock_db_latency else None)
+        base_url = mock.start()
+    if args.save_baseline or args.compare_baseline:
+        raise SystemExit(run_benchmark_mode(args, base_url))
+    if args.stats_bench:
+        raise SystemExit(run_stats_mode(args, base_url, mock))
+    if args.asset_bench:
+        run_asset_mode(args, base_url)
+        raise SystemExit(0)
+    if args.query_profile:
+        raise SystemExit(run_query_profile_mode(args, base_url, mock))
+    if args.cache_bench:
+        raise SystemExit(run_cache_mode(args, base_url, mock))
+    if args.call_patterns:
+        run_call_patterns_mode(args, base_url)
+        raise SystemExit(0)
+    if args.soak:
+        raise SystemExit(run_soak_mode(args, base_url))
+    if args.auth_bench:
+        run_auth_mode(args, base_url, mock)
+        raise SystemExit(0)
+    if args.checkout_stress:
+        raise SystemExit(run_checkout_mode(args, base_url))
+    if args.pagination:
+        run_pagination_mode(args, base_url, mock)
+        raise SystemExit(0)
+    if args.scenario:
+        run_scenario_mode(args, base_url)
+        raise SystemExit(0)
+    if args.load:
+        run_load_mode(args, base_url)
+        raise SystemExit(0)
+
+    histograms = None
+    profiler = None
+    if args.parallel is not None:
+        passed, failed, results = run_parallel_mode(args, base_url)
+    else:
+        from tests.http_client import print_connection_stats
+        client = make_client(args)
+        if args.profile_payloads:
+            client, profiler = profile_payloads(client)
+        http, recorder = client, None
+        if args.metrics_port is not None:
+            from tests.loadgen import LatencyRecorder, TimedClient
+            recorder = LatencyRecorder()
+            http = TimedClient(client, recorder)
+        sink, metrics = start_observers(args, recorder, snapshot=recorder.report if recorder else None)
+        tester = JewelleryAPITester(base_url=base_url, http=http, sink=sink)
+        passed, failed, results = tester.run_all_tests(args.suites, args.iterations, args.duration)
+        stop_observers(sink, metrics)
+        if profiler:
+            from tests.payload_profiler import print_payload_report
+            print_payload_report(profiler.report())
+        print_connection_stats(client.stats.snapshot())
+        histograms = client.histograms.to_dict()
+        client.close()
     
     # Save results to file
-    with open('/app/test_results_backend.json', 'w') as f:
+    with open(args.output, 'w') as f:
         json.dump({
             'summary': {
-                'total': len(results),
+                'total': passed + failed,
                 'passed': passed,
                 'failed': failed,
-                'success_rate': f"{(passed/len(results))*100:.1f}%"
+                'success_rate': f"{(passed/(passed + failed))*100 if passed + failed else 0:.1f}%"
             },
+            'results_stream': args.results_jsonl,
+            'latency_histograms': histograms,
+            'payload_profile': profiler.report() if profiler else None,
             'results': results
         }, f, indent=2)
     
-    print(f"\nDetailed results saved to: /app/test_results_backend.json")
\ No newline at end of file
+    print(f"\nDetailed results saved to: {args.output}")
+    # Non-zero on any failed check, so deploy hooks can gate on a smoke run
+    raise SystemExit(1 if failed else 0)
@@ -0,0 +1,203 @@
+"""
+Image and static asset delivery benchmark for the catalogue page.
+
+The home page lists products with excludeImage=true and every ProductCard
+then asks /api/products/[id]/image for its imagePath before the browser can
+download the image itself - featured products are rendered twice, so they
+are looked up twice. This replays that page load the way a browser would (six
+connections per host, an HTTP cache honouring Cache-Control, ETag and
+Last-Modified) and compares it with two alternatives:
+
+    n_plus_one  what the page does today
+    prefetched  one lookup per distinct product, all issued together at page start
+    batched     a single listing that includes imagePath, no lookups at all
+
+Each variant is loaded cold and then repeatedly with a warm cache, so the
+report shows both what the lookups add to page latency and how well
+conditional requests cut repeat-load bytes.
+"""
+
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from email.utils import parsedate_to_datetime
+from urllib.parse import urlencode
+
+VARIANTS = ("n_plus_one", "prefetched", "batched")
+
+
+class BrowserCache:
+    """Per-URL body, validators and freshness lifetime, as a browser HTTP cache keeps them"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.entries = {}
+
+    def lookup(self, url):
+        with self.lock:
+            return self.entries.get(url)
+
+    def store(self, url, response, body):
+        cache_control = response.headers.get("Cache-Control", "").lower()
+        if "no-store" in cache_control:
+            return
+        directives = dict(part.strip().partition("=")[::2] for part in cache_control.split(",") if part.strip())
+        now = time.time()
+        if "max-age" in directives:
+            lifetime = int(directives["max-age"] or 0)
+        elif response.headers.get("Last-Modified"):
+            # Heuristic freshness: a tenth of the resource's age, as browsers apply
+            lifetime = max(now - parsedate_to_datetime(response.headers["Last-Modified"]).timestamp(), 0) / 10
+        else:
+            lifetime = 0
+        if "no-cache" in directives:
+            lifetime = 0
+        with self.lock:
+            self.entries[url] = {"body": body, "etag": response.headers.get("ETag"),
+                                 "last_modified": response.headers.get("Last-Modified"), "expires": now + lifetime}
+
+
+class PageStats:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.values = {"api_calls": 0, "api_bytes": 0, "lookup_calls": 0, "lookup_ms": 0.0, "asset_requests": 0,
+                       "asset_bytes": 0, "asset_ms": 0.0, "not_modified": 0, "fresh_hits": 0, "inline_images": 0,
+                       "inline_bytes": 0}
+
+    def add(self, **values):
+        with self.lock:
+            for name, value in values.items():
+                self.values[name] += value
+
+
+def fetch(http, url, cache, stats, kind, params=None):
+    """GET through the browser cache; returns the body (bytes)"""
+    key = f"{url}?{urlencode(params)}" if params else url
+    entry = cache.lookup(key)
+    if entry and entry["expires"] > time.time():
+        stats.add(fresh_hits=1)
+        return entry["body"]
+    headers = {}
+    if entry and entry["etag"]:
+        headers["If-None-Match"] = entry["etag"]
+    elif entry and entry["last_modified"]:
+        headers["If-Modified-Since"] = entry["last_modified"]
+    start = time.perf_counter()
+    response = http.get(url, params=params, headers=headers)
+    body = response.content
+    elapsed_ms = (time.perf_counter() - start) * 1000
+    if kind == "asset":
+        stats.add(asset_requests=1, asset_bytes=len(body), asset_ms=elapsed_ms)
+    else:
+        stats.add(api_calls=1, api_bytes=len(body))
+        if kind == "lookup":
+            stats.add(lookup_calls=1, lookup_ms=elapsed_ms)
+    if response.status_code == 304 and entry:
+        stats.add(not_modified=1)
+        return entry["body"]
+    if response.status_code >= 400:
+        raise RuntimeError(f"GET {url}: HTTP {response.status_code}")
+    cache.store(key, response, body)
+    return body
+
+
+def load_page(http, base_url, variant, cache, connections=6):
+    """One catalogue page load; returns its stats with page_ms (until every image is available)"""
+    origin = base_url[:-len("/api")] if base_url.endswith("/api") else base_url
+    stats = PageStats()
+    started = set()
+    started_lock = threading.Lock()
+
+    def download(image_path):
+        if not image_path:
+            return
+        if image_path.startswith("data:"):
+            # seed.js stores images inline, so they arrive inside the JSON instead
+            stats.add(inline_images=1, inline_bytes=len(image_path))
+            return
+        with started_lock:
+            # The browser's memory cache shares one download per URL within a page
+            if image_path in started:
+                return
+            started.add(image_path)
+        fetch(http, origin + image_path, cache, stats, "asset")
+
+    def card(product_id):
+        body = fetch(http, f"{base_url}/products/{product_id}/image", cache, stats, "lookup")
+        download(json.loads(body).get("imagePath"))
+
+    start = time.perf_counter()
+    params = None if variant == "batched" else {"excludeImage": "true"}
+    products = json.loads(fetch(http, f"{base_url}/products", cache, stats, "listing", params=params))
+    if variant == "batched":
+        with ThreadPoolExecutor(max_workers=connections) as pool:
+            list(pool.map(download, [product.get("imagePath") for product in products]))
+    elif variant == "prefetched":
+        ids = list(dict.fromkeys(product["id"] for product in products))
+        # Lookups go out together (Promise.all over HTTP/2); downloads still share the browser's connections
+        with ThreadPoolExecutor(max_workers=max(len(ids), 1)) as pool:
+            paths = list(pool.map(lambda product_id: json.loads(fetch(
+                http, f"{base_url}/products/{product_id}/image", cache, stats, "lookup")).get("imagePath"), ids))
+        with ThreadPoolExecutor(max_workers=connections) as pool:
+            list(pool.map(download, paths))
+    else:
+        # FeaturedProducts and ProductGrid both render featured products, each card fetching its own image
+        cards = [product["id"] for product in products if product.get("isFeatured")]
+        cards += [product["id"] for product in products]
+        with ThreadPoolExecutor(max_workers=connections) as pool:
+            list(pool.map(card, cards))
+    return dict(stats.values, page_ms=(time.perf_counter() - start) * 1000, products=len(products))
+
+
+def run_asset_benchmark(client, base_url, repeats=3, connections=6, variants=VARIANTS):
+    """Per variant: one cold load and `repeats` warm loads sharing a cache. Returns {variant: {"cold", "warm"}}"""
+    report = {}
+    for variant in variants:
+        http = client.fork()
+        cache = BrowserCache()
+        cold = load_page(http, base_url, variant, cache, connections)
+        warm = [load_page(http, base_url, variant, cache, connections) for _ in range(repeats)]
+        report[variant] = {"cold": cold, "warm": {name: sum(load[name] for load in warm) / len(warm)
+                                                  for name in cold} if warm else None}
+    return report
+
+
+def print_asset_report(report):
+    """Per-variant page cost table, the N+1 penalty and cache effectiveness"""
+    print("=" * 110)
+    print("ASSET DELIVERY PER CATALOGUE PAGE LOAD")
+    print("=" * 110)
+    print(f"{'Variant':<12}{'Load':<6}{'Page ms':>9}{'API calls':>10}{'API KB':>9}{'Lookups':>9}{'Lookup ms':>11}"
+          f"{'Assets':>8}{'Asset KB':>10}{'304s':>6}{'Fresh':>7}{'Inline KB':>11}")
+    for variant, loads in report.items():
+        for name in ("cold", "warm"):
+            load = loads[name]
+            if load is None:
+                continue
+            print(f"{variant:<12}{name:<6}{load['page_ms']:>9.1f}{load['api_calls']:>10.1f}"
+                  f"{load['api_bytes'] / 1024:>9.1f}{load['lookup_calls']:>9.1f}{load['lookup_ms']:>11.1f}"
+                  f"{load['asset_requests']:>8.1f}{load['asset_bytes'] / 1024:>10.1f}{load['not_modified']:>6.1f}"
+                  f"{load['fresh_hits']:>7.1f}{load['inline_bytes'] / 1024:>11.1f}")
+    print("(warm rows are means over the repeat loads)")
+
+    current = report.get("n_plus_one")
+    if current:
+        cold = current["cold"]
+        redundant = cold["lookup_calls"] - cold["products"]
+        print(f"\nN+1 image lookups: {cold['lookup_calls']} round trips ({redundant} for cards rendered twice), "
+              f"{cold['lookup_ms']:.1f} ms of request time")
+        for alternative in ("prefetched", "batched"):
+            if alternative in report:
+                saved = cold["page_ms"] - report[alternative]["cold"]["page_ms"]
+                share = abs(saved) / cold["page_ms"] * 100 if cold["page_ms"] else 0
+                print(f"  {alternative}: cold page load {report[alternative]['cold']['page_ms']:.1f} ms, "
+                      f"{'saves' if saved >= 0 else 'costs'} {abs(saved):.1f} ms ({share:.0f}%) vs today")
+        warm = current["warm"]
+        if warm:
+            transferred = warm["api_bytes"] + warm["asset_bytes"]
+            cold_bytes = cold["api_bytes"] + cold["asset_bytes"]
+            revalidated = warm["not_modified"] / warm["asset_requests"] * 100 if warm["asset_requests"] else 0
+            print(f"Repeat loads transfer {transferred / 1024:.1f} KB vs {cold_bytes / 1024:.1f} KB cold "
+                  f"({(1 - transferred / cold_bytes) * 100 if cold_bytes else 0:.0f}% saved); "
+                  f"{revalidated:.0f}% of asset requests answered 304, {warm['fresh_hits']:.1f} served fresh")
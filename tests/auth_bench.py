@@ -0,0 +1,227 @@
+"""
+Auth hot-path benchmark: bcrypt login throughput and JWT verification overhead.
+
+/api/auth/login runs bcryptjs.compare and every admin route (and /api/auth/me)
+runs jwt.verify, all CPU-bound on the server's event loop. This measures
+login throughput for users hashed at several bcrypt cost factors, and the
+latency and server CPU of authenticated requests against equivalent anonymous
+ones, to size instances and judge whether caching token verification pays.
+Server CPU comes from /proc, so it needs the server's pid (or the mock's
+serving thread). Hashing the benchmark users needs the bcrypt package.
+"""
+
+import secrets
+import threading
+import time
+
+from tests.datagen import LOADTEST_PASSWORD, USER_COLUMNS, copy_line, hash_password
+from tests.metrics import LatencyHistogram, process_cpu_seconds
+from tests.mock_server import cuid
+from tests.pagination import admin_login
+
+EMAIL_PREFIX = "authbench_"
+
+# (label, authenticated request, anonymous request doing the same work minus auth)
+OVERHEAD_PAIRS = (
+    ("GET /api/auth/me", ("user", "GET", "/auth/me", None), ("anon", "GET", "/auth/me", None)),
+    ("product listing", ("admin", "GET", "/admin/products", {"limit": 12, "excludeImage": "true"}),
+     ("anon", "GET", "/products", {"limit": 12, "excludeImage": "true"})),
+)
+
+
+def bench_users(cost, count, run):
+    """User rows sharing one bcrypt hash of LOADTEST_PASSWORD at `cost`"""
+    hashed = hash_password(LOADTEST_PASSWORD, cost)
+    now = time.strftime("%Y-%m-%d %H:%M:%S")
+    return [(cuid(), f"{EMAIL_PREFIX}{run}_c{cost}_{index}@example.com", hashed, "USER", now, now)
+            for index in range(count)]
+
+
+class MockUsers:
+    def __init__(self, backend):
+        self.store = backend.store
+
+    def add(self, rows):
+        for row in rows:
+            self.store.add_user(dict(zip(USER_COLUMNS, row)))
+
+    def cleanup(self, run):
+        pass
+
+
+class PostgresUsers:
+    def __init__(self, sink):
+        self.sink = sink
+
+    def add(self, rows):
+        self.sink.copy("User", USER_COLUMNS, (copy_line(row) for row in rows))
+        self.sink.commit()
+
+    def cleanup(self, run):
+        self.sink.execute('DELETE FROM "User" WHERE email LIKE %s', (f"{EMAIL_PREFIX}{run}_%",))
+        self.sink.commit()
+
+
+class CpuMeter:
+    """Server CPU seconds used inside a with-block; None when /proc can't be read"""
+
+    def __init__(self, pid, tid=None):
+        self.pid = pid
+        self.tid = tid
+        self.seconds = None
+
+    def __enter__(self):
+        self._start = process_cpu_seconds(self.pid, self.tid) if self.pid else None
+        return self
+
+    def __exit__(self, *exc_info):
+        end = process_cpu_seconds(self.pid, self.tid) if self.pid else None
+        if self._start is not None and end is not None:
+            self.seconds = end - self._start
+
+
+def hammer(make_call, workers, duration):
+    """
+    Call make_call(worker)() in a loop on `workers` threads for `duration`
+    seconds; a connection error or timeout counts as a failed request
+    """
+    from requests import RequestException
+
+    histogram = LatencyHistogram()
+    lock = threading.Lock()
+    counts = {"requests": 0, "errors": 0}
+    deadline = time.perf_counter() + duration
+
+    def worker(index):
+        call = make_call(index)
+        while time.perf_counter() < deadline:
+            start = time.perf_counter()
+            try:
+                failed = call().status_code >= 400
+            except RequestException:
+                failed = True
+            elapsed = time.perf_counter() - start
+            with lock:
+                histogram.record(elapsed)
+                counts["requests"] += 1
+                counts["errors"] += failed
+
+    threads = [threading.Thread(target=worker, args=(index,)) for index in range(workers)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return histogram, counts["requests"], counts["errors"], time.perf_counter() - start
+
+
+def _result(histogram, requests, errors, wall_s, cpu):
+    return {
+        "requests": requests,
+        "errors": errors,
+        "per_s": requests / wall_s if wall_s else 0.0,
+        "p50_ms": histogram.value_at_percentile(50),
+        "p95_ms": histogram.value_at_percentile(95),
+        "cpu_ms_per_request": cpu.seconds * 1000 / requests if cpu.seconds is not None and requests else None,
+        "server_cores": cpu.seconds / wall_s if cpu.seconds is not None and wall_s else None,
+    }
+
+
+def login_throughput(client, base_url, emails, workers, duration, server_pid=None, server_tid=None):
+    """Log in as the given users round-robin from `workers` threads"""
+
+    def make_call(index):
+        http = client.fork()
+        position = [index]
+
+        def call():
+            email = emails[position[0] % len(emails)]
+            position[0] += workers
+            return http.post(f"{base_url}/auth/login", json={"email": email, "password": LOADTEST_PASSWORD})
+        return call
+
+    with CpuMeter(server_pid, server_tid) as cpu:
+        histogram, requests, errors, wall_s = hammer(make_call, workers, duration)
+    return _result(histogram, requests, errors, wall_s, cpu)
+
+
+def request_overhead(clients, base_url, request, workers, duration, server_pid=None, server_tid=None):
+    role, method, path, params = request
+
+    def make_call(index):
+        http = clients[role].fork() if role == "anon" else clients[role]
+        return lambda: http.request(method, f"{base_url}{path}", params=params)
+
+    with CpuMeter(server_pid, server_tid) as cpu:
+        histogram, requests, errors, wall_s = hammer(make_call, workers, duration)
+    return _result(histogram, requests, errors, wall_s, cpu)
+
+
+def run_auth_benchmark(client, base_url, users, costs=(8, 10, 12), users_per_cost=20, workers=4, duration=10,
+                       server_pid=None, server_tid=None):
+    """
+    Returns {"login": {cost: result}, "overhead": {label: {"auth": result, "anon": result}}}.
+    users is a MockUsers or PostgresUsers target the bench users are inserted into.
+    """
+    run = secrets.token_hex(3)
+    report = {"login": {}, "overhead": {}}
+    try:
+        first_email = None
+        for cost in costs:
+            rows = bench_users(cost, users_per_cost, run)
+            users.add(rows)
+            first_email = first_email or rows[0][1]
+            report["login"][cost] = login_throughput(client, base_url, [row[1] for row in rows], workers, duration,
+                                                     server_pid, server_tid)
+
+        user_client = client.fork()
+        response = user_client.post(f"{base_url}/auth/login",
+                                    json={"email": first_email, "password": LOADTEST_PASSWORD})
+        if response.status_code != 200:
+            raise RuntimeError(f"Bench user login failed: HTTP {response.status_code}")
+        admin_client = client.fork()
+        admin_login(admin_client, base_url)
+        clients = {"user": user_client, "admin": admin_client, "anon": client}
+        for label, authed, anonymous in OVERHEAD_PAIRS:
+            report["overhead"][label] = {
+                "auth": request_overhead(clients, base_url, authed, workers, duration, server_pid, server_tid),
+                "anon": request_overhead(clients, base_url, anonymous, workers, duration, server_pid, server_tid),
+            }
+    finally:
+        users.cleanup(run)
+    return report
+
+
+def _fmt(value, width, decimals):
+    return f"{value:>{width}.{decimals}f}" if value is not None else f"{'-':>{width}}"
+
+
+def print_auth_report(report):
+    """Print login throughput per cost and the latency/CPU cost of authentication"""
+    print("=" * 100)
+    print("LOGIN THROUGHPUT BY BCRYPT COST")
+    print("=" * 100)
+    print(f"{'Cost':>5}{'Logins':>9}{'Errors':>8}{'Logins/s':>10}{'p50 ms':>10}{'p95 ms':>10}"
+          f"{'CPU ms/login':>14}{'Logins/core/s':>15}")
+    for cost, result in report["login"].items():
+        per_core = 1000 / result["cpu_ms_per_request"] if result["cpu_ms_per_request"] else None
+        print(f"{cost:>5}{result['requests']:>9}{result['errors']:>8}{result['per_s']:>10.1f}"
+              f"{result['p50_ms']:>10.1f}{result['p95_ms']:>10.1f}{_fmt(result['cpu_ms_per_request'], 14, 2)}"
+              f"{_fmt(per_core, 15, 1)}")
+
+    print("\n" + "=" * 100)
+    print("AUTHENTICATED VS ANONYMOUS")
+    print("=" * 100)
+    print(f"{'Request':<20}{'Mode':<7}{'Reqs':>8}{'Req/s':>10}{'p50 ms':>10}{'p95 ms':>10}{'CPU ms/req':>12}")
+    for label, modes in report["overhead"].items():
+        for mode in ("auth", "anon"):
+            result = modes[mode]
+            print(f"{label:<20}{mode:<7}{result['requests']:>8}{result['per_s']:>10.1f}{result['p50_ms']:>10.2f}"
+                  f"{result['p95_ms']:>10.2f}{_fmt(result['cpu_ms_per_request'], 12, 3)}")
+        auth, anon = modes["auth"], modes["anon"]
+        line = f"  auth adds {auth['p50_ms'] - anon['p50_ms']:+.2f} ms at p50"
+        if auth["cpu_ms_per_request"] and anon["cpu_ms_per_request"] is not None:
+            extra = auth["cpu_ms_per_request"] - anon["cpu_ms_per_request"]
+            line += (f", {extra:+.3f} CPU ms/request "
+                     f"({max(extra, 0) / auth['cpu_ms_per_request'] * 100:.0f}% of the authenticated request's CPU)")
+        print(line)
@@ -0,0 +1,181 @@
+"""
+Named benchmark baselines and the latency regression gate.
+
+A baseline stores each endpoint's latency histogram and throughput from a
+load run. A later run is compared endpoint by endpoint with a bootstrap
+confidence interval on the ratio current/baseline of a latency quantile, so
+one noisy sample cannot pass or fail the gate on its own.
+"""
+
+import json
+import math
+import os
+import random
+from datetime import datetime
+
+DEFAULT_BASELINE_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "benchmarks")
+
+# Fewer samples than this give a confidence interval too wide to gate on
+MIN_SAMPLES = 20
+# Bootstrap resamples are capped at this many draws; a smaller resample only
+# widens the interval, which errs on the side of not flagging a regression
+MAX_RESAMPLE = 2000
+
+
+def baseline_path(name, directory=DEFAULT_BASELINE_DIR):
+    return os.path.join(directory, f"{name}.json")
+
+
+def save_baseline(name, report, histograms, base_url, elapsed, directory=DEFAULT_BASELINE_DIR):
+    """Write a load run (loadgen report + histogram dicts) as a named baseline"""
+    os.makedirs(directory, exist_ok=True)
+    baseline = {
+        "name": name,
+        "created": datetime.now().isoformat(),
+        "base_url": base_url,
+        "elapsed_s": elapsed,
+        "endpoints": {
+            label: {
+                "throughput_rps": stats["throughput_rps"],
+                "errors": stats["errors"],
+                "histogram": histograms[label],
+            }
+            for label, stats in report.items()
+        },
+    }
+    path = baseline_path(name, directory)
+    with open(path, "w") as f:
+        json.dump(baseline, f, indent=2)
+    return path
+
+
+def load_baseline(name, directory=DEFAULT_BASELINE_DIR):
+    with open(baseline_path(name, directory)) as f:
+        return json.load(f)
+
+
+def _quantile(sorted_values, pct):
+    rank = max(math.ceil(pct / 100.0 * len(sorted_values)), 1)
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+def bucket_quantile(histogram, pct):
+    """Any percentile of a LatencyHistogram.to_dict(), read off its bucket counts (ms)"""
+    rank = max(math.ceil(pct / 100.0 * histogram["count"]), 1)
+    seen = 0
+    for value, count in histogram["buckets"]:
+        seen += count
+        if seen >= rank:
+            return value
+    return histogram["buckets"][-1][0] if histogram["buckets"] else 0.0
+
+
+def _resample(values, weights, n, rng):
+    return sorted(rng.choices(values, weights=weights, k=n))
+
+
+def bootstrap_ratio(baseline_hist, current_hist, pct=50, iterations=1000, confidence=0.95, seed=None):
+    """
+    Bootstrap CI for quantile(current) / quantile(baseline).
+
+    Both inputs are LatencyHistogram.to_dict() outputs; samples are redrawn
+    from their bucket distributions. Returns (point_estimate, low, high).
+    """
+    rng = random.Random(seed)
+    base_values, base_weights = zip(*baseline_hist["buckets"])
+    cur_values, cur_weights = zip(*current_hist["buckets"])
+    base_n = min(baseline_hist["count"], MAX_RESAMPLE)
+    cur_n = min(current_hist["count"], MAX_RESAMPLE)
+
+    ratios = []
+    for _ in range(iterations):
+        base_q = _quantile(_resample(base_values, base_weights, base_n, rng), pct)
+        cur_q = _quantile(_resample(cur_values, cur_weights, cur_n, rng), pct)
+        ratios.append(cur_q / base_q if base_q > 0 else math.inf)
+    ratios.sort()
+
+    tail = (1 - confidence) / 2
+    low = ratios[int(tail * (iterations - 1))]
+    high = ratios[int(math.ceil((1 - tail) * (iterations - 1)))]
+    base_point = bucket_quantile(baseline_hist, pct)
+    point = bucket_quantile(current_hist, pct) / base_point if base_point > 0 else math.inf
+    return point, low, high
+
+
+def compare_to_baseline(baseline, report, histograms, threshold=0.10, pct=50, endpoints=None,
+                        iterations=1000, confidence=0.95, seed=None):
+    """
+    Compare a load run against a stored baseline.
+
+    An endpoint regresses when the whole confidence interval of its latency
+    ratio sits above 1 + threshold. Throughput is one number per run, with no
+    interval to test, so its ratio is reported but not gated on. A baseline
+    endpoint the run never called is "missing", and a gated pattern no
+    endpoint matches is "no match"; both fail the gate like a regression.
+    Returns a list of per-endpoint verdict dicts.
+    """
+    def gated(label):
+        return not endpoints or any(endpoint in label for endpoint in endpoints)
+
+    verdicts = []
+    for pattern in endpoints or ():
+        if not any(pattern in label for label in list(report) + list(baseline["endpoints"])):
+            verdicts.append({"endpoint": pattern, "status": "no match", "metric": f"p{pct:g}"})
+    for label in sorted(baseline["endpoints"]):
+        if gated(label) and label not in report:
+            verdicts.append({"endpoint": label, "status": "missing", "metric": f"p{pct:g}"})
+    for label, stats in sorted(report.items()):
+        if not gated(label):
+            continue
+        base = baseline["endpoints"].get(label)
+        current_hist = histograms[label]
+        verdict = {"endpoint": label, "status": "ok", "metric": f"p{pct:g}"}
+        if base is None:
+            verdict["status"] = "new"
+            verdicts.append(verdict)
+            continue
+        if base["histogram"]["count"] < MIN_SAMPLES or current_hist["count"] < MIN_SAMPLES:
+            verdict["status"] = "insufficient samples"
+            verdicts.append(verdict)
+            continue
+
+        point, low, high = bootstrap_ratio(base["histogram"], current_hist, pct=pct, iterations=iterations,
+                                           confidence=confidence, seed=seed)
+        throughput_ratio = (stats["throughput_rps"] / base["throughput_rps"]
+                            if base["throughput_rps"] else math.inf)
+        verdict.update({
+            "baseline_ms": bucket_quantile(base["histogram"], pct),
+            "current_ms": bucket_quantile(current_hist, pct),
+            "ratio": point,
+            "ci_low": low,
+            "ci_high": high,
+            "throughput_ratio": throughput_ratio,
+        })
+        if low > 1 + threshold:
+            verdict["status"] = "regressed"
+        elif high < 1 - threshold:
+            verdict["status"] = "improved"
+        verdicts.append(verdict)
+    return verdicts
+
+
+# Verdicts that fail the gate
+FAILING = ("regressed", "missing", "no match")
+
+
+def print_comparison(baseline_name, verdicts, threshold, confidence=0.95):
+    """Print the per-endpoint verdicts; returns True when any endpoint regressed or went unmeasured"""
+    print("=" * 100)
+    print(f"BENCHMARK COMPARISON vs baseline '{baseline_name}' "
+          f"(threshold {threshold * 100:.0f}%, {confidence * 100:.0f}% bootstrap CI)")
+    print("=" * 100)
+    regressed = False
+    for verdict in verdicts:
+        line = f"{verdict['endpoint']:<45}{verdict['status']:>22}"
+        if "ratio" in verdict:
+            line += (f"  {verdict['metric']} {verdict['baseline_ms']:.1f} -> {verdict['current_ms']:.1f} ms"
+                     f"  x{verdict['ratio']:.2f} [{verdict['ci_low']:.2f}, {verdict['ci_high']:.2f}]"
+                     f"  rps x{verdict['throughput_ratio']:.2f}")
+        print(line)
+        regressed = regressed or verdict["status"] in FAILING
+    return regressed
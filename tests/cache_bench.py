@@ -0,0 +1,239 @@
+"""
+Catalogue response-cache validation and cache-hit benchmark.
+
+/api/products and /api/products/[id]/image are force-dynamic and query
+Postgres on every call although the catalogue rarely changes. Before putting
+an ETag or server-side cache in front of them this checks, per cache layer:
+
+    validators    an ETag (or Last-Modified) that is stable across identical
+                  reads and answered with an empty 304 on a conditional GET
+    invalidation  a probe product created, edited and deleted through the
+                  admin API shows up - new price, new image, gone - on the
+                  very next revalidated read; a 304 or old content is a stale
+                  read, i.e. a customer being shown the wrong price
+    hit rate      repeated plain and conditional reads: latency, bytes, 304
+                  share and server cache hits (X-Cache), and what they save
+
+Against the mock every layer in mock_server.CACHE_LAYERS is measured; against
+a real deployment the layer it runs today.
+"""
+
+import secrets
+import time
+from urllib.parse import quote
+
+from tests.metrics import LatencyHistogram
+from tests.mock_server import CACHE_LAYERS
+
+
+def catalogue_urls(http, base_url):
+    """The public reads the storefront issues: both listings, a category filter and an image lookup"""
+    urls = [f"{base_url}/products", f"{base_url}/products?excludeImage=true"]
+    products = http.get(urls[1]).json()
+    if products:
+        urls.append(f"{base_url}/products?category={quote(products[0]['category'])}")
+        urls.append(f"{base_url}/products/{products[0]['id']}/image")
+    return urls
+
+
+def check_validators(http, url):
+    """Validator presence and stability, and whether a conditional GET gets an empty 304"""
+    first, second = http.get(url), http.get(url)
+    etag, last_modified = first.headers.get("ETag"), first.headers.get("Last-Modified")
+    result = {"url": url, "etag": etag, "last_modified": last_modified, "stable": None, "conditional_status": None,
+              "ok": False}
+    if etag:
+        result["stable"] = second.headers.get("ETag") == etag
+        response = http.get(url, headers={"If-None-Match": etag})
+    elif last_modified:
+        result["stable"] = second.headers.get("Last-Modified") == last_modified
+        response = http.get(url, headers={"If-Modified-Since": last_modified})
+    else:
+        return result
+    result["conditional_status"] = response.status_code
+    result["ok"] = result["stable"] and response.status_code == 304 and not response.content
+    return result
+
+
+def bench_reads(http, urls, repeats=20, conditional=False):
+    """
+    Read every URL `repeats` times. Conditional reads send the last ETag seen
+    for the URL, as a browser revalidating its cache does.
+    """
+    histogram = LatencyHistogram()
+    validators = {}
+    stats = {"requests": 0, "bytes": 0, "not_modified": 0, "server_hits": 0, "server_misses": 0}
+    for _ in range(repeats):
+        for url in urls:
+            headers = {"If-None-Match": validators[url]} if conditional and url in validators else {}
+            start = time.perf_counter()
+            response = http.get(url, headers=headers)
+            body = response.content
+            histogram.record(time.perf_counter() - start)
+            stats["requests"] += 1
+            stats["bytes"] += len(body)
+            stats["not_modified"] += response.status_code == 304
+            stats["server_hits"] += response.headers.get("X-Cache") == "HIT"
+            stats["server_misses"] += response.headers.get("X-Cache") == "MISS"
+            if response.status_code == 200 and response.headers.get("ETag"):
+                validators[url] = response.headers["ETag"]
+    looked_up = stats["server_hits"] + stats["server_misses"]
+    return dict(stats, mean_ms=histogram.mean(), p50_ms=histogram.value_at_percentile(50),
+                p95_ms=histogram.value_at_percentile(95),
+                revalidated_ratio=stats["not_modified"] / stats["requests"] if stats["requests"] else 0.0,
+                server_hit_ratio=stats["server_hits"] / looked_up if looked_up else None)
+
+
+def check_invalidation(http, admin_http, base_url):
+    """
+    Create, edit and delete a probe product through the admin API, revalidating
+    the catalogue reads after each write. Returns one check per read.
+    """
+    listings = [f"{base_url}/products", f"{base_url}/products?excludeImage=true"]
+    validators = {}
+    checks = []
+
+    def remember(url, response):
+        if response.status_code == 200 and response.headers.get("ETag"):
+            validators[url] = response.headers["ETag"]
+
+    def revalidate(step, url, expect):
+        headers = {"If-None-Match": validators[url]} if url in validators else {}
+        response = http.get(url, headers=headers)
+        if response.status_code == 304:
+            fresh, detail = False, "304 Not Modified after the write"
+        else:
+            fresh, detail = expect(response)
+        remember(url, response)
+        checks.append({"step": step, "url": url, "status": response.status_code, "fresh": fresh, "detail": detail})
+
+    def listed(response, product_id):
+        if response.status_code != 200:
+            return None
+        return next((product for product in response.json() if product["id"] == product_id), None)
+
+    for url in listings:
+        remember(url, http.get(url))
+    probe = {"name": f"Cache Probe {secrets.token_hex(4)}", "price": 111, "category": "Earring",
+             "description": "Temporary product for the cache invalidation check", "imagePath": "/assets/probe-a.jpeg",
+             "inStock": True, "rating": 4.0, "isFeatured": False}
+    response = admin_http.post(f"{base_url}/admin/products", json=probe)
+    if response.status_code != 200:
+        raise RuntimeError(f"Probe product create failed: HTTP {response.status_code} {response.text[:200]}")
+    product_id = response.json()["id"]
+    image_url = f"{base_url}/products/{product_id}/image"
+    deleted = False
+    try:
+        def created(response):
+            product = listed(response, product_id)
+            return product is not None, "listed" if product else "new product missing"
+
+        for url in listings:
+            revalidate("create", url, created)
+        remember(image_url, http.get(image_url))
+
+        response = admin_http.patch(f"{base_url}/admin/products/{product_id}",
+                                    json={"price": 222, "imagePath": "/assets/probe-b.jpeg"})
+        if response.status_code != 200:
+            raise RuntimeError(f"Probe product update failed: HTTP {response.status_code}")
+
+        def repriced(response):
+            product = listed(response, product_id)
+            price = float(product["price"]) if product else None
+            return price == 222, f"price {price:g}" if price is not None else "product missing"
+
+        def new_image(response):
+            path = response.json().get("imagePath") if response.status_code == 200 else None
+            return path == "/assets/probe-b.jpeg", f"imagePath {path}"
+
+        for url in listings:
+            revalidate("update", url, repriced)
+        revalidate("update", image_url, new_image)
+
+        response = admin_http.delete(f"{base_url}/admin/products/{product_id}")
+        deleted = response.status_code == 200
+        if not deleted:
+            raise RuntimeError(f"Probe product delete failed: HTTP {response.status_code}")
+
+        def gone(response):
+            product = listed(response, product_id)
+            return product is None, "still listed" if product else "gone"
+
+        def image_gone(response):
+            return response.status_code == 404, f"HTTP {response.status_code}"
+
+        for url in listings:
+            revalidate("delete", url, gone)
+        revalidate("delete", image_url, image_gone)
+    finally:
+        if not deleted:
+            admin_http.delete(f"{base_url}/admin/products/{product_id}")
+    return checks
+
+
+def run_cache_benchmark(client, admin_client, base_url, repeats=20, mock=None, layers=CACHE_LAYERS):
+    """
+    Validators, invalidation and read cost per cache layer. With a mock each
+    layer is switched on in turn; otherwise the deployment is measured as-is.
+    Returns {layer: {"validators", "invalidation", "plain", "conditional"}}.
+    """
+    report = {}
+    for layer in layers if mock is not None else ("deployed",):
+        if mock is not None:
+            mock.set_catalogue_cache(layer)
+        http = client.fork()
+        urls = catalogue_urls(http, base_url)
+        report[layer] = {
+            "validators": [check_validators(http, url) for url in urls],
+            "invalidation": check_invalidation(http, admin_client, base_url),
+            "plain": bench_reads(http, urls, repeats),
+            "conditional": bench_reads(http, urls, repeats, conditional=True),
+        }
+    return report
+
+
+def _ratio(value):
+    return f"{value * 100:>7.0f}%" if value is not None else f"{'-':>8}"
+
+
+def print_cache_report(report):
+    """Print the per-layer checks and read costs; returns True when no read was stale"""
+    print("=" * 110)
+    print("CATALOGUE CACHE VALIDATION")
+    print("=" * 110)
+    print(f"{'Layer':<10}{'Validators':>12}{'304 ok':>8}{'Stale':>7}{'Mode':>13}{'Mean ms':>9}{'p95 ms':>9}"
+          f"{'KB/req':>9}{'304s':>8}{'Srv hits':>9}")
+    for layer, result in report.items():
+        validators = result["validators"]
+        with_validators = sum(1 for check in validators if check["etag"] or check["last_modified"])
+        stale = sum(1 for check in result["invalidation"] if not check["fresh"])
+        for index, mode in enumerate(("plain", "conditional")):
+            reads = result[mode]
+            prefix = (f"{layer:<10}{f'{with_validators}/{len(validators)}':>12}"
+                      f"{sum(check['ok'] for check in validators):>8}{stale:>7}") if index == 0 else " " * 37
+            print(f"{prefix}{mode:>13}{reads['mean_ms']:>9.2f}{reads['p95_ms']:>9.2f}"
+                  f"{reads['bytes'] / reads['requests'] / 1024:>9.1f}{_ratio(reads['revalidated_ratio'])}"
+                  f"{_ratio(reads['server_hit_ratio']):>9}")
+
+    baseline = report.get("off", {}).get("plain")
+    for layer, result in report.items():
+        plain, conditional = result["plain"], result["conditional"]
+        print(f"\n{layer}")
+        for check in result["validators"]:
+            if not check["etag"] and not check["last_modified"]:
+                print(f"  no ETag/Last-Modified: {check['url']}")
+            elif not check["ok"]:
+                print(f"  validator problem on {check['url']}: stable={check['stable']}, "
+                      f"conditional GET answered {check['conditional_status']}")
+        for check in result["invalidation"]:
+            if not check["fresh"]:
+                print(f"  STALE after {check['step']}: {check['url']} (HTTP {check['status']}, {check['detail']})")
+        saved_bytes = 1 - conditional["bytes"] / plain["bytes"] if plain["bytes"] else 0
+        print(f"  revalidating saves {plain['mean_ms'] - conditional['mean_ms']:+.2f} ms and {saved_bytes * 100:.0f}% "
+              f"of bytes per read")
+        if baseline is not None and layer != "off":
+            print(f"  vs no cache: {baseline['mean_ms'] - conditional['mean_ms']:+.2f} ms per revalidated read, "
+                  f"{baseline['mean_ms'] - plain['mean_ms']:+.2f} ms per plain read")
+    stale = [check for result in report.values() for check in result["invalidation"] if not check["fresh"]]
+    print(f"\n{'No stale reads after admin writes' if not stale else f'{len(stale)} stale reads after admin writes'}")
+    return not stale
@@ -0,0 +1,249 @@
+"""
+Client-driven call-pattern recorder with N+1 and duplicate request detection.
+
+The storefront and admin pages fetch a listing and then let every card or row
+fetch its own image (ProductCard, AdminProductImage, OrderProductImage), and
+FeaturedProducts renders featured products a second time through ProductGrid's
+cards. This replays those page views the way the browser issues them, records
+every call with its timing, and finds within a time window:
+
+    duplicates  the same GET issued more than once - what a response cache or
+                in-flight request coalescing would absorb
+    N+1 groups  one route called for many different ids - what a batched
+                endpoint (one call carrying every id) would replace
+
+and turns both into round trips, request time, wall time and bytes saved.
+"""
+
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlencode
+
+from tests.metrics import endpoint_label
+
+PAGE_SIZE = 20  # app/admin/products/page.js
+
+
+class PageView:
+    """Calls recorded for one simulated page view, in start order"""
+
+    def __init__(self, name):
+        self.name = name
+        self.lock = threading.Lock()
+        self.calls = []
+        self.started = time.perf_counter()
+
+    def add(self, call):
+        with self.lock:
+            self.calls.append(call)
+
+
+class CallRecorder:
+    """Drop-in for the requests module that logs every call into a PageView"""
+
+    def __init__(self, http, view):
+        self.http = http
+        self.view = view
+
+    def take_timing(self):
+        take_timing = getattr(self.http, "take_timing", None)
+        return take_timing() if take_timing else None
+
+    def request(self, method, url, **kwargs):
+        params = kwargs.get("params")
+        full_url = f"{url}?{urlencode(sorted(params.items()))}" if params else url
+        body = kwargs.get("json")
+        start = time.perf_counter()
+        response = self.http.request(method, url, **kwargs)
+        size = len(response.content)
+        end = time.perf_counter()
+        self.view.add({
+            "method": method.upper(), "url": full_url, "label": endpoint_label(method, url),
+            "body": json.dumps(body, sort_keys=True) if body is not None else None, "status": response.status_code,
+            "bytes": size, "start_ms": (start - self.view.started) * 1000, "end_ms": (end - self.view.started) * 1000,
+        })
+        return response
+
+    def get(self, url, **kwargs):
+        return self.request("GET", url, **kwargs)
+
+    def post(self, url, **kwargs):
+        return self.request("POST", url, **kwargs)
+
+    def put(self, url, **kwargs):
+        return self.request("PUT", url, **kwargs)
+
+    def patch(self, url, **kwargs):
+        return self.request("PATCH", url, **kwargs)
+
+    def delete(self, url, **kwargs):
+        return self.request("DELETE", url, **kwargs)
+
+
+def _json(response, url):
+    if response.status_code >= 400:
+        raise RuntimeError(f"GET {url}: HTTP {response.status_code}")
+    return response.json()
+
+
+def _image_lookups(http, base_url, product_ids, connections):
+    """Each mounted card/row fetches /api/products/[id]/image; the browser runs six at a time per host"""
+    with ThreadPoolExecutor(max_workers=connections) as pool:
+        list(pool.map(lambda product_id: http.get(f"{base_url}/products/{product_id}/image"), product_ids))
+
+
+def home_page(http, base_url, connections=6):
+    """app/page.js: listing without images, then FeaturedProducts and ProductGrid cards"""
+    products = _json(http.get(f"{base_url}/products", params={"excludeImage": "true"}), "/products")
+    cards = [product["id"] for product in products if product.get("isFeatured")]
+    cards += [product["id"] for product in products]
+    _image_lookups(http, base_url, cards, connections)
+
+
+def admin_products_page(http, base_url, connections=6, load_more=1):
+    """app/admin/products/page.js: first page, then `load_more` clicks on "Load more" """
+    skip = 0
+    while True:
+        url = f"{base_url}/admin/products"
+        page = _json(http.get(url, params={"limit": PAGE_SIZE, "skip": skip, "excludeImage": "true"}), url)
+        _image_lookups(http, base_url, [product["id"] for product in page if not product.get("imagePath")],
+                       connections)
+        skip += PAGE_SIZE
+        if len(page) < PAGE_SIZE or skip // PAGE_SIZE > load_more:
+            break
+
+
+def admin_orders_page(http, base_url, connections=6):
+    """app/admin/orders/page.js: every order item renders an OrderProductImage"""
+    orders = _json(http.get(f"{base_url}/admin/orders"), "/admin/orders")
+    items = [item["product"] for order in orders for item in order.get("items", [])]
+    _image_lookups(http, base_url, [product["id"] for product in items if not product.get("imagePath")],
+                   connections)
+
+
+# name -> (simulation, needs an admin session)
+PAGE_VIEWS = {
+    "home": (home_page, False),
+    "admin_products": (admin_products_page, True),
+    "admin_orders": (admin_orders_page, True),
+}
+
+
+def _clusters(calls, window_ms):
+    """Split start-ordered calls into bursts no longer than window_ms from their first call"""
+    clusters = []
+    for call in calls:
+        if clusters and call["start_ms"] - clusters[-1][0]["start_ms"] <= window_ms:
+            clusters[-1].append(call)
+        else:
+            clusters.append([call])
+    return clusters
+
+
+def _ms(call):
+    return call["end_ms"] - call["start_ms"]
+
+
+def detect_patterns(calls, window_ms=2000, min_group=3):
+    """
+    Find duplicate GETs and N+1 route groups among one view's calls.
+
+    Duplicates are identical method + URL + body within window_ms of the first;
+    every repeat is a call a response cache would have answered. An N+1 group
+    is min_group or more distinct URLs on one route within the window; batching
+    replaces them with a single call, estimated to cost as much as the slowest
+    of them.
+    """
+    reads = sorted((call for call in calls if call["method"] == "GET"), key=lambda call: call["start_ms"])
+    by_key, by_label = {}, {}
+    for call in reads:
+        by_key.setdefault((call["method"], call["url"], call["body"]), []).append(call)
+        by_label.setdefault(call["label"], []).append(call)
+
+    duplicates = []
+    for (method, url, _), same in by_key.items():
+        for cluster in _clusters(same, window_ms):
+            if len(cluster) > 1:
+                repeats = cluster[1:]
+                duplicates.append({"label": cluster[0]["label"], "url": url, "calls": len(cluster),
+                                   "saved_calls": len(repeats), "saved_ms": sum(_ms(call) for call in repeats),
+                                   "saved_bytes": sum(call["bytes"] for call in repeats)})
+
+    n_plus_one = []
+    for label, group in by_label.items():
+        for cluster in _clusters(group, window_ms):
+            distinct = list({call["url"]: call for call in reversed(cluster)}.values())
+            if len(distinct) < min_group:
+                continue
+            slowest = max(_ms(call) for call in distinct)
+            span = max(call["end_ms"] for call in cluster) - min(call["start_ms"] for call in cluster)
+            n_plus_one.append({"label": label, "calls": len(cluster), "distinct": len(distinct),
+                               "saved_calls": len(distinct) - 1,
+                               "saved_ms": sum(_ms(call) for call in distinct) - slowest,
+                               "saved_wall_ms": max(span - slowest, 0.0),
+                               "bytes": sum(call["bytes"] for call in distinct)})
+    duplicates.sort(key=lambda finding: -finding["saved_calls"])
+    n_plus_one.sort(key=lambda finding: -finding["distinct"])
+    return {"duplicates": duplicates, "n_plus_one": n_plus_one}
+
+
+def run_call_patterns(client, base_url, admin_client=None, views=tuple(PAGE_VIEWS), visits=2, connections=6,
+                      window_ms=2000, min_group=3):
+    """
+    Replay each page view `visits` times back to back (a navigation away and
+    back within the window counts as a re-fetch) and detect its call patterns.
+    Admin views need admin_client; they are skipped without one.
+    """
+    report = {}
+    for name in views:
+        simulate, needs_admin = PAGE_VIEWS[name]
+        if needs_admin and admin_client is None:
+            continue
+        view = PageView(name)
+        http = CallRecorder(admin_client if needs_admin else client, view)
+        for _ in range(visits):
+            simulate(http, base_url, connections)
+        wall_ms = (time.perf_counter() - view.started) * 1000
+        calls = view.calls
+        report[name] = dict(detect_patterns(calls, window_ms, min_group), visits=visits, calls=len(calls),
+                            distinct=len({(call["method"], call["url"], call["body"]) for call in calls}),
+                            request_ms=sum(_ms(call) for call in calls), wall_ms=wall_ms,
+                            bytes=sum(call["bytes"] for call in calls))
+    return report
+
+
+def print_call_pattern_report(report, top=5):
+    """Per-view call counts, then each view's duplicates and N+1 groups with their savings"""
+    print("=" * 100)
+    print("CALL PATTERNS PER PAGE VIEW")
+    print("=" * 100)
+    print(f"{'View':<18}{'Visits':>7}{'Calls':>7}{'Distinct':>9}{'Dupes':>7}{'N+1':>5}{'Req ms':>10}{'Wall ms':>10}"
+          f"{'KB':>9}{'Batch saves':>13}{'Cache saves':>13}")
+    for name, view in report.items():
+        batch = sum(group["saved_calls"] for group in view["n_plus_one"])
+        cache = sum(duplicate["saved_calls"] for duplicate in view["duplicates"])
+        print(f"{name:<18}{view['visits']:>7}{view['calls']:>7}{view['distinct']:>9}{len(view['duplicates']):>7}"
+              f"{len(view['n_plus_one']):>5}{view['request_ms']:>10.1f}{view['wall_ms']:>10.1f}"
+              f"{view['bytes'] / 1024:>9.1f}{batch:>13}{cache:>13}")
+    print("(saves are round trips)")
+
+    for name, view in report.items():
+        if not view["n_plus_one"] and not view["duplicates"]:
+            continue
+        print(f"\n{name}")
+        for group in view["n_plus_one"][:top]:
+            print(f"  N+1 {group['label']}: {group['distinct']} ids in one burst -> a batched call saves "
+                  f"{group['saved_calls']} round trips, {group['saved_ms']:.1f} ms request time, "
+                  f"~{group['saved_wall_ms']:.1f} ms wall")
+        duplicates = view["duplicates"]
+        if duplicates:
+            saved_ms = sum(duplicate["saved_ms"] for duplicate in duplicates)
+            saved_bytes = sum(duplicate["saved_bytes"] for duplicate in duplicates)
+            saved_calls = sum(duplicate["saved_calls"] for duplicate in duplicates)
+            print(f"  {len(duplicates)} URLs requested more than once: a response cache or request coalescing "
+                  f"saves {saved_calls} calls, {saved_ms:.1f} ms, "
+                  f"{saved_bytes / 1024:.1f} KB")
+            for duplicate in duplicates[:top]:
+                print(f"    {duplicate['calls']}x {duplicate['url']}")
@@ -0,0 +1,262 @@
+"""
+Checkout contention and double-order stress test.
+
+/api/orders/cod and /api/razorpay/verify-payment both check the products
+exist and then create the order in a transaction; neither checks whether the
+Razorpay payment (or an identical COD submission) was already turned into an
+order. This fires identical verify-payment calls for one payment at the same
+instant, and many buyers double-submitting COD checkouts for one hot product,
+then measures latency against an uncontended baseline and looks for duplicate
+orders through SQL or /api/admin/orders.
+"""
+
+import os
+import secrets
+import threading
+import time
+
+from tests.metrics import LatencyHistogram
+from tests.mock_server import razorpay_signature
+
+ACTIVITY_SQL = """
+    SELECT count(*) FILTER (WHERE state = 'active'),
+           count(*) FILTER (WHERE state = 'idle in transaction'),
+           count(*) FILTER (WHERE wait_event_type = 'Lock'),
+           count(*)
+    FROM pg_stat_activity
+    WHERE datname = current_database() AND pid <> pg_backend_pid()
+"""
+
+DUPLICATE_PAYMENTS_SQL = """
+    SELECT "razorpayPaymentId", COUNT(*) FROM "Order"
+    WHERE "razorpayPaymentId" = ANY(%s) GROUP BY 1 HAVING COUNT(*) > 1
+"""
+
+DUPLICATE_COD_SQL = """
+    SELECT "userId", COUNT(*) FROM "Order"
+    WHERE "userId" = ANY(%s) AND "paymentType" = 'COD' GROUP BY 1 HAVING COUNT(*) > 1
+"""
+
+SHIPPING_DETAILS = {"firstName": "Stress", "lastName": "Test", "phone": "9876543210", "city": "Mumbai"}
+
+
+def make_buyer(client, base_url):
+    """Sign up a fresh user in its own cookie jar; returns (http, user_id)"""
+    http = client.fork()
+    credentials = {"email": f"stress_{secrets.token_hex(6)}@example.com", "password": secrets.token_hex(8)}
+    response = http.post(f"{base_url}/auth/signup", json=credentials)
+    if response.status_code >= 400:
+        raise RuntimeError(f"Buyer signup failed: HTTP {response.status_code} {response.text[:200]}")
+    return http, response.json()["user"]["id"]
+
+
+def fire_together(calls):
+    """Run the callables on threads released by one barrier; returns [(status, seconds, order_id)]"""
+    barrier = threading.Barrier(len(calls))
+    results = [None] * len(calls)
+
+    def run(index, call):
+        barrier.wait()
+        start = time.perf_counter()
+        try:
+            response = call()
+            order_id = response.json().get("orderId") if response.status_code < 300 else None
+            results[index] = (response.status_code, time.perf_counter() - start, order_id)
+        except Exception as e:
+            results[index] = (type(e).__name__, time.perf_counter() - start, None)
+
+    threads = [threading.Thread(target=run, args=(index, call)) for index, call in enumerate(calls)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return results
+
+
+def verify_call(http, base_url, product, secret):
+    """A signed verify-payment request for a new Razorpay order/payment; returns (payment_id, send)"""
+    response = http.post(f"{base_url}/razorpay/create-order", json={"amount": product["price"]})
+    order_id = response.json()["id"] if response.status_code == 200 else f"order_{secrets.token_hex(7)}"
+    payment_id = f"pay_{secrets.token_hex(7)}"
+    body = {"razorpay_order_id": order_id, "razorpay_payment_id": payment_id,
+            "razorpay_signature": razorpay_signature(order_id, payment_id, secret),
+            "items": [{"product": product, "quantity": 1}], "totalAmount": product["price"]}
+    return payment_id, lambda: http.post(f"{base_url}/razorpay/verify-payment", json=body)
+
+
+def cod_call(http, base_url, product):
+    body = {"items": [{"product": product, "quantity": 1}], "totalAmount": product["price"],
+            "shippingDetails": SHIPPING_DETAILS}
+    return lambda: http.post(f"{base_url}/orders/cod", json=body)
+
+
+class ActivitySampler:
+    """Samples pg_stat_activity on a background thread while a burst runs"""
+
+    def __init__(self, sink, interval=0.05):
+        self.sink = sink
+        self.interval = interval
+        self.samples = []
+        self._stop = threading.Event()
+        self._thread = None
+
+    def __enter__(self):
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self):
+        while not self._stop.is_set():
+            self.samples.append(self.sink.fetchall(ACTIVITY_SQL)[0])
+            self._stop.wait(self.interval)
+
+    def summary(self):
+        if not self.samples:
+            return None
+        columns = list(zip(*self.samples))
+        return {"samples": len(self.samples), "max_active": max(columns[0]),
+                "max_idle_in_transaction": max(columns[1]), "max_lock_waits": max(columns[2]),
+                "max_connections": max(columns[3]),
+                "mean_active": sum(columns[0]) / len(self.samples)}
+
+
+def api_duplicates(admin_client, base_url, payment_ids, user_ids):
+    """Duplicate orders per payment id / COD buyer, counted from /api/admin/orders"""
+    response = admin_client.get(f"{base_url}/admin/orders")
+    if response.status_code != 200:
+        raise RuntimeError(f"GET /admin/orders: HTTP {response.status_code}")
+    payments, buyers = {}, {}
+    for order in response.json():
+        if order.get("razorpayPaymentId") in payment_ids:
+            payments[order["razorpayPaymentId"]] = payments.get(order["razorpayPaymentId"], 0) + 1
+        elif order.get("userId") in user_ids and order.get("paymentType") == "COD":
+            buyers[order["userId"]] = buyers.get(order["userId"], 0) + 1
+    return ({key: count for key, count in payments.items() if count > 1},
+            {key: count for key, count in buyers.items() if count > 1})
+
+
+def sql_duplicates(sink, payment_ids, user_ids):
+    payments = dict(sink.fetchall(DUPLICATE_PAYMENTS_SQL, (list(payment_ids),)))
+    buyers = dict(sink.fetchall(DUPLICATE_COD_SQL, (list(user_ids),)))
+    return payments, buyers
+
+
+def _summarize(results, wall_s):
+    histogram = LatencyHistogram()
+    for _, seconds, _ in results:
+        histogram.record(seconds)
+    statuses = {}
+    for status, _, _ in results:
+        statuses[status] = statuses.get(status, 0) + 1
+    created = sum(1 for _, _, order_id in results if order_id)
+    return {"requests": len(results), "orders_created": created, "statuses": statuses,
+            "p50_ms": histogram.value_at_percentile(50), "p95_ms": histogram.value_at_percentile(95),
+            "p99_ms": histogram.value_at_percentile(99), "max_ms": histogram.max / 1000.0,
+            "orders_per_s": created / wall_s if wall_s else 0.0}
+
+
+def run_checkout_stress(client, admin_client, base_url, rounds=10, copies=5, buyers=20, secret=None, sink=None,
+                        activity_sink=None):
+    """
+    Three phases against one in-stock product:
+      baseline   - `rounds` verify-payment calls one at a time, each for a new payment
+      verify     - `rounds` bursts of `copies` identical verify-payment calls for one payment
+      cod        - `buyers` users each submitting `copies` identical COD checkouts at once
+    With sink (a PostgresSink) duplicates are counted in SQL, otherwise via
+    /api/admin/orders; activity_sink (a second connection) samples pg_stat_activity.
+    """
+    secret = secret or os.environ.get("RAZORPAY_KEY_SECRET", "mock-razorpay-secret")
+    products = client.get(f"{base_url}/products", params={"excludeImage": "true"}).json()
+    product = next((product for product in products if product.get("inStock", True)), None)
+    if product is None:
+        raise RuntimeError("No in-stock product to check out")
+    report = {"product": product["id"]}
+    payment_ids, user_ids = set(), set()
+
+    http, user_id = make_buyer(client, base_url)
+    user_ids.add(user_id)
+    baseline = []
+    start = time.perf_counter()
+    for _ in range(rounds):
+        # Sent once each, so they can't duplicate; payment_ids holds only the burst payments
+        _, send = verify_call(http, base_url, product, secret)
+        baseline.extend(fire_together([send]))
+    report["baseline"] = _summarize(baseline, time.perf_counter() - start)
+
+    def burst(make_calls):
+        results = []
+        start = time.perf_counter()
+        if activity_sink is not None:
+            with ActivitySampler(activity_sink) as sampler:
+                for calls in make_calls():
+                    results.extend(fire_together(calls))
+            activity = sampler.summary()
+        else:
+            for calls in make_calls():
+                results.extend(fire_together(calls))
+            activity = None
+        return dict(_summarize(results, time.perf_counter() - start), activity=activity)
+
+    def verify_bursts():
+        for _ in range(rounds):
+            payment_id, send = verify_call(http, base_url, product, secret)
+            payment_ids.add(payment_id)
+            yield [send] * copies
+
+    report["verify"] = burst(verify_bursts)
+
+    cod_buyers = []
+    for _ in range(buyers):
+        buyer, buyer_id = make_buyer(client, base_url)
+        user_ids.add(buyer_id)
+        cod_buyers.append(buyer)
+    report["cod"] = burst(lambda: [[cod_call(buyer, base_url, product) for buyer in cod_buyers for _ in range(copies)]])
+
+    if sink is not None:
+        duplicate_payments, duplicate_buyers = sql_duplicates(sink, payment_ids, user_ids)
+    else:
+        duplicate_payments, duplicate_buyers = api_duplicates(admin_client, base_url, payment_ids, user_ids)
+    report["duplicate_payments"] = duplicate_payments
+    report["duplicate_cod_buyers"] = duplicate_buyers
+    report["payments_verified"] = len(payment_ids)
+    report["cod_buyers"] = buyers
+    # Time above the uncontended p50 is queueing: connection pool, locks, event loop
+    report["queue_wait_p50_ms"] = max(report["verify"]["p50_ms"] - report["baseline"]["p50_ms"], 0.0)
+    report["cod_queue_wait_p50_ms"] = max(report["cod"]["p50_ms"] - report["baseline"]["p50_ms"], 0.0)
+    return report
+
+
+def print_checkout_report(report):
+    """Print latency under contention and duplicate orders; returns True when no duplicates were found"""
+    print("=" * 100)
+    print("CHECKOUT CONTENTION")
+    print("=" * 100)
+    print(f"{'Phase':<12}{'Reqs':>7}{'Orders':>8}{'Orders/s':>10}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}"
+          f"{'Max ms':>10}  Statuses")
+    for phase in ("baseline", "verify", "cod"):
+        stats = report[phase]
+        statuses = ", ".join(f"{status}x{count}" for status, count in sorted(stats["statuses"].items(), key=str))
+        print(f"{phase:<12}{stats['requests']:>7}{stats['orders_created']:>8}{stats['orders_per_s']:>10.1f}"
+              f"{stats['p50_ms']:>10.1f}{stats['p95_ms']:>10.1f}{stats['p99_ms']:>10.1f}{stats['max_ms']:>10.1f}"
+              f"  {statuses}")
+    print(f"\nQueueing over the uncontended p50: verify {report['queue_wait_p50_ms']:.1f} ms, "
+          f"COD {report['cod_queue_wait_p50_ms']:.1f} ms")
+    for phase in ("verify", "cod"):
+        activity = report[phase].get("activity")
+        if activity:
+            print(f"pg_stat_activity during {phase}: max active {activity['max_active']}, "
+                  f"idle in transaction {activity['max_idle_in_transaction']}, lock waits "
+                  f"{activity['max_lock_waits']}, connections {activity['max_connections']} "
+                  f"({activity['samples']} samples)")
+
+    duplicates = report["duplicate_payments"]
+    buyers = report["duplicate_cod_buyers"]
+    print(f"\nDuplicate orders for one Razorpay payment: {len(duplicates)} of {report['payments_verified']} payments"
+          f" ({sum(duplicates.values()) - len(duplicates)} extra orders)")
+    print(f"Buyers with more than one COD order from a double submit: {len(buyers)} of {report['cod_buyers']}"
+          f" ({sum(buyers.values()) - len(buyers)} extra orders)")
+    return not duplicates and not buyers
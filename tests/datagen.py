@@ -0,0 +1,370 @@
+"""
+Production-sized data generator for the Postgres schema in prisma/schema.prisma.
+
+Streams users, products and orders (with OrderItem fan-out) into Postgres
+using COPY ... FROM STDIN in fixed-size batches, so memory stays bounded
+however many rows are generated. Ids are derived from row indexes, so orders
+can reference users/products without holding their ids in memory, and
+further order batches can be appended to an existing run later.
+
+    DATABASE_URL=postgresql://... python -m tests.datagen --users 100000 --products 20000 --orders 1000000
+
+Needs psycopg (3) or psycopg2 for the database sink; --out DIR writes COPY
+text files instead. Password hashing needs bcrypt (tests/requirements.txt).
+"""
+
+import base64
+import io
+import os
+import random
+import re
+import time
+from datetime import datetime, timedelta
+
+from tests.metrics import endpoint_label
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+ASSETS_DIR = os.path.join(REPO_ROOT, "public", "assets")
+
+# bcrypt (cost 10, as /api/auth/signup uses) of LOADTEST_PASSWORD, shared by every generated user
+LOADTEST_PASSWORD = "loadtest123"
+LOADTEST_PASSWORD_HASH = "$2b$10$abcdefghijklmnopqrstuuFI6rhI68cq87YAqmbqjxpmMJPbAnsrS"
+
+USER_COLUMNS = ("id", "email", "password", "role", "createdAt", "updatedAt")
+PRODUCT_COLUMNS = ("id", "name", "price", "category", "description", "imagePath", "inStock", "rating",
+                   "isFeatured", "createdAt", "updatedAt")
+ORDER_COLUMNS = ("id", "userId", "totalAmount", "status", "paymentType", "isPaid", "razorpayOrderId",
+                 "razorpayPaymentId", "createdAt", "updatedAt")
+ORDER_ITEM_COLUMNS = ("id", "orderId", "productId", "quantity", "price")
+
+CATEGORIES = {
+    "Earring": ["Jhumka", "Stud", "Dangler", "Hoop", "Chandbali"],
+    "Traditional Nath": ["Nath", "Nose Ring", "Kolhapuri Nath", "Lotus Nath"],
+    "Mangalsutra": ["Mangalsutra", "Short Mangalsutra", "Long Mangalsutra"],
+    "Jewellery Set": ["Choker Set", "Rajwadi Haar", "Kundan Set", "Temple Set"],
+    "Embroidery": ["Hankey", "Hair Clip", "Baby Footprint Frame", "Bow Clip"],
+}
+STYLES = ["Silver", "Gold Plated", "Kundan", "Pearl", "Floral", "Lotus", "Oxidised", "Beaded", "AD Stone"]
+# Share of orders by status, and items-per-order fan-out weights for 1..5 items
+STATUS_WEIGHTS = {"PENDING": 30, "SHIPPED": 25, "DELIVERED": 40, "CANCELLED": 5}
+ITEM_COUNT_WEIGHTS = [45, 30, 15, 7, 3]
+SHIPPING = 80
+
+
+def _bcrypt():
+    try:
+        import bcrypt
+    except ImportError:
+        raise RuntimeError("bcrypt password hashes need the bcrypt package (pip install bcrypt)") from None
+    return bcrypt
+
+
+def hash_password(password, cost=10):
+    """bcrypt hash usable by bcryptjs.compare"""
+    bcrypt = _bcrypt()
+    return bcrypt.hashpw(password.encode(), bcrypt.gensalt(rounds=cost, prefix=b"2b")).decode()
+
+
+def check_password(password, hashed):
+    """bcrypt.compare counterpart of hash_password"""
+    return _bcrypt().checkpw(password.encode(), hashed.encode())
+
+
+def copy_value(value):
+    """Encode one value in Postgres COPY text format"""
+    if value is None:
+        return "\\N"
+    if value is True:
+        return "t"
+    if value is False:
+        return "f"
+    if isinstance(value, datetime):
+        return value.strftime("%Y-%m-%d %H:%M:%S.") + f"{value.microsecond // 1000:03d}"
+    text = str(value)
+    if any(char in text for char in "\\\t\n\r"):
+        text = text.replace("\\", "\\\\").replace("\t", "\\t").replace("\n", "\\n").replace("\r", "\\r")
+    return text
+
+
+def copy_line(row):
+    return "\t".join(copy_value(value) for value in row) + "\n"
+
+
+class DataGenerator:
+    """
+    Deterministic row generator for one run.
+
+    `run` tags every id and email so several runs can coexist in one
+    database; the same (run, seed) always produces the same rows.
+    """
+
+    def __init__(self, users, products, run="g1", seed=0, history_days=730, inline_images=False, now=None):
+        if not re.fullmatch(r"[a-z0-9]{1,9}", run):
+            raise ValueError(f"run tag must be 1-9 lowercase letters or digits, got {run!r}")
+        self.user_count = users
+        self.product_count = products
+        self.run = run
+        self.seed = seed
+        self.history_days = history_days
+        self.now = now or datetime(2026, 1, 1)
+        self.images = sorted(name for name in os.listdir(ASSETS_DIR) if name.endswith(".jpeg")) \
+            if os.path.isdir(ASSETS_DIR) else ["silverjumka.jpeg"]
+        self.inline_images = inline_images
+        self._inlined = {}
+        # Reports group requests by route; a generated id that didn't collapse would get a label of its own
+        if endpoint_label("GET", f"/api/products/{self.id('p', 5)}/image") != "GET /api/products/[id]/image":
+            raise ValueError(f"generated id {self.id('p', 5)!r} is not recognized as a record id")
+
+    def id(self, kind, index):
+        """
+        cuid-shaped id (25 chars) for row `index` of `kind` (u/p/o/i). The run
+        tag is preceded by its length, so no run's id prefix is another's
+        ("g1" -> "2g1", "g12" -> "3g12"), and ids stay [a-z0-9] like cuids.
+        """
+        return f"c{kind}{len(self.run)}{self.run}{index:0{22 - len(self.run)}x}"
+
+    def _rng(self, kind, start):
+        return random.Random(f"{self.seed}:{self.run}:{kind}:{start}")
+
+    def _image(self, index):
+        name = self.images[index % len(self.images)]
+        if not self.inline_images:
+            return f"/assets/{name}"
+        if name not in self._inlined:
+            # prisma/seed.js stores images as base64 data URIs; mirror that payload size
+            with open(os.path.join(ASSETS_DIR, name), "rb") as f:
+                self._inlined[name] = f"data:image/jpeg;base64,{base64.b64encode(f.read()).decode()}"
+        return self._inlined[name]
+
+    def _timestamp(self, rng, fraction):
+        # Spread rows over the history window, oldest first
+        moment = self.now - timedelta(days=self.history_days * (1 - fraction))
+        return moment + timedelta(seconds=rng.randint(0, 3600))
+
+    def users(self, start=0, count=None):
+        count = self.user_count - start if count is None else count
+        rng = self._rng("u", start)
+        for index in range(start, start + count):
+            created = self._timestamp(rng, index / max(self.user_count, 1))
+            yield (self.id("u", index), f"user{index}.{self.run}@loadtest.example", LOADTEST_PASSWORD_HASH,
+                   "USER", created, created)
+
+    def products(self, start=0, count=None):
+        count = self.product_count - start if count is None else count
+        categories = list(CATEGORIES)
+        for index in range(start, start + count):
+            # Seeded per row so product_price() can regenerate any single product
+            rng = self._rng("p", index)
+            category = categories[index % len(categories)]
+            kind = rng.choice(CATEGORIES[category])
+            style = rng.choice(STYLES)
+            price = round(min(max(rng.lognormvariate(5.4, 0.6), 49), 4999))
+            created = self._timestamp(rng, index / max(self.product_count, 1))
+            yield (self.id("p", index), f"{style} {kind} #{index}", float(price), category,
+                   f"Handmade {style.lower()} {kind.lower()} in our {category} collection. "
+                   f"Perfect for weddings, festivals and everyday wear.",
+                   self._image(index), rng.random() > 0.05, round(rng.uniform(3.5, 5.0), 1),
+                   rng.random() < 0.04, created, created)
+
+    def product_price(self, index):
+        """Price of product `index`, recomputed rather than stored"""
+        return next(self.products(index, 1))[2]
+
+    def orders(self, start, count, total_orders=None):
+        """
+        Yield (order_row, [item_rows]) for orders start..start+count-1.
+
+        total_orders sets the timeline the createdAt values are spread over
+        (defaults to start + count). Popular products are picked more often.
+        """
+        total_orders = total_orders or start + count
+        rng = self._rng("o", start)
+        statuses, status_weights = zip(*STATUS_WEIGHTS.items())
+        price_cache = {}
+        for index in range(start, start + count):
+            order_id = self.id("o", index)
+            items = []
+            total = 0.0
+            for position in range(rng.choices(range(1, 6), weights=ITEM_COUNT_WEIGHTS)[0]):
+                product_index = int(self.product_count * rng.random() ** 2)
+                price = price_cache.get(product_index)
+                if price is None:
+                    price = price_cache[product_index] = self.product_price(product_index)
+                quantity = rng.choices((1, 2, 3), weights=(80, 15, 5))[0]
+                total += price * quantity
+                items.append((self.id("i", index * 8 + position), order_id, self.id("p", product_index),
+                              quantity, price))
+            status = rng.choices(statuses, weights=status_weights)[0]
+            online = rng.random() < 0.6
+            created = self._timestamp(rng, index / max(total_orders, 1))
+            order = (order_id, self.id("u", rng.randrange(self.user_count)), total + SHIPPING, status,
+                     "ONLINE" if online else "COD", online or status == "DELIVERED",
+                     f"order_{self.run}-{index:012x}" if online else None,
+                     f"pay_{self.run}-{index:012x}" if online else None,
+                     created, created + timedelta(hours=rng.randint(0, 96)))
+            yield order, items
+
+
+class PostgresSink:
+    """Writes row batches with COPY FROM STDIN; uses psycopg 3, falling back to psycopg2"""
+
+    def __init__(self, dsn):
+        try:
+            import psycopg
+            self.conn = psycopg.connect(dsn)
+            self.driver = 3
+        except ImportError:
+            try:
+                import psycopg2
+            except ImportError:
+                raise RuntimeError("The Postgres sink needs psycopg or psycopg2 (pip install psycopg)") from None
+            self.conn = psycopg2.connect(dsn)
+            self.driver = 2
+
+    def copy(self, table, columns, lines):
+        """Stream an iterable of COPY text lines into `table`"""
+        quoted = ", ".join(f'"{column}"' for column in columns)
+        sql = f'COPY "{table}" ({quoted}) FROM STDIN'
+        with self.conn.cursor() as cursor:
+            if self.driver == 3:
+                with cursor.copy(sql) as copy:
+                    for line in lines:
+                        copy.write(line)
+            else:
+                cursor.copy_expert(sql, io.StringIO("".join(lines)))
+
+    def execute(self, sql, params=None):
+        with self.conn.cursor() as cursor:
+            cursor.execute(sql, params)
+
+    def fetchall(self, sql, params=None):
+        with self.conn.cursor() as cursor:
+            cursor.execute(sql, params)
+            rows = cursor.fetchall()
+        self.conn.commit()
+        return rows
+
+    def commit(self):
+        self.conn.commit()
+
+    def close(self):
+        self.conn.close()
+
+
+class FileSink:
+    """Appends COPY text to <dir>/<table>.copy, loadable later with psql \\copy"""
+
+    def __init__(self, directory):
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+
+    def copy(self, table, columns, lines):
+        with open(os.path.join(self.directory, f"{table}.copy"), "a") as f:
+            f.writelines(lines)
+
+    def execute(self, sql, params=None):
+        pass
+
+    def commit(self):
+        pass
+
+    def close(self):
+        pass
+
+
+def _batches(rows, size):
+    batch = []
+    for row in rows:
+        batch.append(copy_line(row))
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def load_rows(sink, table, columns, rows, batch_size):
+    """COPY rows in batches of batch_size, committing after each; returns the row count"""
+    count = 0
+    for batch in _batches(rows, batch_size):
+        sink.copy(table, columns, batch)
+        sink.commit()
+        count += len(batch)
+    return count
+
+
+def load_orders(sink, generator, start, count, batch_size=20000, total_orders=None, progress=None):
+    """COPY `count` orders and their items, one committed batch of orders + items at a time"""
+    items_loaded = 0
+    for batch_start in range(start, start + count, batch_size):
+        batch_count = min(batch_size, start + count - batch_start)
+        order_lines, item_lines = [], []
+        for order, items in generator.orders(batch_start, batch_count, total_orders=total_orders):
+            order_lines.append(copy_line(order))
+            item_lines.extend(copy_line(item) for item in items)
+        sink.copy("Order", ORDER_COLUMNS, order_lines)
+        sink.copy("OrderItem", ORDER_ITEM_COLUMNS, item_lines)
+        sink.commit()
+        items_loaded += len(item_lines)
+        if progress:
+            progress(batch_start + batch_count - start, items_loaded)
+    return items_loaded
+
+
+def delete_run(sink, generator):
+    """Remove every row a run inserted (matched by its id prefixes)"""
+    run = generator.run.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    for table, kind in (("OrderItem", "i"), ("Order", "o"), ("Product", "p"), ("User", "u")):
+        # The length before the tag keeps run "g1" from matching run "g12"'s rows
+        sink.execute(f"DELETE FROM \"{table}\" WHERE id LIKE %s ESCAPE '\\'",
+                     (f"c{kind}{len(generator.run)}{run}%",))
+    sink.commit()
+
+
+def main():
+    import argparse
+    parser = argparse.ArgumentParser(description="Bulk-load production-sized data for performance tests")
+    parser.add_argument("--dsn", default=os.environ.get("DATABASE_URL"), help="Postgres URL (default $DATABASE_URL)")
+    parser.add_argument("--out", metavar="DIR", help="write COPY files to DIR instead of a database")
+    parser.add_argument("--users", type=int, default=10000)
+    parser.add_argument("--products", type=int, default=5000)
+    parser.add_argument("--orders", type=int, default=100000)
+    parser.add_argument("--batch-size", type=int, default=20000, help="rows per COPY batch/commit")
+    parser.add_argument("--run", default="g1", help="id/email tag for this data set (1-9 lowercase letters/digits)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--history-days", type=int, default=730, help="how far back createdAt values go")
+    parser.add_argument("--inline-images", action="store_true", help="store base64 images like prisma/seed.js")
+    parser.add_argument("--delete", action="store_true", help="remove this run's rows instead of loading")
+    args = parser.parse_args()
+
+    if not args.out and not args.dsn:
+        parser.error("pass --dsn, set DATABASE_URL, or use --out DIR")
+    sink = FileSink(args.out) if args.out else PostgresSink(args.dsn)
+    generator = DataGenerator(args.users, args.products, run=args.run, seed=args.seed,
+                              history_days=args.history_days, inline_images=args.inline_images)
+    if args.delete:
+        delete_run(sink, generator)
+        print(f"Deleted run '{args.run}'")
+        sink.close()
+        return
+
+    started = time.perf_counter()
+    print(f"Loading {args.users} users...")
+    load_rows(sink, "User", USER_COLUMNS, generator.users(), args.batch_size)
+    print(f"Loading {args.products} products...")
+    load_rows(sink, "Product", PRODUCT_COLUMNS, generator.products(), args.batch_size)
+    print(f"Loading {args.orders} orders...")
+
+    def progress(orders_done, items_done):
+        rate = orders_done / (time.perf_counter() - started)
+        print(f"  {orders_done}/{args.orders} orders, {items_done} items ({rate:,.0f} orders/s)")
+
+    items = load_orders(sink, generator, 0, args.orders, args.batch_size, progress=progress)
+    sink.close()
+    print(f"Done: {args.users} users, {args.products} products, {args.orders} orders, {items} order items "
+          f"in {time.perf_counter() - started:.1f}s")
+    print(f"Generated users log in with password '{LOADTEST_PASSWORD}'")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,218 @@
+"""
+Shared connection-pooled HTTP client for the backend API tester.
+Keeps TCP/TLS connections alive between calls so measured latency is the
+server's, counts how often a pooled connection was reused, and times each
+request phase (DNS, connect, TLS, time to first byte, total).
+"""
+
+import copy
+import socket
+import threading
+import time
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection, HTTPSConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+from urllib3.util.retry import Retry
+
+from tests.metrics import EndpointHistograms, endpoint_label
+
+# Timing record of the request in flight on this thread; connections fill in
+# the DNS/connect/TLS phases when the pool has to open a new one.
+_current = threading.local()
+
+
+class ConnectionStats:
+    """Thread-safe counters for requests sent and connections opened"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.requests = 0
+        self.connections_opened = 0
+
+    def request_sent(self):
+        with self.lock:
+            self.requests += 1
+
+    def connection_opened(self):
+        with self.lock:
+            self.connections_opened += 1
+
+    def snapshot(self):
+        with self.lock:
+            requests_sent, opened = self.requests, self.connections_opened
+        reused = max(requests_sent - opened, 0)
+        return {
+            "requests": requests_sent,
+            "connections_opened": opened,
+            "connections_reused": reused,
+            "reuse_ratio": reused / requests_sent if requests_sent else 0.0,
+        }
+
+
+def _timing():
+    return getattr(_current, "timing", None)
+
+
+class _TimedConnectionMixin:
+    """Records DNS, TCP connect and TLS handshake time on the thread's timing record"""
+
+    def _new_conn(self):
+        timing = _timing()
+        start = time.perf_counter()
+        try:
+            socket.getaddrinfo(self._dns_host, self.port, 0, socket.SOCK_STREAM)
+        except OSError:
+            # Let urllib3 resolve again and raise its own NameResolutionError
+            return super()._new_conn()
+        resolved = time.perf_counter()
+        # urllib3 resolves again (normally from the resolver cache) and tries
+        # every address in turn, so a host listening on only one of its IPv4
+        # and IPv6 addresses still connects
+        sock = super()._new_conn()
+        if timing is not None:
+            timing["dns_ms"] = (resolved - start) * 1000
+            timing["connect_ms"] = (time.perf_counter() - resolved) * 1000
+        return sock
+
+    def connect(self):
+        start = time.perf_counter()
+        super().connect()
+        timing = _timing()
+        if timing is not None and isinstance(self, HTTPSConnection):
+            elapsed = (time.perf_counter() - start) * 1000
+            timing["tls_ms"] = max(elapsed - timing["dns_ms"] - timing["connect_ms"], 0.0)
+
+
+class TimedHTTPConnection(_TimedConnectionMixin, HTTPConnection):
+    pass
+
+
+class TimedHTTPSConnection(_TimedConnectionMixin, HTTPSConnection):
+    pass
+
+
+def counting_pool(pool_cls, connection_cls, stats):
+    """Subclass a urllib3 pool so every new connection is timed and counted"""
+
+    def _new_conn(self):
+        conn = pool_cls._new_conn(self)
+        stats.connection_opened()
+        timing = _timing()
+        if timing is not None:
+            timing["reused"] = False
+        return conn
+
+    return type(f"Counting{pool_cls.__name__}", (pool_cls,),
+                {"_new_conn": _new_conn, "ConnectionCls": connection_cls})
+
+
+class PooledAdapter(HTTPAdapter):
+    """HTTPAdapter whose connection pools report to a ConnectionStats"""
+
+    def __init__(self, stats, **kwargs):
+        # init_poolmanager runs inside HTTPAdapter.__init__, so stats must exist first
+        self.stats = stats
+        super().__init__(**kwargs)
+
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {
+            "http": counting_pool(HTTPConnectionPool, TimedHTTPConnection, self.stats),
+            "https": counting_pool(HTTPSConnectionPool, TimedHTTPSConnection, self.stats),
+        }
+
+
+class PooledClient:
+    """
+    Drop-in for the requests module backed by one keep-alive Session.
+
+    pool_size bounds the connections kept per host (set it to the load-mode
+    concurrency). retries/backoff apply to idempotent methods and connect errors
+    only, so a retried POST can never create a duplicate order.
+
+    Every request is added to a per-endpoint latency histogram, and its phase
+    timings can be collected with take_timing() from the same thread.
+    """
+
+    def __init__(self, pool_size=10, keep_alive=True, retries=0, backoff=0.0, timeout=30):
+        self.stats = ConnectionStats()
+        self.histograms = EndpointHistograms()
+        self.timeout = timeout
+        retry = Retry(total=retries, connect=retries, read=retries, backoff_factor=backoff,
+                      status_forcelist=(502, 503, 504), raise_on_status=False)
+        self.keep_alive = keep_alive
+        self.adapter = PooledAdapter(self.stats, pool_connections=pool_size, pool_maxsize=pool_size,
+                                     pool_block=True, max_retries=retry)
+        self.session = self._new_session()
+
+    def _new_session(self):
+        session = requests.Session()
+        session.mount("http://", self.adapter)
+        session.mount("https://", self.adapter)
+        if not self.keep_alive:
+            session.headers["Connection"] = "close"
+        return session
+
+    def fork(self):
+        """Client with its own cookie jar that shares this one's connection pool, stats and histograms"""
+        clone = copy.copy(self)
+        clone.session = self._new_session()
+        return clone
+
+    def request(self, method, url, **kwargs):
+        kwargs.setdefault("timeout", self.timeout)
+        self.stats.request_sent()
+        timing = _current.timing = {
+            "endpoint": endpoint_label(method, url),
+            "status": None,
+            "reused": True,
+            "dns_ms": 0.0,
+            "connect_ms": 0.0,
+            "tls_ms": 0.0,
+            "ttfb_ms": None,
+            "total_ms": None,
+            "bytes": 0,
+        }
+        start = time.perf_counter()
+        try:
+            response = self.session.request(method, url, **kwargs)
+        finally:
+            timing["total_ms"] = (time.perf_counter() - start) * 1000
+            self.histograms.record(timing["endpoint"], timing["total_ms"] / 1000)
+        # requests stamps elapsed once the headers are parsed, before the body is read
+        timing["ttfb_ms"] = response.elapsed.total_seconds() * 1000
+        timing["status"] = response.status_code
+        timing["bytes"] = len(response.content)
+        return response
+
+    def take_timing(self):
+        """Timing record of this thread's last request (cleared once taken)"""
+        timing = _timing()
+        _current.timing = None
+        return timing
+
+    def get(self, url, **kwargs):
+        return self.request("GET", url, **kwargs)
+
+    def post(self, url, **kwargs):
+        return self.request("POST", url, **kwargs)
+
+    def put(self, url, **kwargs):
+        return self.request("PUT", url, **kwargs)
+
+    def patch(self, url, **kwargs):
+        return self.request("PATCH", url, **kwargs)
+
+    def delete(self, url, **kwargs):
+        return self.request("DELETE", url, **kwargs)
+
+    def close(self):
+        self.adapter.close()
+
+
+def print_connection_stats(stats):
+    """Print connection reuse counters"""
+    print(f"Connections: {stats['connections_opened']} opened, {stats['connections_reused']} reused "
+          f"across {stats['requests']} requests ({stats['reuse_ratio'] * 100:.1f}% reuse)")
@@ -0,0 +1,232 @@
+"""
+Concurrent load generation for the backend API tester.
+Runs tester suites (by default the scenario journeys, which only hit real
+routes) from many virtual users at once and reports throughput, errors and
+p50/p95/p99 latency per endpoint.
+"""
+
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+from tests.metrics import EndpointHistograms, endpoint_label
+
+
+class LatencyRecorder:
+    """Thread-safe collector of per-endpoint latency histograms and error counts"""
+
+    def __init__(self, window=60):
+        self.lock = threading.Lock()
+        self.histograms = EndpointHistograms()
+        self.errors = {}
+        self.in_flight = 0
+        # [second, requests, errors] for the last `window` seconds, for live rates
+        self.recent = deque(maxlen=window)
+        self.started = None
+        self.finished = None
+
+    def start(self):
+        self.started = time.perf_counter()
+
+    def stop(self):
+        self.finished = time.perf_counter()
+
+    def begin(self):
+        with self.lock:
+            self.in_flight += 1
+
+    def end(self):
+        with self.lock:
+            self.in_flight -= 1
+
+    def record(self, label, seconds, ok=True):
+        self.histograms.record(label, seconds)
+        second = int(time.time())
+        with self.lock:
+            if not ok:
+                self.errors[label] = self.errors.get(label, 0) + 1
+            if not self.recent or self.recent[-1][0] != second:
+                self.recent.append([second, 0, 0])
+            self.recent[-1][1] += 1
+            self.recent[-1][2] += not ok
+
+    def record_error(self, label):
+        """Count an error against a request already recorded as ok, e.g. one a functional check failed on"""
+        with self.lock:
+            self.errors[label] = self.errors.get(label, 0) + 1
+            if self.recent:
+                self.recent[-1][2] += 1
+
+    def recent_rate(self, window=10):
+        """(requests/second, error ratio) over the last `window` whole seconds"""
+        now = int(time.time())
+        with self.lock:
+            buckets = [bucket for bucket in self.recent if now - window <= bucket[0] < now]
+        requests = sum(bucket[1] for bucket in buckets)
+        errors = sum(bucket[2] for bucket in buckets)
+        # Early in a run, divide by the seconds actually observed rather than the whole window
+        span = min(window, now - buckets[0][0]) if buckets else window
+        return requests / span, errors / requests if requests else 0.0
+
+    def elapsed(self):
+        end = self.finished if self.finished is not None else time.perf_counter()
+        return max(end - (self.started or end), 1e-9)
+
+    def report(self):
+        """Per-endpoint count, errors, throughput and latency percentiles (ms)"""
+        elapsed = self.elapsed()
+        with self.lock:
+            errors = dict(self.errors)
+        report = {}
+        for label, histogram in self.histograms.to_dict().items():
+            report[label] = {
+                "requests": histogram["count"],
+                "errors": errors.get(label, 0),
+                "throughput_rps": histogram["count"] / elapsed,
+                "mean_ms": histogram["mean"],
+                "p50_ms": histogram["p50"],
+                "p95_ms": histogram["p95"],
+                "p99_ms": histogram["p99"],
+                "max_ms": histogram["max"],
+            }
+        return report
+
+
+class RateLimiter:
+    """Paces requests across all virtual users to a target rate (requests/second)"""
+
+    def __init__(self, rate=None):
+        self.interval = 1.0 / rate if rate else 0.0
+        self.lock = threading.Lock()
+        self.next_slot = time.perf_counter()
+
+    def acquire(self):
+        if not self.interval:
+            return
+        with self.lock:
+            now = time.perf_counter()
+            slot = max(self.next_slot, now)
+            self.next_slot = slot + self.interval
+        delay = slot - time.perf_counter()
+        if delay > 0:
+            time.sleep(delay)
+
+
+class TimedClient:
+    """
+    Drop-in for the requests module that paces and times every call.
+
+    A response counts as an error when it is a 5xx or an unexpected 4xx: pass
+    expect=<status> for a request whose 4xx is the point of the check.
+    """
+
+    def __init__(self, http, recorder, limiter=None):
+        self.http = http
+        self.recorder = recorder
+        self.limiter = limiter or RateLimiter()
+        # (label, counted ok) of the last request, so a failed check can be charged to it
+        self.last = None
+
+    def fork(self):
+        """Same recorder and pacing over a fresh cookie jar"""
+        return TimedClient(self.http.fork(), self.recorder, self.limiter)
+
+    def take_timing(self):
+        take_timing = getattr(self.http, "take_timing", None)
+        return take_timing() if take_timing else None
+
+    def check_failed(self):
+        """Count the last request as an error, unless its status already did"""
+        if self.last is not None and self.last[1]:
+            self.recorder.record_error(self.last[0])
+            self.last = (self.last[0], False)
+
+    def request(self, method, url, expect=None, **kwargs):
+        label = endpoint_label(method, url)
+        self.limiter.acquire()
+        self.recorder.begin()
+        start = time.perf_counter()
+        try:
+            response = self.http.request(method, url, **kwargs)
+        except Exception:
+            self.last = (label, False)
+            self.recorder.record(label, time.perf_counter() - start, ok=False)
+            raise
+        finally:
+            self.recorder.end()
+        ok = response.status_code == expect if expect is not None else response.status_code < 400
+        self.last = (label, ok)
+        self.recorder.record(label, time.perf_counter() - start, ok=ok)
+        return response
+
+    def get(self, url, **kwargs):
+        return self.request("GET", url, **kwargs)
+
+    def post(self, url, **kwargs):
+        return self.request("POST", url, **kwargs)
+
+    def put(self, url, **kwargs):
+        return self.request("PUT", url, **kwargs)
+
+    def patch(self, url, **kwargs):
+        return self.request("PATCH", url, **kwargs)
+
+    def delete(self, url, **kwargs):
+        return self.request("DELETE", url, **kwargs)
+
+
+def run_load(make_tester, suites, concurrency=10, rate=None, duration=None, iterations=1, http=None,
+             recorder=None):
+    """
+    Run the named tester suites from `concurrency` virtual users.
+
+    make_tester(http, user_index) must return a tester whose run_suites(names)
+    issues requests through `http` and that counts its `failed` checks. Each
+    user repeats the suites until `duration` seconds have passed, or
+    `iterations` times when no duration is given. Pass a recorder to watch it
+    live (e.g. from a MetricsServer).
+    Returns (report, recorder, failed_checks).
+    """
+    if http is None:
+        from tests.http_client import PooledClient
+        http = PooledClient(pool_size=concurrency)
+
+    recorder = recorder or LatencyRecorder()
+    limiter = RateLimiter(rate)
+    deadline = time.perf_counter() + duration if duration else None
+
+    def virtual_user(user_index):
+        tester = make_tester(TimedClient(http, recorder, limiter), user_index)
+        done = 0
+        while True:
+            if deadline is not None:
+                if time.perf_counter() >= deadline:
+                    break
+            elif done >= iterations:
+                break
+            tester.run_suites(suites)
+            done += 1
+        return tester.failed
+
+    recorder.start()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        failed = sum(pool.map(virtual_user, range(concurrency)))
+    recorder.stop()
+
+    return recorder.report(), recorder, failed
+
+
+def print_load_report(report, elapsed, failed_checks=0):
+    """Print a per-endpoint latency table"""
+    total = sum(stats["requests"] for stats in report.values())
+    print("=" * 100)
+    print("LOAD TEST SUMMARY")
+    print("=" * 100)
+    print(f"{'Endpoint':<45}{'Reqs':>7}{'Errs':>6}{'RPS':>9}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}")
+    for label, stats in report.items():
+        print(f"{label:<45}{stats['requests']:>7}{stats['errors']:>6}{stats['throughput_rps']:>9.1f}"
+              f"{stats['p50_ms']:>10.1f}{stats['p95_ms']:>10.1f}{stats['p99_ms']:>10.1f}")
+    print("-" * 100)
+    print(f"Total requests: {total} in {elapsed:.1f}s ({total / elapsed:.1f} req/s)")
+    print(f"Failed functional checks: {failed_checks}")
@@ -0,0 +1,161 @@
+"""
+Latency metrics shared by the tester, load mode and benchmarks.
+"""
+
+import math
+import os
+import re
+import threading
+from urllib.parse import urlsplit
+
+# Path segments that are record ids (seed ids, cuids, uuids) collapse to [id]
+ID_SEGMENT = re.compile(r"^(\d+|c[a-z0-9]{20,}|[0-9a-f]{8}-[0-9a-f-]{27})$")
+
+REPORTED_PERCENTILES = (50, 90, 95, 99, 99.9)
+
+
+def endpoint_label(method, url):
+    """Group a request under its route, e.g. 'GET /api/products/[id]/image'"""
+    path = urlsplit(url).path.rstrip("/") or "/"
+    segments = ["[id]" if ID_SEGMENT.match(segment) else segment for segment in path.split("/")]
+    return f"{method.upper()} {'/'.join(segments)}"
+
+
+class LatencyHistogram:
+    """
+    HDR-style latency histogram.
+
+    Values are stored in microseconds, bucketed to `significant_figures` digits,
+    so memory stays bounded however many samples are recorded while every
+    reported quantile is within 10**-(significant_figures - 1) relative error.
+    """
+
+    def __init__(self, significant_figures=3):
+        self.significant_figures = significant_figures
+        self.lock = threading.Lock()
+        self.counts = {}
+        self.count = 0
+        self.total = 0
+        self.min = None
+        self.max = None
+
+    def _bucket(self, micros):
+        if micros < 10 ** self.significant_figures:
+            return micros
+        width = 10 ** (int(math.log10(micros)) - self.significant_figures + 1)
+        return micros // width * width
+
+    def record(self, seconds):
+        micros = max(int(seconds * 1_000_000), 0)
+        bucket = self._bucket(micros)
+        with self.lock:
+            self.counts[bucket] = self.counts.get(bucket, 0) + 1
+            self.count += 1
+            self.total += micros
+            self.min = micros if self.min is None else min(self.min, micros)
+            self.max = micros if self.max is None else max(self.max, micros)
+
+    def merge(self, other):
+        with other.lock:
+            counts, count, total = dict(other.counts), other.count, other.total
+            low, high = other.min, other.max
+        with self.lock:
+            for bucket, n in counts.items():
+                self.counts[bucket] = self.counts.get(bucket, 0) + n
+            self.count += count
+            self.total += total
+            if low is not None:
+                self.min = low if self.min is None else min(self.min, low)
+                self.max = high if self.max is None else max(self.max, high)
+
+    def value_at_percentile(self, pct):
+        """Latency in ms at or below which `pct` percent of samples fall"""
+        with self.lock:
+            items = sorted(self.counts.items())
+            count = self.count
+        if not count:
+            return 0.0
+        target = max(math.ceil(pct / 100.0 * count), 1)
+        seen = 0
+        for bucket, n in items:
+            seen += n
+            if seen >= target:
+                return bucket / 1000.0
+        return items[-1][0] / 1000.0
+
+    def mean(self):
+        return self.total / self.count / 1000.0 if self.count else 0.0
+
+    def to_dict(self):
+        """JSON-friendly summary plus the sparse bucket counts (values in ms)"""
+        summary = {
+            "unit": "ms",
+            "count": self.count,
+            "min": (self.min or 0) / 1000.0,
+            "max": (self.max or 0) / 1000.0,
+            "mean": self.mean(),
+        }
+        for pct in REPORTED_PERCENTILES:
+            summary[f"p{pct:g}"] = self.value_at_percentile(pct)
+        with self.lock:
+            summary["buckets"] = [[bucket / 1000.0, n] for bucket, n in sorted(self.counts.items())]
+        return summary
+
+
+class EndpointHistograms:
+    """Thread-safe map of endpoint label -> LatencyHistogram"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.histograms = {}
+
+    def record(self, label, seconds):
+        with self.lock:
+            histogram = self.histograms.get(label)
+            if histogram is None:
+                histogram = self.histograms[label] = LatencyHistogram()
+        histogram.record(seconds)
+
+    def to_dict(self):
+        with self.lock:
+            items = sorted(self.histograms.items())
+        return {label: histogram.to_dict() for label, histogram in items}
+
+
+def process_rss_bytes(pid):
+    """Resident set size of a local process from /proc, or None when unavailable"""
+    try:
+        with open(f"/proc/{pid}/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        return None
+    return None
+
+
+def process_cpu_seconds(pid, tid=None):
+    """User+system CPU time of a local process (or one of its threads) from /proc, or None"""
+    path = f"/proc/{pid}/task/{tid}/stat" if tid else f"/proc/{pid}/stat"
+    try:
+        with open(path) as f:
+            # Fields after the parenthesised command name; utime and stime are the 14th and 15th
+            fields = f.read().rsplit(")", 1)[1].split()
+    except OSError:
+        return None
+    return (int(fields[11]) + int(fields[12])) / os.sysconf("SC_CLK_TCK")
+
+
+def process_open_sockets(pid):
+    """Number of sockets a local process holds open (from /proc/<pid>/fd), or None"""
+    try:
+        fds = os.listdir(f"/proc/{pid}/fd")
+    except OSError:
+        return None
+    count = 0
+    for fd in fds:
+        try:
+            count += os.readlink(f"/proc/{pid}/fd/{fd}").startswith("socket:")
+        except OSError:
+            pass
+    return count
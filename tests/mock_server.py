@@ -0,0 +1,749 @@
+"""
+In-process stand-in for the Next.js API, for offline and repeatable perf runs.
+
+Implements the routes the tester exercises (products, product image lookup,
+auth, COD and Razorpay checkout, admin products/orders/stats) with the same
+status codes and response shapes as app/api, on a stdlib asyncio HTTP/1.1
+server with keep-alive. Products are seeded from lib/productsData.js and the
+admin user from prisma/seed.js. public/assets is served with ETag and
+Last-Modified validators. Latency and error rates can be injected, and the
+catalogue reads can be put behind an ETag or server-side response cache layer
+that admin product writes invalidate.
+
+Run standalone with:  python -m tests.mock_server --port 3001 --latency 0.02
+"""
+
+import asyncio
+import base64
+import hashlib
+import hmac
+import json
+import mimetypes
+import os
+import random
+import re
+import secrets
+import string
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from email.utils import formatdate, parsedate_to_datetime
+from urllib.parse import parse_qs, unquote, urlsplit
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PRODUCTS_FILE = os.path.join(REPO_ROOT, "lib", "productsData.js")
+ASSETS_DIR = os.path.join(REPO_ROOT, "public")
+
+ADMIN_EMAIL = "admin@handmade.com"
+ADMIN_PASSWORD = "adminpassword123"
+
+STATUS_TEXT = {200: "OK", 201: "Created", 304: "Not Modified", 400: "Bad Request", 401: "Unauthorized",
+               404: "Not Found", 405: "Method Not Allowed", 500: "Internal Server Error"}
+
+# Catalogue reads the optional cache layer covers, and the admin writes that invalidate it
+CACHE_LAYERS = ("off", "etag", "server")
+CACHEABLE_ROUTES = (r"/api/products", r"/api/products/(?P<id>[^/]+)/image")
+INVALIDATING_ROUTES = (r"/api/admin/products", r"/api/admin/products/(?P<id>[^/]+)")
+
+# Product columns returned when excludeImage=true (app/api/products/route.js)
+PRODUCT_FIELDS_NO_IMAGE = ("id", "name", "price", "category", "description", "inStock",
+                           "rating", "isFeatured", "createdAt", "updatedAt")
+
+
+def js_to_json(source):
+    """Convert a JS array/object literal (unquoted keys, single quotes, comments) to JSON text"""
+    out = []
+    i = 0
+    while i < len(source):
+        char = source[i]
+        if char in "'\"":
+            end = i + 1
+            chars = []
+            while source[end] != char:
+                if source[end] == "\\":
+                    end += 1
+                chars.append(source[end])
+                end += 1
+            out.append(json.dumps("".join(chars)))
+            i = end + 1
+        elif source.startswith("//", i):
+            i = source.index("\n", i)
+        elif char.isalpha() or char == "_":
+            match = re.match(r"[A-Za-z_$][\w$]*", source[i:])
+            word = match.group(0)
+            following = source[i + len(word):].lstrip()
+            out.append(json.dumps(word) if following.startswith(":") else word)
+            i += len(word)
+        else:
+            out.append(char)
+            i += 1
+    return re.sub(r",(\s*[}\]])", r"\1", "".join(out))
+
+
+def load_seed_products(path=PRODUCTS_FILE):
+    """Parse the productsData array out of lib/productsData.js"""
+    with open(path) as f:
+        text = f.read()
+    start = text.index("[", text.index("productsData"))
+    end = text.index("];", start) + 1
+    return json.loads(js_to_json(text[start:end]))
+
+
+def cuid():
+    """Prisma-style collision-resistant id"""
+    return "c" + "".join(secrets.choice(string.ascii_lowercase + string.digits) for _ in range(24))
+
+
+def iso(moment):
+    return moment.astimezone(timezone.utc).isoformat(timespec="milliseconds").replace("+00:00", "Z")
+
+
+def _b64url(data):
+    return base64.urlsafe_b64encode(data).rstrip(b"=").decode()
+
+
+def _b64url_decode(text):
+    return base64.urlsafe_b64decode(text + "=" * (-len(text) % 4))
+
+
+def jwt_sign(payload, secret, expires_in=7 * 24 * 3600):
+    """HS256 JWT, compatible with jsonwebtoken's jwt.sign"""
+    now = int(time.time())
+    claims = dict(payload, iat=now, exp=now + expires_in)
+    header = _b64url(json.dumps({"alg": "HS256", "typ": "JWT"}, separators=(",", ":")).encode())
+    body = _b64url(json.dumps(claims, separators=(",", ":")).encode())
+    signature = hmac.new(secret.encode(), f"{header}.{body}".encode(), hashlib.sha256).digest()
+    return f"{header}.{body}.{_b64url(signature)}"
+
+
+def jwt_verify(token, secret):
+    """Return the claims of a valid, unexpired HS256 token, else None"""
+    try:
+        header, body, signature = token.split(".")
+        expected = hmac.new(secret.encode(), f"{header}.{body}".encode(), hashlib.sha256).digest()
+        if not hmac.compare_digest(expected, _b64url_decode(signature)):
+            return None
+        claims = json.loads(_b64url_decode(body))
+    except (ValueError, TypeError):
+        return None
+    if claims.get("exp", 0) < time.time():
+        return None
+    return claims
+
+
+def razorpay_signature(order_id, payment_id, secret):
+    """Signature Razorpay returns to checkout, as checked by verify-payment"""
+    return hmac.new(secret.encode(), f"{order_id}|{payment_id}".encode(), hashlib.sha256).hexdigest()
+
+
+def _int_param(query, name):
+    # parseInt(x) || fallback in the route: 0, junk and missing are all falsy
+    try:
+        return int(query.get(name, [""])[0]) or None
+    except ValueError:
+        return None
+
+
+class Request:
+    def __init__(self, method, target, headers, body):
+        parts = urlsplit(target)
+        self.method = method
+        self.target = target
+        self.path = unquote(parts.path)
+        self.query = parse_qs(parts.query)
+        self.headers = headers
+        self.body = body
+        self.cookies = {}
+        for pair in headers.get("cookie", "").split(";"):
+            if "=" in pair:
+                name, value = pair.strip().split("=", 1)
+                self.cookies[name] = value
+
+    def json(self):
+        return json.loads(self.body or b"null")
+
+
+class Response:
+    def __init__(self, status, payload=None, headers=None, body=None, content_type="application/json"):
+        self.status = status
+        self.headers = dict(headers or {})
+        self.body = body if body is not None else json.dumps(payload).encode()
+        self.headers.setdefault("Content-Type", content_type)
+
+
+def token_cookie(token, max_age=60 * 60 * 24 * 7):
+    return f"token={token}; Path=/; Max-Age={max_age}; HttpOnly; SameSite=strict"
+
+
+class MockStore:
+    """In-memory tables mirroring prisma/schema.prisma"""
+
+    def __init__(self, products=None, inline_images=False, password_iterations=1000):
+        self.password_iterations = password_iterations
+        self.users = {}
+        self.users_by_id = {}
+        self.products = {}
+        self.orders = {}
+        seeded_at = datetime.now(timezone.utc) - timedelta(days=1)
+        for index, product in enumerate(products if products is not None else load_seed_products()):
+            image = product["imagePath"]
+            if inline_images:
+                image = self._inline_image(image)
+            created = iso(seeded_at + timedelta(seconds=index))
+            self.products[product["id"]] = dict(product, imagePath=image, createdAt=created, updatedAt=created)
+        self.create_user(ADMIN_EMAIL, ADMIN_PASSWORD, role="ADMIN")
+
+    @staticmethod
+    def _inline_image(image_path):
+        # prisma/seed.js stores /assets images as base64 data URIs
+        path = os.path.join(ASSETS_DIR, image_path.lstrip("/"))
+        if not image_path.startswith("/assets") or not os.path.exists(path):
+            return image_path
+        with open(path, "rb") as f:
+            return f"data:image/jpeg;base64,{base64.b64encode(f.read()).decode()}"
+
+    def hash_password(self, password, salt=None):
+        salt = salt or secrets.token_hex(8)
+        digest = hashlib.pbkdf2_hmac("sha256", password.encode(), salt.encode(), self.password_iterations)
+        return f"{salt}${digest.hex()}"
+
+    def check_password(self, password, stored):
+        if stored.startswith("$2"):
+            # bcrypt hashes from tests.datagen, verified at their real cost like bcryptjs.compare
+            from tests.datagen import check_password
+            return check_password(password, stored)
+        salt = stored.split("$", 1)[0]
+        return hmac.compare_digest(self.hash_password(password, salt), stored)
+
+    def create_user(self, email, password, role="USER"):
+        now = iso(datetime.now(timezone.utc))
+        user = {"id": cuid(), "email": email, "password": self.hash_password(password), "role": role,
+                "createdAt": now, "updatedAt": now}
+        self.add_user(user)
+        return user
+
+    def add_user(self, user):
+        self.users[user["email"]] = user
+        self.users_by_id[user["id"]] = user
+
+    def user_email(self, user_id):
+        user = self.users_by_id.get(user_id)
+        return user["email"] if user else None
+
+    def products_page(self, category=None, limit=None, skip=None, exclude_image=False):
+        rows = sorted(self.products.values(), key=lambda product: product["createdAt"], reverse=True)
+        if category and category != "All":
+            rows = [product for product in rows if product["category"] == category]
+        rows = rows[skip or 0:]
+        if limit:
+            rows = rows[:limit]
+        if exclude_image:
+            return [{field: product[field] for field in PRODUCT_FIELDS_NO_IMAGE} for product in rows]
+        return [dict(product) for product in rows]
+
+    def create_product(self, body):
+        now = iso(datetime.now(timezone.utc))
+        product = {
+            "id": cuid(),
+            "name": body.get("name"),
+            "price": float(body["price"]),
+            "category": body.get("category"),
+            "description": body.get("description"),
+            "imagePath": body.get("imagePath"),
+            "inStock": body["inStock"] if body.get("inStock") is not None else True,
+            "rating": float(body.get("rating") or 0),
+            "isFeatured": body["isFeatured"] if body.get("isFeatured") is not None else False,
+            "createdAt": now,
+            "updatedAt": now,
+        }
+        self.products[product["id"]] = product
+        return product
+
+    def create_order(self, user_id, items, total_amount, payment_type, is_paid,
+                     razorpay_order_id=None, razorpay_payment_id=None):
+        now = iso(datetime.now(timezone.utc))
+        order_id = cuid()
+        order = {
+            "id": order_id,
+            "userId": user_id,
+            "totalAmount": float(total_amount),
+            "status": "PENDING",
+            "paymentType": payment_type,
+            "isPaid": is_paid,
+            "razorpayOrderId": razorpay_order_id,
+            "razorpayPaymentId": razorpay_payment_id,
+            "createdAt": now,
+            "updatedAt": now,
+            "items": [
+                {"id": cuid(), "orderId": order_id, "productId": item["product"]["id"],
+                 "quantity": item["quantity"], "price": float(item["product"]["price"])}
+                for item in items
+            ],
+        }
+        self.orders[order_id] = order
+        return order
+
+
+class MockBackend:
+    """
+    Asyncio HTTP server serving MockStore through the app's API routes.
+
+    latency/jitter (seconds) delay every response; route_latency maps a route
+    pattern substring (e.g. "/api/admin/stats") to an extra delay. error_rate is
+    the probability that an API call fails with the route's 500 response.
+
+    catalogue_cache (one of CACHE_LAYERS) fronts the public product reads:
+    "etag" adds a content ETag and answers If-None-Match with 304 after running
+    the route, "server" also keeps the response so hits skip the route and its
+    route_latency. Successful admin product writes clear the server cache
+    unless cache_invalidation is False.
+    """
+
+    def __init__(self, host="127.0.0.1", port=0, latency=0.0, jitter=0.0, error_rate=0.0,
+                 route_latency=None, seed=None, jwt_secret="mock-jwt-secret",
+                 razorpay_key_secret="mock-razorpay-secret", inline_images=False, products=None,
+                 password_iterations=1000, catalogue_cache="off"):
+        self.host = host
+        self.port = port
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.route_latency = route_latency or {}
+        self.random = random.Random(seed)
+        self.jwt_secret = jwt_secret
+        self.razorpay_key_secret = razorpay_key_secret
+        self.store = MockStore(products, inline_images=inline_images, password_iterations=password_iterations)
+        self.requests_served = 0
+        self.catalogue_cache = catalogue_cache
+        self.cache_invalidation = True
+        self.cache_stats = {"hits": 0, "misses": 0, "invalidations": 0}
+        self._response_cache = {}
+        self._loop = None
+        self._server = None
+        self._thread = None
+        self.routes = [
+            ("GET", r"/api/products", self.get_products),
+            ("GET", r"/api/products/(?P<id>[^/]+)/image", self.get_product_image),
+            ("POST", r"/api/auth/signup", self.signup),
+            ("POST", r"/api/auth/login", self.login),
+            ("POST", r"/api/auth/logout", self.logout),
+            ("GET", r"/api/auth/me", self.me),
+            ("POST", r"/api/orders/cod", self.create_cod_order),
+            ("POST", r"/api/razorpay/create-order", self.create_razorpay_order),
+            ("POST", r"/api/razorpay/verify-payment", self.verify_payment),
+            ("GET", r"/api/admin/products", self.admin_list_products),
+            ("POST", r"/api/admin/products", self.admin_create_product),
+            ("PATCH", r"/api/admin/products/(?P<id>[^/]+)", self.admin_update_product),
+            ("DELETE", r"/api/admin/products/(?P<id>[^/]+)", self.admin_delete_product),
+            ("GET", r"/api/admin/orders", self.admin_list_orders),
+            ("PATCH", r"/api/admin/orders/(?P<id>[^/]+)", self.admin_update_order),
+            ("GET", r"/api/admin/stats", self.admin_stats),
+            ("GET", r"/assets/(?P<name>[^/]+)", self.static_asset),
+        ]
+        self._compiled = [(method, re.compile(pattern + r"/?$"), pattern, handler)
+                          for method, pattern, handler in self.routes]
+
+    @property
+    def base_url(self):
+        return f"http://{self.host}:{self.port}/api"
+
+    @property
+    def thread_id(self):
+        """Kernel id of the serving thread, for per-thread CPU sampling"""
+        return self._thread.native_id if self._thread else None
+
+    # ---- lifecycle -------------------------------------------------------
+
+    def start(self):
+        """Serve on a background thread; returns the API base URL"""
+        ready = threading.Event()
+
+        def serve():
+            self._loop = asyncio.new_event_loop()
+            asyncio.set_event_loop(self._loop)
+            self._server = self._loop.run_until_complete(
+                asyncio.start_server(self._handle_connection, self.host, self.port))
+            self.port = self._server.sockets[0].getsockname()[1]
+            ready.set()
+            self._loop.run_forever()
+            self._server.close()
+            self._loop.run_until_complete(self._server.wait_closed())
+            self._loop.close()
+
+        self._thread = threading.Thread(target=serve, name="mock-backend", daemon=True)
+        self._thread.start()
+        ready.wait()
+        return self.base_url
+
+    def stop(self):
+        if self._loop is not None:
+            self._loop.call_soon_threadsafe(self._loop.stop)
+            self._thread.join()
+            self._loop = None
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+    # ---- HTTP plumbing ---------------------------------------------------
+
+    async def _handle_connection(self, reader, writer):
+        try:
+            while True:
+                try:
+                    head = await reader.readuntil(b"\r\n\r\n")
+                except (asyncio.IncompleteReadError, ConnectionError):
+                    break
+                request_line, *header_lines = head.decode("latin-1").split("\r\n")
+                method, target, version = request_line.split(" ", 2)
+                headers = {}
+                for line in header_lines:
+                    if ":" in line:
+                        name, value = line.split(":", 1)
+                        headers[name.strip().lower()] = value.strip()
+                length = int(headers.get("content-length", 0))
+                body = await reader.readexactly(length) if length else b""
+
+                response = await self.dispatch(Request(method, target, headers, body))
+                keep_alive = (headers.get("connection", "").lower() != "close"
+                              and version.upper() == "HTTP/1.1")
+                writer.write(self._serialize(response, keep_alive, head_only=method == "HEAD"))
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    @staticmethod
+    def _serialize(response, keep_alive, head_only=False):
+        lines = [f"HTTP/1.1 {response.status} {STATUS_TEXT.get(response.status, 'Unknown')}"]
+        headers = dict(response.headers, **{"Content-Length": str(len(response.body)),
+                                            "Connection": "keep-alive" if keep_alive else "close"})
+        for name, value in headers.items():
+            for item in value if isinstance(value, list) else [value]:
+                lines.append(f"{name}: {item}")
+        payload = b"" if head_only else response.body
+        return ("\r\n".join(lines) + "\r\n\r\n").encode("latin-1") + payload
+
+    async def dispatch(self, request):
+        self.requests_served += 1
+        allowed = False
+        for method, regex, pattern, handler in self._compiled:
+            match = regex.match(request.path)
+            if not match:
+                continue
+            if method != request.method:
+                allowed = True
+                continue
+            cacheable = self.catalogue_cache != "off" and method == "GET" and pattern in CACHEABLE_ROUTES
+            delay = self.latency + (self.random.uniform(0, self.jitter) if self.jitter else 0.0)
+            if not (cacheable and request.target in self._response_cache):
+                # A server cache hit skips the route's own work
+                delay += sum(extra for route, extra in self.route_latency.items() if route in pattern)
+            if delay:
+                await asyncio.sleep(delay)
+            if self.error_rate and self.random.random() < self.error_rate:
+                return Response(500, {"error": "Injected failure"})
+            try:
+                if cacheable:
+                    return self._cached(request, lambda: handler(request, **match.groupdict()))
+                response = handler(request, **match.groupdict())
+            except ValueError:
+                # Unparseable JSON (or a field that isn't a number) in the request body
+                return Response(400, {"error": "Invalid request body"})
+            except Exception:
+                # Answer like a crashed route handler instead of dropping the connection
+                return Response(500, {"error": "Internal server error"})
+            if pattern in INVALIDATING_ROUTES and method != "GET" and response.status < 400:
+                self.invalidate_cache()
+            return response
+        if allowed:
+            return Response(405, {"error": "Method not allowed"})
+        return Response(404, {"error": "Not found"})
+
+    # ---- catalogue cache layer -------------------------------------------
+
+    def _cached(self, request, run_route):
+        """Serve a catalogue read through the cache layer, answering If-None-Match"""
+        cached = self._response_cache.get(request.target) if self.catalogue_cache == "server" else None
+        if cached is None:
+            response = run_route()
+            if response.status != 200:
+                return response
+            response.headers["ETag"] = f'"{hashlib.sha1(response.body).hexdigest()[:20]}"'
+            # Cacheable, but clients must revalidate so price changes show up at once
+            response.headers["Cache-Control"] = "public, no-cache"
+            if self.catalogue_cache == "server":
+                self.cache_stats["misses"] += 1
+                self._response_cache[request.target] = response
+                response = Response(200, headers=dict(response.headers, **{"X-Cache": "MISS"}), body=response.body)
+        else:
+            self.cache_stats["hits"] += 1
+            response = Response(200, headers=dict(cached.headers, **{"X-Cache": "HIT"}), body=cached.body)
+        if_none_match = request.headers.get("if-none-match")
+        if if_none_match and response.headers["ETag"] in [tag.strip() for tag in if_none_match.split(",")]:
+            return Response(304, headers=response.headers, body=b"")
+        return response
+
+    def set_catalogue_cache(self, layer):
+        """Switch cache layers between runs, starting from an empty cache"""
+        self.catalogue_cache = layer
+        self._response_cache = {}
+        self.cache_stats = {"hits": 0, "misses": 0, "invalidations": 0}
+
+    def invalidate_cache(self):
+        if self.cache_invalidation and self._response_cache:
+            self._response_cache.clear()
+            self.cache_stats["invalidations"] += 1
+
+    # ---- auth helpers ----------------------------------------------------
+
+    def _claims(self, request):
+        token = request.cookies.get("token")
+        return jwt_verify(token, self.jwt_secret) if token else None
+
+    def _is_admin(self, request):
+        claims = self._claims(request)
+        return bool(claims) and claims.get("role") == "ADMIN"
+
+    def _login_response(self, user, message, status):
+        token = jwt_sign({"userId": user["id"], "email": user["email"], "role": user["role"]}, self.jwt_secret)
+        return Response(status, {"message": message,
+                                 "user": {"id": user["id"], "email": user["email"], "role": user["role"]}},
+                        headers={"Set-Cookie": token_cookie(token)})
+
+    def _missing_products(self, items):
+        # existingProducts.length !== productIds.length in the checkout routes
+        product_ids = [item["product"]["id"] for item in items]
+        return len({pid for pid in product_ids if pid in self.store.products}) != len(product_ids)
+
+    # ---- public routes ---------------------------------------------------
+
+    def get_products(self, request):
+        query = request.query
+        return Response(200, self.store.products_page(
+            category=query.get("category", [None])[0],
+            limit=_int_param(query, "limit"),
+            skip=_int_param(query, "skip"),
+            exclude_image=query.get("excludeImage", [""])[0] == "true"))
+
+    def get_product_image(self, request, id):
+        product = self.store.products.get(id)
+        if product is None:
+            return Response(404, {"error": "Product not found"})
+        return Response(200, {"imagePath": product["imagePath"]})
+
+    def static_asset(self, request, name):
+        """public/assets/* with the validators Next.js sends for public files, answering conditional GETs"""
+        path = os.path.join(ASSETS_DIR, "assets", name)
+        if not os.path.isfile(path):
+            return Response(404, body=b"Not Found", content_type="text/plain")
+        stat = os.stat(path)
+        etag = f'W/"{stat.st_size:x}-{int(stat.st_mtime * 1000):x}"'
+        headers = {"ETag": etag, "Last-Modified": formatdate(stat.st_mtime, usegmt=True),
+                   "Cache-Control": "public, max-age=0"}
+        if_none_match = request.headers.get("if-none-match")
+        if if_none_match is not None:
+            not_modified = etag in [tag.strip() for tag in if_none_match.split(",")] or if_none_match == "*"
+        else:
+            try:
+                since = parsedate_to_datetime(request.headers["if-modified-since"]).timestamp()
+                not_modified = int(stat.st_mtime) <= since
+            except (KeyError, TypeError, ValueError):
+                not_modified = False
+        if not_modified:
+            return Response(304, headers=headers, body=b"")
+        with open(path, "rb") as f:
+            body = f.read()
+        content_type = mimetypes.guess_type(name)[0] or "application/octet-stream"
+        return Response(200, headers=headers, body=body, content_type=content_type)
+
+    def signup(self, request):
+        body = request.json() or {}
+        email, password = body.get("email"), body.get("password")
+        if not email or not password:
+            return Response(400, {"error": "Email and password are required"})
+        if email in self.store.users:
+            return Response(400, {"error": "User already exists"})
+        user = self.store.create_user(email, password)
+        return self._login_response(user, "User created and logged in successfully", 201)
+
+    def login(self, request):
+        body = request.json() or {}
+        email, password = body.get("email"), body.get("password")
+        if not email or not password:
+            return Response(400, {"error": "Email and password are required"})
+        user = self.store.users.get(email)
+        if user is None or not self.store.check_password(password, user["password"]):
+            return Response(401, {"error": "Invalid credentials"})
+        return self._login_response(user, "Login successful", 200)
+
+    def logout(self, request):
+        return Response(200, {"message": "Logged out successfully"},
+                        headers={"Set-Cookie": "token=; Path=/; Expires=Thu, 01 Jan 1970 00:00:00 GMT; HttpOnly"})
+
+    def me(self, request):
+        claims = self._claims(request)
+        if not claims:
+            return Response(401, {"authenticated": False})
+        return Response(200, {"authenticated": True, "user": {"id": claims["userId"], "email": claims["email"],
+                                                              "role": claims["role"]}})
+
+    def create_cod_order(self, request):
+        if not request.cookies.get("token"):
+            return Response(401, {"error": "Unauthorized"})
+        claims = self._claims(request)
+        if not claims:
+            return Response(401, {"error": "Invalid token"})
+        body = request.json() or {}
+        items, total = body.get("items"), body.get("totalAmount")
+        if not items or not total:
+            return Response(400, {"error": "Missing order details"})
+        if self._missing_products(items):
+            return Response(400, {"error": "Some products in your cart are no longer available"})
+        order = self.store.create_order(claims["userId"], items, total, "COD", False)
+        return Response(201, {"success": True, "message": "Order placed successfully (COD)", "orderId": order["id"]})
+
+    def create_razorpay_order(self, request):
+        body = request.json() or {}
+        if not body.get("amount"):
+            return Response(400, {"error": "Amount is required"})
+        return Response(200, {"id": f"order_{secrets.token_hex(7)}", "entity": "order",
+                              "amount": round(float(body["amount"]) * 100), "currency": "INR",
+                              "receipt": f"receipt_{secrets.token_hex(4)}", "status": "created"})
+
+    def verify_payment(self, request):
+        body = request.json() or {}
+        order_id, payment_id = body.get("razorpay_order_id"), body.get("razorpay_payment_id")
+        signature, items, total = body.get("razorpay_signature"), body.get("items"), body.get("totalAmount")
+        if not order_id or not payment_id or not signature or not items or not total:
+            return Response(400, {"error": "Missing details for verification"})
+        if not request.cookies.get("token"):
+            return Response(401, {"error": "Unauthorized"})
+        claims = self._claims(request)
+        if not claims:
+            return Response(401, {"error": "Invalid token"})
+        if razorpay_signature(order_id, payment_id, self.razorpay_key_secret) != signature:
+            return Response(400, {"error": "Invalid payment signature"})
+        if self._missing_products(items):
+            return Response(400, {"error": "Some products in your order are no longer available"})
+        order = self.store.create_order(claims["userId"], items, total, "ONLINE", True,
+                                        razorpay_order_id=order_id, razorpay_payment_id=payment_id)
+        return Response(200, {"success": True, "message": "Payment verified and order created",
+                              "orderId": order["id"]})
+
+    # ---- admin routes ----------------------------------------------------
+
+    def admin_list_products(self, request):
+        if not self._is_admin(request):
+            return Response(401, {"error": "Unauthorized"})
+        query = request.query
+        return Response(200, self.store.products_page(
+            limit=_int_param(query, "limit"),
+            skip=_int_param(query, "skip"),
+            exclude_image=query.get("excludeImage", [""])[0] == "true"))
+
+    def admin_create_product(self, request):
+        if not self._is_admin(request):
+            return Response(401, {"error": "Unauthorized"})
+        try:
+            return Response(200, self.store.create_product(request.json()))
+        except (KeyError, TypeError, ValueError):
+            return Response(500, {"error": "Failed to create product"})
+
+    def admin_update_product(self, request, id):
+        if not self._is_admin(request):
+            return Response(401, {"error": "Unauthorized"})
+        product = self.store.products.get(id)
+        if product is None:
+            return Response(500, {"error": "Failed to update product"})
+        body = request.json() or {}
+        for field in ("name", "category", "description", "imagePath", "inStock", "isFeatured"):
+            if body.get(field) is not None:
+                product[field] = body[field]
+        for field in ("price", "rating"):
+            if body.get(field):
+                product[field] = float(body[field])
+        product["updatedAt"] = iso(datetime.now(timezone.utc))
+        return Response(200, product)
+
+    def admin_delete_product(self, request, id):
+        if not self._is_admin(request):
+            return Response(401, {"error": "Unauthorized"})
+        if id not in self.store.products:
+            return Response(500, {"error": "Failed to force delete product"})
+        for order in self.store.orders.values():
+            order["items"] = [item for item in order["items"] if item["productId"] != id]
+        del self.store.products[id]
+        return Response(200, {"message": "Product and related order history deleted"})
+
+    def _order_with_relations(self, order, product_fields):
+        items = []
+        for item in order["items"]:
+            product = self.store.products.get(item["productId"], {})
+            items.append(dict(item, product={field: product.get(field) for field in product_fields}))
+        return dict(order, user={"email": self.store.user_email(order["userId"])}, items=items)
+
+    def admin_list_orders(self, request):
+        if not self._is_admin(request):
+            return Response(401, {"error": "Unauthorized"})
+        orders = sorted(self.store.orders.values(), key=lambda order: order["createdAt"], reverse=True)
+        return Response(200, [self._order_with_relations(order, PRODUCT_FIELDS_NO_IMAGE) for order in orders])
+
+    def admin_update_order(self, request, id):
+        if not self._is_admin(request):
+            return Response(401, {"error": "Unauthorized"})
+        order = self.store.orders.get(id)
+        if order is None:
+            return Response(500, {"error": "Failed to update order"})
+        body = request.json() or {}
+        for field in ("status", "isPaid"):
+            if body.get(field) is not None:
+                order[field] = body[field]
+        order["updatedAt"] = iso(datetime.now(timezone.utc))
+        return Response(200, {key: value for key, value in order.items() if key != "items"})
+
+    def admin_stats(self, request):
+        if not self._is_admin(request):
+            return Response(401, {"error": "Unauthorized"})
+        orders = sorted(self.store.orders.values(), key=lambda order: order["createdAt"], reverse=True)
+        live = [order for order in orders if order["status"] != "CANCELLED"]
+        return Response(200, {
+            "revenue": sum(order["totalAmount"] for order in live),
+            "orders": len(orders),
+            "products": len(self.store.products),
+            "customers": len({self.store.user_email(order["userId"]) for order in live}),
+            "recentOrders": [self._order_with_relations(order, ("id", "name")) for order in orders[:5]],
+        })
+
+
+def main():
+    import argparse
+    parser = argparse.ArgumentParser(description="Run the mock jewellery store API")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=3001)
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds added to every response")
+    parser.add_argument("--jitter", type=float, default=0.0, help="extra random delay, up to this many seconds")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="probability of an injected 500")
+    parser.add_argument("--inline-images", action="store_true", help="store images as base64 like prisma/seed.js")
+    parser.add_argument("--catalogue-cache", choices=CACHE_LAYERS, default="off",
+                        help="cache layer in front of the public product reads")
+    args = parser.parse_args()
+
+    backend = MockBackend(host=args.host, port=args.port, latency=args.latency, jitter=args.jitter,
+                          error_rate=args.error_rate, inline_images=args.inline_images,
+                          catalogue_cache=args.catalogue_cache)
+    print(f"Mock API listening on {backend.start()} (Ctrl+C to stop)")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        backend.stop()
+
+
+if __name__ == "__main__":
+    main()
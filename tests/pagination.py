@@ -0,0 +1,197 @@
+"""
+Offset-pagination scan benchmark for /api/products and /api/admin/products.
+
+Both routes page with Prisma take/skip ordered by createdAt, so Postgres has
+to walk past `skip` rows for every page. This seeds a large catalogue, walks
+every page at several page sizes with and without excludeImage, and reports
+how latency grows with offset.
+"""
+
+import csv
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from tests.mock_server import ADMIN_EMAIL, ADMIN_PASSWORD
+
+ROUTES = ("/products", "/admin/products")
+SEED_CATEGORIES = ("Earring", "Traditional Nath", "Mangalsutra", "Jewellery Set", "Embroidery")
+
+
+def seed_product(index):
+    """Deterministic synthetic catalogue row for bulk seeding"""
+    return {
+        "name": f"Bench Product {index:07d}",
+        "price": 79 + index % 1200,
+        "category": SEED_CATEGORIES[index % len(SEED_CATEGORIES)],
+        "description": f"Synthetic product {index} seeded for the pagination benchmark. " * 3,
+        "imagePath": "/assets/silverjumka.jpeg",
+        "inStock": index % 17 != 0,
+        "rating": round(3.5 + (index % 15) / 10, 1),
+        "isFeatured": index % 25 == 0,
+    }
+
+
+def admin_login(client, base_url, email=ADMIN_EMAIL, password=ADMIN_PASSWORD):
+    """Log the client's cookie jar in as admin"""
+    response = client.post(f"{base_url}/auth/login", json={"email": email, "password": password})
+    if response.status_code != 200:
+        raise RuntimeError(f"Admin login failed: HTTP {response.status_code} {response.text}")
+
+
+def seed_via_api(admin_client, base_url, count, workers=8):
+    """Create `count` products through POST /api/admin/products; returns their ids"""
+
+    def create(index):
+        response = admin_client.post(f"{base_url}/admin/products", json=seed_product(index))
+        return response.json()["id"] if response.status_code == 200 else None
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        ids = [product_id for product_id in pool.map(create, range(count)) if product_id]
+    if len(ids) < count:
+        print(f"Warning: only {len(ids)} of {count} products were created")
+    return ids
+
+
+def seed_via_mock(backend, count):
+    """Insert `count` products straight into a MockBackend's store; returns their ids"""
+    return [backend.store.create_product(seed_product(index))["id"] for index in range(count)]
+
+
+def delete_seeded(admin_client, base_url, ids, workers=8):
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        list(pool.map(lambda product_id: admin_client.delete(f"{base_url}/admin/products/{product_id}"), ids))
+
+
+def walk_pages(client, base_url, route, page_size, exclude_image):
+    """Fetch every page of `route` in order; returns [(offset, latency_ms, bytes, rows)]"""
+    samples = []
+    offset = 0
+    while True:
+        params = {"limit": page_size, "skip": offset}
+        if exclude_image:
+            params["excludeImage"] = "true"
+        start = time.perf_counter()
+        response = client.get(f"{base_url}{route}", params=params)
+        body = response.content
+        latency_ms = (time.perf_counter() - start) * 1000
+        if response.status_code != 200:
+            raise RuntimeError(f"GET {route} skip={offset}: HTTP {response.status_code}")
+        rows = len(response.json())
+        samples.append((offset, latency_ms, len(body), rows))
+        if rows < page_size:
+            return samples
+        offset += page_size
+
+
+def _slope(points):
+    """Least-squares slope of latency (ms) per 1000 rows of offset"""
+    if len(points) < 2:
+        return 0.0
+    mean_x = sum(x for x, _ in points) / len(points)
+    mean_y = sum(y for _, y in points) / len(points)
+    var_x = sum((x - mean_x) ** 2 for x, _ in points)
+    if not var_x:
+        return 0.0
+    return sum((x - mean_x) * (y - mean_y) for x, y in points) / var_x * 1000
+
+
+def full_pages(samples, page_size):
+    """Drop the short final page, whose smaller payload would skew offset comparisons"""
+    return [sample for sample in samples if sample[3] == page_size] or samples
+
+
+def summarize(samples):
+    """Latency growth between the first and last tenth of the offsets walked"""
+    tenth = max(len(samples) // 10, 1)
+    head = sorted(latency for _, latency, _, _ in samples[:tenth])
+    tail = sorted(latency for _, latency, _, _ in samples[-tenth:])
+    first_ms = head[len(head) // 2]
+    last_ms = tail[len(tail) // 2]
+    return {
+        "pages": len(samples),
+        "rows": sum(rows for _, _, _, rows in samples),
+        "bytes": sum(size for _, _, size, _ in samples),
+        "first_pages_ms": first_ms,
+        "last_pages_ms": last_ms,
+        "growth": last_ms / first_ms if first_ms else 0.0,
+        "ms_per_1k_offset": _slope([(offset, latency) for offset, latency, _, _ in samples]),
+    }
+
+
+def run_pagination_benchmark(client, admin_client, base_url, page_sizes=(12, 48, 200), repeats=3):
+    """
+    Walk both routes at each page size, with and without excludeImage.
+    Returns {(route, page_size, exclude_image): samples}, keeping the fastest
+    of `repeats` walks per offset to filter out one-off stalls.
+    """
+    series = {}
+    for route in ROUTES:
+        http = admin_client if route.startswith("/admin") else client
+        for page_size in page_sizes:
+            for exclude_image in (True, False):
+                walks = [walk_pages(http, base_url, route, page_size, exclude_image) for _ in range(repeats)]
+                best = {}
+                for walk in walks:
+                    for offset, latency, size, rows in walk:
+                        if offset not in best or latency < best[offset][1]:
+                            best[offset] = (offset, latency, size, rows)
+                series[(route, page_size, exclude_image)] = [best[offset] for offset in sorted(best)]
+    return series
+
+
+def write_csv(series, path):
+    with open(path, "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["route", "page_size", "exclude_image", "offset", "latency_ms", "bytes", "rows"])
+        for (route, page_size, exclude_image), samples in series.items():
+            for offset, latency, size, rows in samples:
+                writer.writerow([route, page_size, exclude_image, offset, f"{latency:.3f}", size, rows])
+
+
+def write_plot(series, path):
+    """Latency-vs-offset chart; needs matplotlib, returns False when it is missing"""
+    try:
+        import matplotlib
+        matplotlib.use("Agg")
+        import matplotlib.pyplot as plt
+    except ImportError:
+        return False
+    fig, axes = plt.subplots(1, len(ROUTES), figsize=(7 * len(ROUTES), 5), squeeze=False)
+    for axis, route in zip(axes[0], ROUTES):
+        for (series_route, page_size, exclude_image), samples in series.items():
+            if series_route != route:
+                continue
+            axis.plot([s[0] for s in samples], [s[1] for s in samples],
+                      label=f"limit={page_size}{' excludeImage' if exclude_image else ''}")
+        axis.set_title(f"GET /api{route}")
+        axis.set_xlabel("skip (rows)")
+        axis.set_ylabel("latency (ms)")
+        axis.legend()
+    fig.tight_layout()
+    fig.savefig(path)
+    return True
+
+
+def print_pagination_report(series, width=40):
+    """Per-series growth table plus a text plot of latency by offset decile"""
+    print("=" * 100)
+    print("PAGINATION SCAN SUMMARY")
+    print("=" * 100)
+    print(f"{'Route':<20}{'Limit':>6}{'NoImg':>7}{'Pages':>7}{'KB':>10}{'First ms':>10}{'Last ms':>10}"
+          f"{'Growth':>8}{'ms/1k off':>11}")
+    for (route, page_size, exclude_image), samples in series.items():
+        stats = summarize(full_pages(samples, page_size))
+        print(f"{route:<20}{page_size:>6}{'yes' if exclude_image else 'no':>7}{stats['pages']:>7}"
+              f"{stats['bytes'] / 1024:>10.1f}{stats['first_pages_ms']:>10.1f}{stats['last_pages_ms']:>10.1f}"
+              f"{stats['growth']:>7.2f}x{stats['ms_per_1k_offset']:>11.3f}")
+
+    for (route, page_size, exclude_image), samples in series.items():
+        samples = full_pages(samples, page_size)
+        print(f"\n{route} limit={page_size}{' excludeImage' if exclude_image else ''}: median ms by offset")
+        bins = min(10, len(samples))
+        groups = [samples[len(samples) * b // bins:len(samples) * (b + 1) // bins] for b in range(bins)]
+        medians = [sorted(sample[1] for sample in group)[len(group) // 2] for group in groups]
+        peak = max(medians) or 1
+        for group, median in zip(groups, medians):
+            bar = "#" * max(int(median / peak * width), 1)
+            print(f"  skip>={group[0][0]:>8}  {median:>8.1f} {bar}")
@@ -0,0 +1,91 @@
+"""
+Parallel, isolated execution of the backend test suites.
+
+The suites share state when run in sequence: the order suite checks out the
+cart the cart suite filled, all under one sessionId. Here each suite becomes
+an independent unit that builds its own fixtures instead: a fresh cart
+session in a cookie jar of its own, with any prerequisite suites replayed
+silently against it. Units then run on a process pool, one HTTP client per
+worker process, so wall-clock time drops with the number of workers.
+"""
+
+import os
+import secrets
+import time
+
+# unit name -> (suites replayed as setup, suite whose checks are reported)
+UNITS = {
+    "products": ((), "test_products_endpoints"),
+    "cart": ((), "test_cart_endpoints"),
+    "payment": (("test_cart_endpoints",), "test_payment_endpoints"),
+    "orders": (("test_cart_endpoints",), "test_order_endpoints"),
+    "errors": ((), "test_error_handling"),
+}
+
+_worker_client = None
+
+
+def _init_worker(client_factory):
+    global _worker_client
+    _worker_client = client_factory()
+
+
+def run_unit(tester_cls, base_url, name, client=None):
+    """Run one unit with its own session and cookie jar; returns its results and timing"""
+    client = client or _worker_client
+    setup_suites, suite = UNITS[name]
+    http = client.fork()
+    start = time.perf_counter()
+    session_id = f"unit_{name}_{secrets.token_hex(6)}"
+    # Prerequisites run on a separate tester so their checks aren't reported twice
+    setup = tester_cls(base_url=base_url, session_id=session_id, http=http, verbose=False)
+    for setup_suite in setup_suites:
+        getattr(setup, setup_suite)()
+    tester = tester_cls(base_url=base_url, session_id=session_id, http=http, verbose=False)
+    getattr(tester, suite)()
+    return {
+        "unit": name,
+        "session_id": session_id,
+        "pid": os.getpid(),
+        "elapsed_s": time.perf_counter() - start,
+        "setup_failures": sum(1 for result in setup.test_results if not result["success"]),
+        "results": tester.test_results,
+    }
+
+
+def run_parallel(tester_cls, base_url, client_factory, units=None, workers=None):
+    """
+    Run the units on a pool of `workers` processes (default: one per core).
+    client_factory must be picklable (e.g. functools.partial(PooledClient, ...));
+    each worker calls it once and forks that client per unit.
+    Returns (unit_reports in UNITS order, wall_seconds).
+    """
+    # Deferred: multiprocessing is slow to import and only needed here
+    from concurrent.futures import ProcessPoolExecutor, as_completed
+
+    units = list(units or UNITS)
+    workers = workers or os.cpu_count() or 1
+    start = time.perf_counter()
+    reports = {}
+    with ProcessPoolExecutor(max_workers=min(workers, len(units)), initializer=_init_worker,
+                             initargs=(client_factory,)) as pool:
+        futures = {pool.submit(run_unit, tester_cls, base_url, name): name for name in units}
+        for future in as_completed(futures):
+            reports[futures[future]] = future.result()
+    return [reports[name] for name in units], time.perf_counter() - start
+
+
+def print_parallel_report(reports, wall_s, workers):
+    """Per-unit pass/fail and time, plus the speedup over running the units back to back"""
+    print("=" * 60)
+    print("PARALLEL UNITS")
+    print("=" * 60)
+    print(f"{'Unit':<12}{'Passed':>8}{'Failed':>8}{'Setup fail':>12}{'Seconds':>10}{'PID':>9}  Session")
+    for report in reports:
+        passed = sum(1 for result in report["results"] if result["success"])
+        failed = len(report["results"]) - passed
+        print(f"{report['unit']:<12}{passed:>8}{failed:>8}{report['setup_failures']:>12}"
+              f"{report['elapsed_s']:>10.2f}{report['pid']:>9}  {report['session_id']}")
+    serial_s = sum(report["elapsed_s"] for report in reports)
+    print(f"\nWorkers: {workers}  wall clock: {wall_s:.2f}s  units back to back: {serial_s:.2f}s  "
+          f"speedup: {serial_s / wall_s if wall_s else 0:.1f}x")
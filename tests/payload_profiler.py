@@ -0,0 +1,254 @@
+"""
+Payload-size and over-fetch profiler for API responses.
+
+Wraps a client so every JSON response is measured (bytes, parse time, bytes
+per field path such as "[].items[].product.description") and handed back as
+tracking containers that remember which fields the scenario actually read.
+Fields that are fetched but never read are over-fetch: bandwidth and
+serialization time spent for nothing.
+"""
+
+import json
+import threading
+import time
+
+from tests.metrics import endpoint_label
+
+
+def _serialized_len(value):
+    return len(json.dumps(value, separators=(",", ":"), ensure_ascii=False).encode())
+
+
+def field_sizes(value, path="", sizes=None):
+    """Bytes attributable to each field path ("key" plus value) in a parsed JSON document"""
+    sizes = {} if sizes is None else sizes
+    if isinstance(value, dict):
+        for key, child in value.items():
+            child_path = f"{path}.{key}" if path else key
+            sizes[child_path] = sizes.get(child_path, 0) + len(json.dumps(key)) + 1 + _serialized_len(child)
+            field_sizes(child, child_path, sizes)
+    elif isinstance(value, list):
+        for child in value:
+            field_sizes(child, f"{path}[]", sizes)
+    return sizes
+
+
+def track(value, path, accessed):
+    if isinstance(value, dict):
+        return TrackedDict(value, path, accessed)
+    if isinstance(value, list):
+        return TrackedList(value, path, accessed)
+    return value
+
+
+class TrackedDict(dict):
+    """dict that records every key read through it (and wraps nested values)"""
+
+    def __init__(self, data, path, accessed):
+        super().__init__(data)
+        self._path = path
+        self._accessed = accessed
+
+    def _child_path(self, key):
+        return f"{self._path}.{key}" if self._path else str(key)
+
+    def __getitem__(self, key):
+        self._accessed.add(self._child_path(key))
+        return track(super().__getitem__(key), self._child_path(key), self._accessed)
+
+    def get(self, key, default=None):
+        self._accessed.add(self._child_path(key))
+        return track(super().get(key, default), self._child_path(key), self._accessed)
+
+    def __contains__(self, key):
+        self._accessed.add(self._child_path(key))
+        return super().__contains__(key)
+
+    def values(self):
+        return [self[key] for key in self.keys()]
+
+    def items(self):
+        return [(key, self[key]) for key in self.keys()]
+
+
+class TrackedList(list):
+    """list whose elements are wrapped so reads below it are tracked"""
+
+    def __init__(self, data, path, accessed):
+        super().__init__(data)
+        self._path = path
+        self._accessed = accessed
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [track(item, f"{self._path}[]", self._accessed) for item in super().__getitem__(index)]
+        return track(super().__getitem__(index), f"{self._path}[]", self._accessed)
+
+    def __iter__(self):
+        for item in super().__iter__():
+            yield track(item, f"{self._path}[]", self._accessed)
+
+
+def untrack(value):
+    """Plain copy of a (possibly tracked) value, read without marking any field as used"""
+    if isinstance(value, dict):
+        return {key: untrack(child) for key, child in dict.items(value)}
+    if isinstance(value, list):
+        return [untrack(child) for child in list.__iter__(value)]
+    return value
+
+
+class EndpointProfile:
+    def __init__(self):
+        self.requests = 0
+        self.bytes = 0
+        self.parse_s = 0.0
+        self.field_bytes = {}
+        self.accessed = set()
+
+
+class PayloadProfiler:
+    """Thread-safe per-endpoint payload statistics and field access sets"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.endpoints = {}
+
+    def profile(self, label, raw):
+        """Parse a response body, record its cost, and return it as tracking containers"""
+        start = time.perf_counter()
+        data = json.loads(raw)
+        parse_s = time.perf_counter() - start
+        sizes = field_sizes(data)
+        with self.lock:
+            profile = self.endpoints.setdefault(label, EndpointProfile())
+            profile.requests += 1
+            profile.bytes += len(raw)
+            profile.parse_s += parse_s
+            for path, size in sizes.items():
+                profile.field_bytes[path] = profile.field_bytes.get(path, 0) + size
+            accessed = profile.accessed
+        return track(data, "", accessed)
+
+    def report(self):
+        """Per endpoint: bytes, parse time, field breakdown and the top-most never-read fields"""
+        report = {}
+        with self.lock:
+            items = sorted(self.endpoints.items())
+        for label, profile in items:
+            used = set(profile.accessed)
+            # A field counts as used when it, or anything nested inside it, was read
+            for path in list(used):
+                while "." in path or path.endswith("[]"):
+                    path = path[:-2] if path.endswith("[]") else path.rsplit(".", 1)[0]
+                    used.add(path)
+            unused = [path for path in profile.field_bytes if path not in used]
+            top_unused = [path for path in unused
+                          if not any(path.startswith(parent + ".") or path.startswith(parent + "[]")
+                                     for parent in unused if parent != path)]
+            unused_bytes = sum(profile.field_bytes[path] for path in top_unused)
+            report[label] = {
+                "requests": profile.requests,
+                "total_bytes": profile.bytes,
+                "mean_bytes": profile.bytes / profile.requests,
+                "mean_parse_ms": profile.parse_s / profile.requests * 1000,
+                "field_bytes": dict(sorted(profile.field_bytes.items(), key=lambda item: -item[1])),
+                "unused_fields": sorted(top_unused, key=lambda path: -profile.field_bytes[path]),
+                "unused_share": unused_bytes / profile.bytes if profile.bytes else 0.0,
+                "body_read": bool(profile.accessed),
+            }
+        return report
+
+
+class ProfiledResponse:
+    """Response proxy whose json() returns tracking containers"""
+
+    def __init__(self, response, data):
+        self._response = response
+        self._data = data
+
+    def json(self, **kwargs):
+        return self._data
+
+    def __getattr__(self, name):
+        return getattr(self._response, name)
+
+
+class ProfilingClient:
+    """Client wrapper that routes every JSON response through a PayloadProfiler"""
+
+    def __init__(self, http, profiler):
+        self.http = http
+        self.profiler = profiler
+
+    def fork(self):
+        return ProfilingClient(self.http.fork(), self.profiler)
+
+    def take_timing(self):
+        take_timing = getattr(self.http, "take_timing", None)
+        return take_timing() if take_timing else None
+
+    def request(self, method, url, **kwargs):
+        if "json" in kwargs:
+            # Echoing a fetched object back to the server (e.g. a whole product in
+            # an order's items) is exactly the over-fetch to expose, not a read
+            kwargs["json"] = untrack(kwargs["json"])
+        response = self.http.request(method, url, **kwargs)
+        if "json" not in response.headers.get("Content-Type", "") or not response.content:
+            return response
+        try:
+            data = self.profiler.profile(endpoint_label(method, url), response.content)
+        except ValueError:
+            return response
+        return ProfiledResponse(response, data)
+
+    def get(self, url, **kwargs):
+        return self.request("GET", url, **kwargs)
+
+    def post(self, url, **kwargs):
+        return self.request("POST", url, **kwargs)
+
+    def put(self, url, **kwargs):
+        return self.request("PUT", url, **kwargs)
+
+    def patch(self, url, **kwargs):
+        return self.request("PATCH", url, **kwargs)
+
+    def delete(self, url, **kwargs):
+        return self.request("DELETE", url, **kwargs)
+
+    def close(self):
+        self.http.close()
+
+    def __getattr__(self, name):
+        # stats, histograms etc. of the wrapped PooledClient
+        return getattr(self.http, name)
+
+
+def _under(path, parents):
+    return any(path == parent or path.startswith(parent + ".") or path.startswith(parent + "[]")
+               for parent in parents)
+
+
+def print_payload_report(report, top_fields=5):
+    """Print bytes/parse cost per endpoint with its heaviest and never-read fields"""
+    print("=" * 100)
+    print("PAYLOAD PROFILE")
+    print("=" * 100)
+    print(f"{'Endpoint':<45}{'Reqs':>7}{'Mean KB':>10}{'Total KB':>11}{'Parse ms':>10}{'Unused':>9}")
+    for label, profile in report.items():
+        unused = f"{profile['unused_share'] * 100:>8.0f}%" if profile["body_read"] else f"{'-':>9}"
+        print(f"{label:<45}{profile['requests']:>7}{profile['mean_bytes'] / 1024:>10.1f}"
+              f"{profile['total_bytes'] / 1024:>11.1f}{profile['mean_parse_ms']:>10.2f}{unused}")
+    for label, profile in report.items():
+        if not profile["field_bytes"]:
+            continue
+        print(f"\n{label}")
+        for path, size in list(profile["field_bytes"].items())[:top_fields]:
+            share = size / profile["total_bytes"] * 100
+            flag = "  (never read)" if profile["body_read"] and _under(path, profile["unused_fields"]) else ""
+            print(f"  {path:<50}{size / 1024:>10.1f} KB {share:>5.1f}%{flag}")
+        if not profile["body_read"]:
+            print("  response body never read by the workload")
+        elif profile["unused_fields"]:
+            print(f"  fetched but never read: {', '.join(profile['unused_fields'])}")
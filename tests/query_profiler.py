@@ -0,0 +1,259 @@
+"""
+Per-endpoint SQL cost from pg_stat_statements, with an index usage check.
+
+Against a local Postgres with the pg_stat_statements extension, each endpoint
+is called on its own (serially, so every statement in the window belongs to
+it) and the statement and table statistics are diffed around its calls. That
+gives, per request: queries issued, rows returned, rows scanned (sequential
+and via index), database time and buffer reads, next to the HTTP latency.
+
+The filter and sort columns of each endpoint's statements are then checked
+against the database's indexes and the @@index definitions in
+prisma/schema.prisma: a column the schema declares an index for but the
+database doesn't have (no migration creates one) is flagged, as is any other
+filter column without an index on a table the endpoint sequentially scanned.
+"""
+
+import os
+import re
+import time
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SCHEMA_FILE = os.path.join(REPO_ROOT, "prisma", "schema.prisma")
+MIGRATIONS_DIR = os.path.join(REPO_ROOT, "prisma", "migrations")
+
+# label -> (method, path template, JSON body); {product_id} and {category} are filled from the catalogue
+ENDPOINTS = {
+    "GET /api/products": ("GET", "/products", None),
+    "GET /api/products?excludeImage": ("GET", "/products?excludeImage=true", None),
+    "GET /api/products?category": ("GET", "/products?category={category}", None),
+    "GET /api/products?limit&skip": ("GET", "/products?limit=12&skip=0", None),
+    "GET /api/products/[id]/image": ("GET", "/products/{product_id}/image", None),
+    "POST /api/auth/login": ("POST", "/auth/login", "credentials"),
+    "GET /api/admin/products": ("GET", "/admin/products?limit=20&skip=0&excludeImage=true", None),
+    "GET /api/admin/orders": ("GET", "/admin/orders", None),
+    "GET /api/admin/stats": ("GET", "/admin/stats", None),
+}
+
+EXTENSION_SQL = "SELECT 1 FROM pg_extension WHERE extname = 'pg_stat_statements'"
+TIME_COLUMN_SQL = """
+    SELECT attname FROM pg_attribute
+    WHERE attrelid = 'pg_stat_statements'::regclass AND attname IN ('total_exec_time', 'total_time')
+"""
+# The profiler's own catalogue queries are left out by their text
+STATEMENTS_SQL = """
+    SELECT queryid, query, calls, rows, {time_column}, shared_blks_hit, shared_blks_read
+    FROM pg_stat_statements
+    WHERE dbid = (SELECT oid FROM pg_database WHERE datname = current_database())
+      AND query NOT LIKE '%pg_stat%' AND query NOT LIKE '%pg_index%'
+"""
+TABLE_STATS_SQL = """
+    SELECT relname, seq_scan, seq_tup_read, COALESCE(idx_scan, 0), COALESCE(idx_tup_fetch, 0)
+    FROM pg_stat_user_tables WHERE schemaname = 'public'
+"""
+INDEX_STATS_SQL = "SELECT relname, indexrelname, idx_scan FROM pg_stat_user_indexes WHERE schemaname = 'public'"
+INDEX_COLUMNS_SQL = """
+    SELECT t.relname, i.relname, array_agg(a.attname ORDER BY k.ord)
+    FROM pg_index x
+    JOIN pg_class t ON t.oid = x.indrelid
+    JOIN pg_class i ON i.oid = x.indexrelid
+    JOIN pg_namespace n ON n.oid = t.relnamespace
+    CROSS JOIN LATERAL unnest(x.indkey) WITH ORDINALITY AS k(attnum, ord)
+    JOIN pg_attribute a ON a.attrelid = t.oid AND a.attnum = k.attnum
+    WHERE n.nspname = 'public'
+    GROUP BY t.relname, i.relname
+"""
+
+MODEL_RE = re.compile(r"^model\s+(\w+)\s*\{(.*?)^\}", re.M | re.S)
+SCHEMA_INDEX_RE = re.compile(r"@@index\(\s*\[([^\]]*)\]")
+MIGRATION_INDEX_RE = re.compile(r'CREATE\s+(?:UNIQUE\s+)?INDEX\s+"(\w+)"\s+ON\s+"(\w+)"\s*\(([^)]*)\)', re.I)
+# "Table"."column" (a trailing dot would make it "schema"."Table")
+COLUMN_REF_RE = re.compile(r'"(\w+)"\."(\w+)"(?!\.)')
+
+
+def schema_indexes(path=SCHEMA_FILE):
+    """@@index definitions in schema.prisma as [(table, (columns...))]"""
+    with open(path) as f:
+        schema = f.read()
+    indexes = []
+    for model, body in MODEL_RE.findall(schema):
+        for fields in SCHEMA_INDEX_RE.findall(body):
+            indexes.append((model, tuple(field.strip() for field in fields.split(","))))
+    return indexes
+
+
+def migration_indexes(directory=MIGRATIONS_DIR):
+    """Indexes the migrations create, as [(name, table, (columns...))]"""
+    indexes = []
+    for name in sorted(os.listdir(directory)):
+        path = os.path.join(directory, name, "migration.sql")
+        if not os.path.isfile(path):
+            continue
+        with open(path) as f:
+            for index, table, columns in MIGRATION_INDEX_RE.findall(f.read()):
+                indexes.append((index, table, tuple(column.strip().strip('"') for column in columns.split(","))))
+    return indexes
+
+
+def declared_index_status(database_indexes=None):
+    """Each schema @@index with whether a migration creates it and (given the DB's indexes) whether it exists"""
+    migrated = {(table, columns) for _, table, columns in migration_indexes()}
+    status = []
+    for table, columns in schema_indexes():
+        entry = {"table": table, "columns": columns, "migrated": (table, columns) in migrated, "in_database": None}
+        if database_indexes is not None:
+            entry["in_database"] = any(indexed[:len(columns)] == columns
+                                       for indexed in database_indexes.get(table, {}).values())
+        status.append(entry)
+    return status
+
+
+def filter_columns(query):
+    """(table, column) pairs a statement filters, joins or sorts on - those after its WHERE/ORDER BY"""
+    match = re.search(r"\b(WHERE|ORDER BY|ON)\b", query)
+    return set(COLUMN_REF_RE.findall(query[match.start():])) if match else set()
+
+
+class QueryProfiler:
+    """Diffs pg_stat_statements and table/index statistics around each endpoint's calls"""
+
+    def __init__(self, sink, settle=1.5):
+        self.sink = sink
+        # Table and index counters reach the shared stats when a backend flushes, up to ~1s after its query
+        self.settle = settle
+        if not sink.fetchall(EXTENSION_SQL):
+            raise RuntimeError("pg_stat_statements is not installed: add it to shared_preload_libraries and run "
+                               "CREATE EXTENSION pg_stat_statements")
+        time_column = sink.fetchall(TIME_COLUMN_SQL)[0][0]
+        self.statements_sql = STATEMENTS_SQL.format(time_column=time_column)
+        self.declared = {(table, columns[0]) for table, columns in schema_indexes()}
+        self.indexes = {}
+        for table, index, columns in sink.fetchall(INDEX_COLUMNS_SQL):
+            self.indexes.setdefault(table, {})[index] = tuple(columns)
+
+    def snapshot(self):
+        return {
+            "statements": {row[0]: row[1:] for row in self.sink.fetchall(self.statements_sql)},
+            "tables": {row[0]: row[1:] for row in self.sink.fetchall(TABLE_STATS_SQL)},
+            "indexes": {(row[0], row[1]): row[2] for row in self.sink.fetchall(INDEX_STATS_SQL)},
+        }
+
+    def profile(self, label, call, requests=10):
+        """Run call() `requests` times between two snapshots; returns the endpoint's cost"""
+        time.sleep(self.settle)
+        before = self.snapshot()
+        errors = 0
+        start = time.perf_counter()
+        for _ in range(requests):
+            response = call()
+            errors += response.status_code >= 400
+        http_ms = (time.perf_counter() - start) * 1000
+        time.sleep(self.settle)
+        after = self.snapshot()
+        return self.cost(label, before, after, requests, errors, http_ms)
+
+    def cost(self, label, before, after, requests, errors, http_ms):
+        statements = []
+        for queryid, (query, calls, rows, total_ms, blks_hit, blks_read) in after["statements"].items():
+            previous = before["statements"].get(queryid, (query, 0, 0, 0.0, 0, 0))
+            if calls - previous[1] <= 0:
+                continue
+            statements.append({"query": " ".join(query.split()), "calls": calls - previous[1],
+                               "rows": rows - previous[2], "ms": total_ms - previous[3],
+                               "blks_hit": blks_hit - previous[4], "blks_read": blks_read - previous[5]})
+        statements.sort(key=lambda statement: -statement["ms"])
+
+        tables = {}
+        for table, counters in after["tables"].items():
+            delta = [value - old for value, old in zip(counters, before["tables"].get(table, (0, 0, 0, 0)))]
+            if any(delta):
+                tables[table] = dict(zip(("seq_scan", "seq_tup_read", "idx_scan", "idx_tup_fetch"), delta))
+        used_indexes = {key: scans - before["indexes"].get(key, 0) for key, scans in after["indexes"].items()
+                        if scans - before["indexes"].get(key, 0) > 0}
+
+        unindexed = []
+        referenced = set().union(*(filter_columns(statement["query"]) for statement in statements))
+        for table, column in sorted(referenced):
+            if any(columns[0] == column for columns in self.indexes.get(table, {}).values()):
+                continue
+            declared = (table, column) in self.declared
+            if declared or tables.get(table, {}).get("seq_scan"):
+                unindexed.append({"table": table, "column": column, "declared": declared,
+                                  "seq_tup_read": tables.get(table, {}).get("seq_tup_read", 0)})
+        return {
+            "label": label,
+            "requests": requests,
+            "errors": errors,
+            "queries": sum(statement["calls"] for statement in statements),
+            "rows": sum(statement["rows"] for statement in statements),
+            "rows_scanned": sum(table["seq_tup_read"] + table["idx_tup_fetch"] for table in tables.values()),
+            "db_ms": sum(statement["ms"] for statement in statements),
+            "blks_read": sum(statement["blks_read"] for statement in statements),
+            "http_ms": http_ms,
+            "statements": statements,
+            "tables": tables,
+            "used_indexes": sorted(f"{index} ({table})" for table, index in used_indexes),
+            "unindexed": unindexed,
+        }
+
+
+def run_query_profile(client, base_url, profiler, requests=10, endpoints=None, credentials=None):
+    """
+    Profile each endpoint (default: all of ENDPOINTS) in turn. `client` must
+    be logged in as admin; `credentials` is the login body for the auth
+    endpoint. Returns [cost per endpoint].
+    """
+    products = client.get(f"{base_url}/products?excludeImage=true").json()
+    fill = {"product_id": products[0]["id"] if products else "missing",
+            "category": products[0]["category"] if products else "Earring"}
+    report = []
+    for label in endpoints or ENDPOINTS:
+        method, path, body = ENDPOINTS[label]
+        url = base_url + path.format(**fill)
+        json_body = credentials if body == "credentials" else None
+        report.append(profiler.profile(label, lambda: client.request(method, url, json=json_body), requests))
+    return report
+
+
+def print_declared_indexes(status):
+    """Schema @@index entries against the migrations and (when profiled) the database"""
+    print("=" * 100)
+    print("DECLARED INDEXES (prisma/schema.prisma @@index)")
+    print("=" * 100)
+    print(f"{'Table':<14}{'Columns':<30}{'Migration':>11}{'Database':>10}")
+    for entry in status:
+        in_database = {True: "yes", False: "MISSING", None: "-"}[entry["in_database"]]
+        print(f"{entry['table']:<14}{', '.join(entry['columns']):<30}{'yes' if entry['migrated'] else 'MISSING':>11}"
+              f"{in_database:>10}")
+    if any(not entry["migrated"] for entry in status):
+        print("(declared indexes without a migration exist only if the database was set up with `prisma db push`)")
+
+
+def print_query_report(report, top=3):
+    """Per-endpoint SQL cost table, then each endpoint's heaviest statements and index findings"""
+    print("=" * 110)
+    print("SQL COST PER ENDPOINT (per request)")
+    print("=" * 110)
+    print(f"{'Endpoint':<36}{'Reqs':>6}{'Queries':>9}{'Rows':>9}{'Scanned':>10}{'DB ms':>9}{'HTTP ms':>9}"
+          f"{'Blk reads':>11}{'Seq scans':>11}")
+    for cost in report:
+        n = cost["requests"] or 1
+        seq_scans = sum(table["seq_scan"] for table in cost["tables"].values())
+        print(f"{cost['label']:<36}{cost['requests']:>6}{cost['queries'] / n:>9.1f}{cost['rows'] / n:>9.1f}"
+              f"{cost['rows_scanned'] / n:>10.1f}{cost['db_ms'] / n:>9.2f}{cost['http_ms'] / n:>9.2f}"
+              f"{cost['blks_read'] / n:>11.1f}{seq_scans / n:>11.1f}")
+
+    for cost in report:
+        print(f"\n{cost['label']}" + (f"  ({cost['errors']} error responses)" if cost["errors"] else ""))
+        for statement in cost["statements"][:top]:
+            query = statement["query"] if len(statement["query"]) <= 90 else statement["query"][:87] + "..."
+            print(f"  {statement['calls']:>5}x {statement['ms']:>9.2f} ms {statement['rows']:>7} rows  {query}")
+        for table, counters in sorted(cost["tables"].items()):
+            print(f"  {table}: {counters['seq_scan']} seq scans reading {counters['seq_tup_read']} rows, "
+                  f"{counters['idx_scan']} index scans fetching {counters['idx_tup_fetch']}")
+        if cost["used_indexes"]:
+            print(f"  indexes used: {', '.join(cost['used_indexes'])}")
+        for finding in cost["unindexed"]:
+            reason = "declared with @@index but missing from the database" if finding["declared"] else \
+                "no index, and the table was sequentially scanned"
+            print(f"  UNINDEXED {finding['table']}.{finding['column']}: {reason}")
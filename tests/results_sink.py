@@ -0,0 +1,170 @@
+"""
+Constant-memory result streaming and a live Prometheus metrics endpoint.
+
+ResultsSink appends each check result to a JSONL file (gzip-compressed when
+the path ends in .gz) instead of holding it in memory, and interleaves
+periodic snapshot lines with the aggregate counts and per-endpoint latency
+so far. MetricsServer exposes a LatencyRecorder in the Prometheus text format
+(in-flight requests, recent RPS and error rate, totals and latency
+quantiles), so long load runs can be scraped or curl'd while they run.
+"""
+
+import gzip
+import json
+import threading
+import time
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from tests.metrics import REPORTED_PERCENTILES
+
+
+class ResultsSink:
+    """Thread-safe append-only JSONL writer for check results with periodic aggregate snapshots"""
+
+    def __init__(self, path, snapshot_interval=10.0, snapshot=None):
+        self.path = path
+        self.file = gzip.open(path, "at") if path.endswith(".gz") else open(path, "a", buffering=1)
+        self.snapshot = snapshot
+        self.lock = threading.Lock()
+        self.passed = 0
+        self.failed = 0
+        # Bounded by the number of distinct checks, not by run length
+        self.failures_by_test = {}
+        self.started = time.perf_counter()
+        self._stop = threading.Event()
+        self._thread = None
+        if snapshot_interval:
+            self._thread = threading.Thread(target=self._snapshots, args=(snapshot_interval,), daemon=True)
+            self._thread.start()
+
+    def _write(self, record):
+        with self.lock:
+            self.file.write(json.dumps(record, separators=(",", ":"), default=str) + "\n")
+
+    def write(self, result):
+        with self.lock:
+            if result["success"]:
+                self.passed += 1
+            else:
+                self.failed += 1
+                self.failures_by_test[result["test"]] = self.failures_by_test.get(result["test"], 0) + 1
+        self._write(dict(result, type="result"))
+
+    def summary(self):
+        with self.lock:
+            total = self.passed + self.failed
+            return {"total": total, "passed": self.passed, "failed": self.failed,
+                    "success_rate": f"{self.passed / total * 100:.1f}%" if total else "n/a",
+                    "failures_by_test": dict(self.failures_by_test)}
+
+    def write_snapshot(self):
+        record = {"type": "snapshot", "timestamp": datetime.now().isoformat(),
+                  "elapsed_s": round(time.perf_counter() - self.started, 3), "checks": self.summary()}
+        if self.snapshot is not None:
+            record["endpoints"] = self.snapshot()
+        self._write(record)
+        with self.lock:
+            self.file.flush()
+
+    def _snapshots(self, interval):
+        while not self._stop.wait(interval):
+            self.write_snapshot()
+
+    def close(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+        self.write_snapshot()
+        self.file.close()
+
+
+def _label(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def render_prometheus(recorder, sink=None, window=10):
+    """Prometheus text exposition of a LatencyRecorder (and a ResultsSink's check counts)"""
+    rate, error_rate = recorder.recent_rate(window)
+    lines = [
+        "# HELP loadtest_in_flight_requests Requests sent and awaiting a response",
+        "# TYPE loadtest_in_flight_requests gauge",
+        f"loadtest_in_flight_requests {recorder.in_flight}",
+        f"# HELP loadtest_requests_per_second Completed requests per second over the last {window}s",
+        "# TYPE loadtest_requests_per_second gauge",
+        f"loadtest_requests_per_second {rate:.3f}",
+        f"# HELP loadtest_error_ratio Share of requests that failed over the last {window}s",
+        "# TYPE loadtest_error_ratio gauge",
+        f"loadtest_error_ratio {error_rate:.5f}",
+    ]
+    with recorder.histograms.lock:
+        histograms = sorted(recorder.histograms.histograms.items())
+    with recorder.lock:
+        errors = dict(recorder.errors)
+    lines += ["# HELP loadtest_requests_total Completed requests", "# TYPE loadtest_requests_total counter"]
+    lines += [f'loadtest_requests_total{{endpoint="{_label(label)}"}} {histogram.count}'
+              for label, histogram in histograms]
+    lines += ["# HELP loadtest_errors_total Failed requests", "# TYPE loadtest_errors_total counter"]
+    lines += [f'loadtest_errors_total{{endpoint="{_label(label)}"}} {errors.get(label, 0)}'
+              for label, _ in histograms]
+    lines += ["# HELP loadtest_request_duration_seconds Request latency since the run started",
+              "# TYPE loadtest_request_duration_seconds summary"]
+    for label, histogram in histograms:
+        endpoint = _label(label)
+        for pct in REPORTED_PERCENTILES:
+            seconds = histogram.value_at_percentile(pct) / 1000.0
+            lines.append(f'loadtest_request_duration_seconds{{endpoint="{endpoint}",quantile="{pct / 100:g}"}} '
+                         f"{seconds:.6f}")
+        lines.append(f'loadtest_request_duration_seconds_sum{{endpoint="{endpoint}"}} {histogram.total / 1e6:.6f}')
+        lines.append(f'loadtest_request_duration_seconds_count{{endpoint="{endpoint}"}} {histogram.count}')
+    if sink is not None:
+        summary = sink.summary()
+        lines += ["# HELP loadtest_checks_total Functional checks by outcome", "# TYPE loadtest_checks_total counter",
+                  f'loadtest_checks_total{{result="passed"}} {summary["passed"]}',
+                  f'loadtest_checks_total{{result="failed"}} {summary["failed"]}']
+    return "\n".join(lines) + "\n"
+
+
+class MetricsServer:
+    """
+    Serves render_prometheus() at /metrics from a background thread, on
+    localhost unless a host such as 0.0.0.0 is passed to expose it
+    """
+
+    def __init__(self, recorder, port=9464, host="127.0.0.1", sink=None):
+        self.recorder = recorder
+        self.sink = sink
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split("?")[0] != "/metrics":
+                    self.send_error(404)
+                    return
+                body = render_prometheus(server.recorder, server.sink).encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self.httpd = ThreadingHTTPServer((host, port), Handler)
+        self.httpd.daemon_threads = True
+        self._thread = None
+
+    @property
+    def url(self):
+        host, port = self.httpd.server_address[:2]
+        return f"http://{'localhost' if host == '0.0.0.0' else host}:{port}/metrics"
+
+    def start(self):
+        self._thread = threading.Thread(target=self.httpd.serve_forever, name="metrics-server", daemon=True)
+        self._thread.start()
+        return self.url
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
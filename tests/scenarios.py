@@ -0,0 +1,368 @@
+"""
+Declarative user-journey scenarios and an open-model load scheduler.
+
+A scenario is a dict (written in Python, JSON or YAML) of weighted journeys:
+
+    data:                        # pools that {placeholders} draw from, one pick per journey
+      category: [Earring, Embroidery]
+    journeys:
+      - name: browse
+        weight: 70
+        steps:
+          - request: GET /products
+            params: {category: "{category}", excludeImage: "true"}
+            capture: {product: random}      # random item of a list response
+            think: [1, 3]                   # seconds, fixed or [min, max]
+          - request: GET /products/{product.id}/image
+      - name: cod_checkout
+        weight: 10
+        steps:
+          - login: user                     # signs up a fresh user; "admin" logs in the seeded admin
+          - request: POST /orders/cod
+            json: {items: [{product: "{product}", quantity: 1}], totalAmount: 259}
+            expect: 201
+
+capture also accepts "first" or a response field name (e.g. orderId). A
+razorpay_payment step signs a fake payment for the captured razorpay_order_id
+the way Razorpay Checkout would, so verify-payment can be exercised.
+
+Journeys start at a target arrival rate with exponential inter-arrival times
+(an open model: arrivals don't wait for earlier journeys to finish), each in
+its own cookie jar, so the measured mix reflects real traffic.
+"""
+
+import os
+import random
+import re
+import secrets
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+from tests.loadgen import LatencyRecorder, RateLimiter, TimedClient
+from tests.mock_server import ADMIN_EMAIL, ADMIN_PASSWORD, razorpay_signature
+
+PLACEHOLDER = re.compile(r"\{([A-Za-z_][\w.]*)\}")
+
+DEFAULT_SCENARIO = {
+    "data": {
+        "category": ["Earring", "Traditional Nath", "Mangalsutra", "Jewellery Set", "Embroidery"],
+        "page_size": [8, 12, 24],
+        "page_skip": [0, 8, 12, 24],
+        "quantity": [1, 1, 1, 2, 3],
+    },
+    "journeys": [
+        {
+            "name": "browse_catalogue",
+            "weight": 60,
+            "steps": [
+                {"request": "GET /products", "params": {"excludeImage": "true"},
+                 "capture": {"product": "random"}, "think": [1, 4]},
+                {"request": "GET /products/{product.id}/image", "think": [0.5, 2]},
+                {"request": "GET /products", "params": {"category": "{category}", "excludeImage": "true"},
+                 "capture": {"product": "random"}, "think": [2, 6]},
+                {"request": "GET /products/{product.id}/image"},
+            ],
+        },
+        {
+            "name": "page_through_catalogue",
+            "weight": 15,
+            "steps": [
+                {"request": "GET /products",
+                 "params": {"limit": "{page_size}", "skip": "0", "excludeImage": "true"}, "think": [1, 3]},
+                {"request": "GET /products",
+                 "params": {"limit": "{page_size}", "skip": "{page_skip}", "excludeImage": "true"}, "think": [1, 3]},
+            ],
+        },
+        {
+            "name": "cod_checkout",
+            "weight": 10,
+            "steps": [
+                {"request": "GET /products", "params": {"excludeImage": "true"},
+                 "capture": {"product": "random"}, "think": [2, 5]},
+                {"login": "user", "think": [1, 3]},
+                {"request": "POST /orders/cod",
+                 "json": {"items": [{"product": "{product}", "quantity": "{quantity}"}],
+                          "totalAmount": "{product.price}",
+                          "shippingDetails": {"firstName": "Load", "phone": "9876543210"}},
+                 "expect": 201},
+            ],
+        },
+        {
+            "name": "razorpay_checkout",
+            "weight": 5,
+            "steps": [
+                {"request": "GET /products", "params": {"excludeImage": "true"},
+                 "capture": {"product": "random"}, "think": [2, 5]},
+                {"login": "user", "think": [1, 3]},
+                {"request": "POST /razorpay/create-order", "json": {"amount": "{product.price}"},
+                 "capture": {"razorpay_order_id": "id"}, "think": [3, 8]},
+                {"razorpay_payment": True},
+                {"request": "POST /razorpay/verify-payment",
+                 "json": {"razorpay_order_id": "{razorpay_order_id}", "razorpay_payment_id": "{razorpay_payment_id}",
+                          "razorpay_signature": "{razorpay_signature}",
+                          "items": [{"product": "{product}", "quantity": 1}], "totalAmount": "{product.price}"}},
+            ],
+        },
+        {
+            "name": "admin_dashboard",
+            "weight": 10,
+            "steps": [
+                {"login": "admin", "think": [1, 2]},
+                {"request": "GET /admin/stats", "think": [5, 10]},
+                {"request": "GET /admin/orders", "think": [5, 10]},
+                {"request": "GET /admin/stats"},
+            ],
+        },
+    ],
+}
+
+
+def load_scenario(path):
+    """Read a scenario from a .json, .yaml/.yml or .py (module-level SCENARIO) file"""
+    if path.endswith((".yaml", ".yml")):
+        import yaml
+        with open(path) as f:
+            return yaml.safe_load(f)
+    if path.endswith(".py"):
+        import runpy
+        return runpy.run_path(path)["SCENARIO"]
+    import json
+    with open(path) as f:
+        return json.load(f)
+
+
+def _lookup(context, dotted):
+    value = context
+    for part in dotted.split("."):
+        value = value[part]
+    return value
+
+
+def render(template, context):
+    """Substitute {name} / {name.field} placeholders; a lone placeholder keeps the value's type"""
+    if isinstance(template, str):
+        whole = PLACEHOLDER.fullmatch(template)
+        if whole:
+            return _lookup(context, whole.group(1))
+        return PLACEHOLDER.sub(lambda match: str(_lookup(context, match.group(1))), template)
+    if isinstance(template, dict):
+        return {key: render(value, context) for key, value in template.items()}
+    if isinstance(template, list):
+        return [render(value, context) for value in template]
+    return template
+
+
+class JourneyFailed(Exception):
+    pass
+
+
+class JourneyRunner:
+    """Executes one journey's steps against the API with its own cookie jar"""
+
+    def __init__(self, base_url, http, data, rng, think_scale=1.0):
+        self.base_url = base_url
+        self.http = http
+        self.rng = rng
+        self.think_scale = think_scale
+        # One pick per pool per journey keeps a journey internally consistent
+        self.context = {name: rng.choice(values) if isinstance(values, list) else values
+                        for name, values in data.items()}
+
+    def think(self, step):
+        pause = step.get("think")
+        if not pause or not self.think_scale:
+            return
+        if isinstance(pause, (list, tuple)):
+            pause = self.rng.uniform(*pause)
+        time.sleep(pause * self.think_scale)
+
+    def login(self, role):
+        if role == "admin":
+            credentials = {"email": self.context.get("admin_email", ADMIN_EMAIL),
+                           "password": self.context.get("admin_password", ADMIN_PASSWORD)}
+            response = self.http.post(f"{self.base_url}/auth/login", json=credentials)
+        else:
+            credentials = {"email": f"load_{secrets.token_hex(6)}@example.com", "password": secrets.token_hex(8)}
+            response = self.http.post(f"{self.base_url}/auth/signup", json=credentials)
+        if response.status_code >= 400:
+            raise JourneyFailed(f"{role} login: HTTP {response.status_code}")
+
+    def sign_payment(self):
+        secret = self.context.get("razorpay_key_secret") or os.environ.get("RAZORPAY_KEY_SECRET",
+                                                                           "mock-razorpay-secret")
+        payment_id = f"pay_{secrets.token_hex(7)}"
+        self.context["razorpay_payment_id"] = payment_id
+        self.context["razorpay_signature"] = razorpay_signature(self.context["razorpay_order_id"],
+                                                                payment_id, secret)
+
+    def capture(self, spec, payload):
+        for name, how in spec.items():
+            if how in ("random", "first"):
+                if not isinstance(payload, list) or not payload:
+                    raise JourneyFailed(f"cannot capture {name}: empty or non-list response")
+                self.context[name] = self.rng.choice(payload) if how == "random" else payload[0]
+            else:
+                self.context[name] = payload[how]
+
+    def request(self, step):
+        method, path = step["request"].split(" ", 1)
+        kwargs = {}
+        if "params" in step:
+            kwargs["params"] = render(step["params"], self.context)
+        if "json" in step:
+            kwargs["json"] = render(step["json"], self.context)
+        expected = step.get("expect")
+        if expected is not None:
+            kwargs["expect"] = expected
+        response = self.http.request(method, self.base_url + render(path, self.context), **kwargs)
+        if (expected is not None and response.status_code != expected) or (
+                expected is None and response.status_code >= 400):
+            raise JourneyFailed(f"{step['request']}: HTTP {response.status_code}")
+        if "capture" in step:
+            self.capture(step["capture"], response.json())
+
+    def run(self, journey):
+        for step in journey["steps"]:
+            try:
+                if "login" in step:
+                    self.login(step["login"])
+                elif step.get("razorpay_payment"):
+                    self.sign_payment()
+                else:
+                    self.request(step)
+            except KeyError as e:
+                raise JourneyFailed(f"missing value {e} for step {step}") from None
+            self.think(step)
+
+
+class JourneyTester:
+    """
+    A scenario's journeys as load-mode suites (tests.loadgen.run_load): every
+    journey runs in a fresh cookie jar, with think times scaled by think_scale
+    (none by default, so virtual users loop as fast as the API answers).
+    """
+
+    def __init__(self, scenario, base_url, http, rng, think_scale=0.0, sink=None):
+        self.journeys = {journey["name"]: journey for journey in scenario["journeys"]}
+        self.data = scenario.get("data", {})
+        self.base_url = base_url
+        self.http = http
+        self.rng = rng
+        self.think_scale = think_scale
+        # Only counters are kept here; with a ResultsSink every journey's outcome is streamed to it
+        self.sink = sink
+        self.passed = 0
+        self.failed = 0
+
+    def run_suites(self, names):
+        for name in names:
+            http = self.http.fork()
+            runner = JourneyRunner(self.base_url, http, self.data, random.Random(self.rng.getrandbits(32)),
+                                   self.think_scale)
+            error = None
+            try:
+                runner.run(self.journeys[name])
+            except JourneyFailed as e:
+                error = str(e)
+            except Exception as e:
+                error = f"{type(e).__name__}: {e}"
+            if error is None:
+                self.passed += 1
+            else:
+                # A bad status was already counted by the client; charge anything else to the last request
+                http.check_failed()
+                self.failed += 1
+            if self.sink is not None:
+                self.sink.write({"test": f"journey {name}", "success": error is None, "details": error or "",
+                                 "timestamp": datetime.now().isoformat()})
+
+
+class JourneyStats:
+    """Thread-safe per-journey start/finish/failure counts and durations"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.stats = {}
+
+    def record(self, name, seconds, error=None):
+        with self.lock:
+            stats = self.stats.setdefault(name, {"started": 0, "failed": 0, "total_s": 0.0, "errors": {}})
+            stats["started"] += 1
+            stats["total_s"] += seconds
+            if error:
+                stats["failed"] += 1
+                stats["errors"][error] = stats["errors"].get(error, 0) + 1
+
+    def report(self):
+        with self.lock:
+            return {name: dict(stats, mean_s=stats["total_s"] / stats["started"])
+                    for name, stats in sorted(self.stats.items())}
+
+
+def run_scenario(scenario, base_url, client, arrival_rate, duration, max_users=200, rate=None,
+                 think_scale=1.0, seed=None, recorder=None):
+    """
+    Start journeys at `arrival_rate` per second for `duration` seconds.
+
+    client is a PooledClient; every journey gets client.fork() so cookies never
+    leak between virtual users. Arrivals that find `max_users` journeys already
+    running are dropped and counted rather than delayed, as in an open model.
+    Pass a recorder to watch the run live. Returns (endpoint_report, recorder, journey_report, dropped).
+    """
+    rng = random.Random(seed)
+    journeys = scenario["journeys"]
+    weights = [journey.get("weight", 1) for journey in journeys]
+    data = scenario.get("data", {})
+    recorder = recorder or LatencyRecorder()
+    limiter = RateLimiter(rate)
+    stats = JourneyStats()
+    slots = threading.BoundedSemaphore(max_users)
+    dropped = 0
+
+    def run_journey(journey, journey_seed):
+        runner = JourneyRunner(base_url, TimedClient(client.fork(), recorder, limiter), data,
+                               random.Random(journey_seed), think_scale)
+        start = time.perf_counter()
+        error = None
+        try:
+            runner.run(journey)
+        except JourneyFailed as e:
+            error = str(e)
+        except Exception as e:
+            error = f"{type(e).__name__}: {e}"
+        finally:
+            stats.record(journey["name"], time.perf_counter() - start, error)
+            slots.release()
+
+    recorder.start()
+    deadline = time.perf_counter() + duration
+    next_arrival = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=max_users) as pool:
+        while True:
+            next_arrival += rng.expovariate(arrival_rate)
+            if next_arrival >= deadline:
+                break
+            delay = next_arrival - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            if not slots.acquire(blocking=False):
+                dropped += 1
+                continue
+            journey = rng.choices(journeys, weights=weights)[0]
+            pool.submit(run_journey, journey, rng.getrandbits(32))
+    recorder.stop()
+    return recorder.report(), recorder, stats.report(), dropped
+
+
+def print_journey_report(journey_report, dropped):
+    """Print journey counts, failure rates and mean durations"""
+    print("=" * 100)
+    print("JOURNEY SUMMARY")
+    print("=" * 100)
+    print(f"{'Journey':<30}{'Started':>9}{'Failed':>9}{'Mean s':>10}  Top error")
+    for name, stats in journey_report.items():
+        top_error = max(stats["errors"].items(), key=lambda item: item[1])[0] if stats["errors"] else ""
+        print(f"{name:<30}{stats['started']:>9}{stats['failed']:>9}{stats['mean_s']:>10.2f}  {top_error[:40]}")
+    print(f"Dropped arrivals (max users busy): {dropped}")
@@ -0,0 +1,187 @@
+"""
+Soak mode: a steady mixed workload for hours with resource drift detection.
+
+Runs a scenario (tests.scenarios) at a constant arrival rate and, every
+window, records that window's latency percentiles and error count plus, when
+the server runs locally, its RSS and open sockets (/proc) and the Postgres
+connection count (pg_stat_activity). At the end every series is checked for
+monotonic upward drift with the Mann-Kendall trend test and Sen's slope, so
+slow leaks - pooled connections piling up, route memory growth - show up as
+a failed run instead of a production incident.
+"""
+
+import csv
+import math
+import threading
+import time
+
+from tests.loadgen import LatencyRecorder
+from tests.metrics import LatencyHistogram, process_open_sockets, process_rss_bytes
+from tests.scenarios import run_scenario
+
+PG_CONNECTIONS_SQL = """
+    SELECT count(*) FROM pg_stat_activity WHERE datname = current_database() AND pid <> pg_backend_pid()
+"""
+
+SERIES = ("p50_ms", "p95_ms", "p99_ms", "error_ratio", "rss_mb", "sockets", "pg_connections")
+MIN_WINDOWS = 8
+
+
+class SoakRecorder(LatencyRecorder):
+    """LatencyRecorder that also keeps a histogram of the current window only"""
+
+    def __init__(self):
+        super().__init__()
+        self.window = LatencyHistogram()
+        self.window_errors = 0
+
+    def record(self, label, seconds, ok=True):
+        super().record(label, seconds, ok)
+        # Under the lock rotate() swaps the window with, so no sample lands in a window already reported
+        with self.lock:
+            self.window.record(seconds)
+            self.window_errors += not ok
+
+    def record_error(self, label):
+        super().record_error(label)
+        with self.lock:
+            self.window_errors += 1
+
+    def rotate(self):
+        """Start a new window; returns (histogram, errors) of the one that just ended"""
+        with self.lock:
+            window, errors = self.window, self.window_errors
+            self.window, self.window_errors = LatencyHistogram(), 0
+        return window, errors
+
+
+def mann_kendall(values):
+    """
+    Mann-Kendall trend test. Returns (S, Z, one-sided p-value for an increasing
+    trend); ties are corrected for in the variance.
+    """
+    n = len(values)
+    s = sum((values[j] > values[i]) - (values[j] < values[i]) for i in range(n - 1) for j in range(i + 1, n))
+    ties = {}
+    for value in values:
+        ties[value] = ties.get(value, 0) + 1
+    variance = (n * (n - 1) * (2 * n + 5) - sum(t * (t - 1) * (2 * t + 5) for t in ties.values())) / 18
+    if variance <= 0:
+        return s, 0.0, 1.0
+    z = (s - 1) / math.sqrt(variance) if s > 0 else (s + 1) / math.sqrt(variance) if s < 0 else 0.0
+    return s, z, 0.5 * math.erfc(z / math.sqrt(2))
+
+
+def sen_slope(times, values):
+    """Median of all pairwise slopes - a trend rate robust to outlier windows"""
+    slopes = sorted((values[j] - values[i]) / (times[j] - times[i])
+                    for i in range(len(values) - 1) for j in range(i + 1, len(values)) if times[j] != times[i])
+    if not slopes:
+        return 0.0
+    middle = len(slopes) // 2
+    return slopes[middle] if len(slopes) % 2 else (slopes[middle - 1] + slopes[middle]) / 2
+
+
+def detect_drift(windows, alpha=0.01, min_change=0.05):
+    """
+    Per series: Mann-Kendall increasing-trend test plus Sen's slope per hour.
+    A series drifts when p < alpha and the fitted rise over the run is at
+    least min_change of its starting level (so significant-but-negligible
+    trends, e.g. a few KB of RSS, don't fail a run).
+    """
+    verdicts = {}
+    for name in SERIES:
+        points = [(window["elapsed_s"], window[name]) for window in windows if window.get(name) is not None]
+        if len(points) < MIN_WINDOWS:
+            verdicts[name] = {"verdict": "insufficient", "windows": len(points)}
+            continue
+        times, values = [p[0] for p in points], [p[1] for p in points]
+        s, z, p_value = mann_kendall(values)
+        slope = sen_slope(times, values)
+        head = sorted(values[:max(len(values) // 10, 3)])
+        start = head[len(head) // 2]
+        rise = slope * (times[-1] - times[0])
+        drifting = p_value < alpha and rise > 0 and (rise >= min_change * abs(start) if start else True)
+        verdicts[name] = {"verdict": "DRIFT" if drifting else "stable", "windows": len(points), "start": start,
+                          "end": values[-1], "slope_per_hour": slope * 3600, "z": z, "p_value": p_value}
+    return verdicts
+
+
+def sample_window(recorder, elapsed_s, server_pid=None, sink=None):
+    histogram, errors = recorder.rotate()
+    rss = process_rss_bytes(server_pid) if server_pid else None
+    return {
+        "elapsed_s": round(elapsed_s, 1),
+        "requests": histogram.count,
+        "error_ratio": errors / histogram.count if histogram.count else 0.0,
+        "p50_ms": histogram.value_at_percentile(50) if histogram.count else None,
+        "p95_ms": histogram.value_at_percentile(95) if histogram.count else None,
+        "p99_ms": histogram.value_at_percentile(99) if histogram.count else None,
+        "rss_mb": rss / 2 ** 20 if rss else None,
+        "sockets": process_open_sockets(server_pid) if server_pid else None,
+        "pg_connections": sink.fetchall(PG_CONNECTIONS_SQL)[0][0] if sink is not None else None,
+    }
+
+
+def run_soak(scenario, base_url, client, arrival_rate, duration, window=60, max_users=200, think_scale=1.0,
+             server_pid=None, sink=None, recorder=None, on_window=None):
+    """
+    Drive `scenario` for `duration` seconds, sampling every `window` seconds.
+    recorder must be a SoakRecorder (pass one to also serve it live); on_window
+    is called with each window's sample. Returns (windows, scenario_result).
+    """
+    recorder = recorder or SoakRecorder()
+    outcome = {}
+
+    def drive():
+        outcome["result"] = run_scenario(scenario, base_url, client, arrival_rate, duration, max_users=max_users,
+                                         think_scale=think_scale, recorder=recorder)
+
+    driver = threading.Thread(target=drive, name="soak-driver", daemon=True)
+    start = time.perf_counter()
+    driver.start()
+    windows = []
+    next_sample = start + window
+    while driver.is_alive():
+        driver.join(timeout=max(next_sample - time.perf_counter(), 0))
+        if time.perf_counter() >= next_sample or not driver.is_alive():
+            sample = sample_window(recorder, time.perf_counter() - start, server_pid, sink)
+            if sample["requests"]:
+                windows.append(sample)
+                if on_window:
+                    on_window(sample)
+            next_sample += window
+    return windows, outcome.get("result")
+
+
+def _cell(value, width, decimals=1):
+    return f"{value:>{width}.{decimals}f}" if value is not None else f"{'-':>{width}}"
+
+
+def print_window(sample):
+    print(f"[{sample['elapsed_s']:>8.0f}s] reqs {sample['requests']:>6}  err {sample['error_ratio'] * 100:5.1f}%  "
+          f"p50 {_cell(sample['p50_ms'], 7)}  p95 {_cell(sample['p95_ms'], 7)}  p99 {_cell(sample['p99_ms'], 7)} ms  "
+          f"rss {_cell(sample['rss_mb'], 7)} MB  sockets {_cell(sample['sockets'], 5, 0)}  "
+          f"pg {_cell(sample['pg_connections'], 4, 0)}")
+
+
+def write_windows_csv(windows, path):
+    with open(path, "w", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=["elapsed_s", "requests", *SERIES])
+        writer.writeheader()
+        writer.writerows(windows)
+
+
+def print_drift_report(verdicts):
+    """Print the trend test per series; returns True when nothing drifted"""
+    print("=" * 100)
+    print("SOAK DRIFT (Mann-Kendall, Sen's slope)")
+    print("=" * 100)
+    print(f"{'Series':<16}{'Windows':>8}{'Start':>11}{'End':>11}{'Slope/hour':>13}{'Z':>8}{'p':>10}  Verdict")
+    for name, verdict in verdicts.items():
+        if verdict["verdict"] == "insufficient":
+            print(f"{name:<16}{verdict['windows']:>8}{'':>61}  not enough samples")
+            continue
+        print(f"{name:<16}{verdict['windows']:>8}{verdict['start']:>11.2f}{verdict['end']:>11.2f}"
+              f"{verdict['slope_per_hour']:>+13.3f}{verdict['z']:>8.2f}{verdict['p_value']:>10.2g}  {verdict['verdict']}")
+    return not any(verdict["verdict"] == "DRIFT" for verdict in verdicts.values())
@@ -0,0 +1,187 @@
+"""
+Scaling benchmark for GET /api/admin/stats and a verifier for faster stats paths.
+
+The route loads every non-cancelled order with its user's email and sums
+totalAmount in JS, so its cost grows with order history. This grows the
+order table in steps with tests.datagen, measures the endpoint's latency,
+response size and client-side parse memory at each step, and checks its
+revenue/customer numbers against a direct SQL (or mock store) aggregate.
+Any rollup or materialized-aggregate implementation can be checked against
+the same reference with verify_rollup().
+"""
+
+import json
+import math
+import time
+import tracemalloc
+from datetime import datetime
+
+from tests.datagen import PRODUCT_COLUMNS, USER_COLUMNS, delete_run, load_orders, load_rows
+from tests.metrics import LatencyHistogram, process_rss_bytes
+from tests.mock_server import iso
+
+REFERENCE_SQL = """
+    SELECT COALESCE(SUM(o."totalAmount"), 0), COUNT(DISTINCT u.email)
+    FROM "Order" o JOIN "User" u ON u.id = o."userId"
+    WHERE o.status <> 'CANCELLED'
+"""
+
+
+def _iso(value):
+    return iso(value) if isinstance(value, datetime) else value
+
+
+class MockTarget:
+    """Loads generated rows into a MockBackend store and computes reference stats from it"""
+
+    def __init__(self, backend):
+        self.store = backend.store
+
+    def load_base(self, generator):
+        for row in generator.users():
+            self.store.add_user(dict(zip(USER_COLUMNS, map(_iso, row))))
+        for row in generator.products():
+            product = dict(zip(PRODUCT_COLUMNS, map(_iso, row)))
+            self.store.products[product["id"]] = product
+
+    def load_orders(self, generator, start, count, total_orders):
+        for order, items in generator.orders(start, count, total_orders=total_orders):
+            row = dict(zip(("id", "userId", "totalAmount", "status", "paymentType", "isPaid", "razorpayOrderId",
+                            "razorpayPaymentId", "createdAt", "updatedAt"), map(_iso, order)))
+            row["items"] = [dict(zip(("id", "orderId", "productId", "quantity", "price"), item)) for item in items]
+            self.store.orders[row["id"]] = row
+
+    def reference(self):
+        live = [order for order in self.store.orders.values() if order["status"] != "CANCELLED"]
+        return {"revenue": sum(order["totalAmount"] for order in live),
+                "customers": len({self.store.user_email(order["userId"]) for order in live})}
+
+    def cleanup(self, generator):
+        pass
+
+
+class PostgresTarget:
+    """Streams generated rows into Postgres and computes reference stats with SQL"""
+
+    def __init__(self, sink, batch_size=20000):
+        self.sink = sink
+        self.batch_size = batch_size
+
+    def load_base(self, generator):
+        load_rows(self.sink, "User", USER_COLUMNS, generator.users(), self.batch_size)
+        load_rows(self.sink, "Product", PRODUCT_COLUMNS, generator.products(), self.batch_size)
+
+    def load_orders(self, generator, start, count, total_orders):
+        load_orders(self.sink, generator, start, count, self.batch_size, total_orders=total_orders)
+
+    def reference(self):
+        revenue, customers = self.sink.fetchall(REFERENCE_SQL)[0]
+        return {"revenue": float(revenue), "customers": int(customers)}
+
+    def cleanup(self, generator):
+        delete_run(self.sink, generator)
+
+
+def verify_rollup(reference, candidate, rel_tol=1e-9, abs_tol=0.005):
+    """
+    Compare a stats implementation's revenue/customers with the reference.
+    Returns a list of mismatch descriptions (empty when they agree).
+    Revenue is a float sum, so it is compared to within rounding.
+    """
+    mismatches = []
+    if not math.isclose(candidate.get("revenue", math.nan), reference["revenue"], rel_tol=rel_tol, abs_tol=abs_tol):
+        mismatches.append(f"revenue {candidate.get('revenue')} != {reference['revenue']}")
+    if candidate.get("customers") != reference["customers"]:
+        mismatches.append(f"customers {candidate.get('customers')} != {reference['customers']}")
+    return mismatches
+
+
+def measure_stats(client, url, samples):
+    """Fetch the stats URL `samples` times; returns latency histogram, bytes, parse memory/time and last body"""
+    histogram = LatencyHistogram()
+    size = parse_peak = parse_ms = 0
+    body = None
+    for _ in range(samples):
+        start = time.perf_counter()
+        response = client.get(url)
+        raw = response.content
+        histogram.record(time.perf_counter() - start)
+        if response.status_code != 200:
+            raise RuntimeError(f"GET {url}: HTTP {response.status_code} {response.text[:200]}")
+        size = len(raw)
+        tracemalloc.start()
+        parse_start = time.perf_counter()
+        body = json.loads(raw)
+        parse_ms = (time.perf_counter() - parse_start) * 1000
+        parse_peak = max(parse_peak, tracemalloc.get_traced_memory()[1])
+        tracemalloc.stop()
+    return histogram, size, parse_peak, parse_ms, body
+
+
+def run_stats_benchmark(client, base_url, target, generator, order_steps, samples=20, rollup=None,
+                        server_pid=None, keep=False):
+    """
+    Grow the order table to each total in order_steps and benchmark /admin/stats.
+
+    rollup, if given, is a callable returning {"revenue", "customers"} from the
+    candidate fast path (e.g. another endpoint or a rollup table query); it is
+    verified against the same reference as the endpoint. Returns one dict per step.
+    """
+    steps = []
+    total = max(order_steps)
+    target.load_base(generator)
+    loaded = 0
+    try:
+        for step in sorted(order_steps):
+            target.load_orders(generator, loaded, step - loaded, total_orders=total)
+            loaded = step
+            histogram, size, parse_peak, parse_ms, body = measure_stats(client, f"{base_url}/admin/stats", samples)
+            reference = target.reference()
+            result = {
+                "orders_generated": step,
+                "orders_total": body.get("orders"),
+                "p50_ms": histogram.value_at_percentile(50),
+                "p95_ms": histogram.value_at_percentile(95),
+                "max_ms": histogram.max / 1000.0,
+                "response_bytes": size,
+                "parse_peak_bytes": parse_peak,
+                "parse_ms": parse_ms,
+                "server_rss_bytes": process_rss_bytes(server_pid) if server_pid else None,
+                "endpoint_mismatches": verify_rollup(reference, body),
+            }
+            if rollup is not None:
+                start = time.perf_counter()
+                candidate = rollup()
+                result["rollup_ms"] = (time.perf_counter() - start) * 1000
+                result["rollup_mismatches"] = verify_rollup(reference, candidate)
+            steps.append(result)
+    finally:
+        if not keep:
+            target.cleanup(generator)
+    return steps
+
+
+def print_stats_report(steps):
+    """Print latency/size per step and any verification failures; returns True when all checks agree"""
+    print("=" * 100)
+    print("ADMIN STATS SCALING")
+    print("=" * 100)
+    has_rollup = any("rollup_ms" in step for step in steps)
+    rollup_header = f"{'Rollup ms':>11}" if has_rollup else ""
+    print(f"{'Orders':>10}{'p50 ms':>10}{'p95 ms':>10}{'Resp KB':>10}{'Parse KB':>10}{'RSS MB':>9}"
+          f"{rollup_header}  Verified")
+    ok = True
+    for step in steps:
+        rss = f"{step['server_rss_bytes'] / 2 ** 20:.0f}" if step["server_rss_bytes"] else "-"
+        mismatches = step["endpoint_mismatches"] + step.get("rollup_mismatches", [])
+        ok = ok and not mismatches
+        rollup = f"{step['rollup_ms']:>11.1f}" if has_rollup else ""
+        print(f"{step['orders_generated']:>10}{step['p50_ms']:>10.1f}{step['p95_ms']:>10.1f}"
+              f"{step['response_bytes'] / 1024:>10.1f}{step['parse_peak_bytes'] / 1024:>10.1f}{rss:>9}{rollup}"
+              f"  {'yes' if not mismatches else 'NO: ' + '; '.join(mismatches)}")
+    if len(steps) >= 2 and steps[0]["p50_ms"]:
+        first, last = steps[0], steps[-1]
+        growth = last["orders_generated"] / first["orders_generated"]
+        print(f"\nLatency grew {last['p50_ms'] / first['p50_ms']:.1f}x while orders grew {growth:.0f}x")
+    return ok
+